@@ -10,6 +10,17 @@ SR_CORPORATIONS_ENABLED = clean_setting("SR_CORPORATIONS_ENABLED", True)
 # Number of seconds to cache heavy pages like character and groups standing
 SR_PAGE_CACHE_SECONDS = clean_setting("SR_PAGE_CACHE_SECONDS", 600)
 
+# Max number of concurrent requests to ESI when fetching many objects at once.
+# Should not exceed ESI_CONNECTION_POOL_MAXSIZE of django-esi
+SR_ESI_MAX_CONCURRENCY = clean_setting("SR_ESI_MAX_CONCURRENCY", 10)
+
+# Max number of requests per second to ESI from this app across all processes
+SR_ESI_MAX_REQUESTS_PER_SECOND = clean_setting("SR_ESI_MAX_REQUESTS_PER_SECOND", 20)
+
+# Requests to ESI are paused until the error limit is reset,
+# when the remaining error budget reported by ESI drops below this threshold
+SR_ESI_ERROR_LIMIT_THRESHOLD = clean_setting("SR_ESI_ERROR_LIMIT_THRESHOLD", 25)
+
 # whether ESI requests have a timeout
 SR_ESI_TIMEOUT_ENABLED = clean_setting("SR_ESI_TIMEOUT_ENABLED", True)
 
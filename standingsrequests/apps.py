@@ -9,4 +9,4 @@ class StandingsRequestsConfig(AppConfig):
     verbose_name = f"{__title__} v{__version__}"
 
     def ready(self):
-        pass
+        from . import signals  # noqa: F401 pylint: disable=unused-import
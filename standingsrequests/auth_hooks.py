@@ -6,7 +6,8 @@ from allianceauth import hooks
 from allianceauth.services.hooks import MenuItemHook, ServicesHook, UrlHook
 
 from . import __title__, urls
-from .models import StandingRequest, StandingRevocation
+from .core import pending_counts
+from .models import StandingRequest
 from .urls import urlpatterns
 
 logger = logging.getLogger(__name__)
@@ -48,10 +49,7 @@ class StandingsRequestMenuItem(MenuItemHook):
 
     def render(self, request):
         if request.user.has_perm("standingsrequests.affect_standings"):
-            app_count = (
-                StandingRequest.objects.pending_requests().count()
-                + StandingRevocation.objects.pending_requests().count()
-            )
+            app_count = pending_counts.pending_counts().total
             self.count = app_count if app_count and app_count > 0 else None
         if request.user.has_perm(StandingRequest.REQUEST_PERMISSION_NAME):
             return MenuItemHook.render(self, request)
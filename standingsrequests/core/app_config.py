@@ -1,6 +1,7 @@
 """API for current configuration from settings."""
 
-from typing import Optional, Set
+from functools import lru_cache
+from typing import FrozenSet, Optional
 
 from eveuniverse.models import EveEntity
 
@@ -56,13 +57,17 @@ def is_character_a_member(character: EveCharacter) -> bool:
     )
 
 
-def corporation_ids() -> Set[int]:
+def corporation_ids() -> FrozenSet[int]:
     """Return corporation IDs, which belong the configured organization."""
-    result = {int(org_id) for org_id in list(STR_CORP_IDS)}
-    return result
+    return _to_id_set(tuple(STR_CORP_IDS))
 
 
-def alliance_ids() -> Set[int]:
+def alliance_ids() -> FrozenSet[int]:
     """Return alliance IDs, which belong to the configured organization."""
-    result = {int(org_id) for org_id in list(STR_ALLIANCE_IDS)}
-    return result
+    return _to_id_set(tuple(STR_ALLIANCE_IDS))
+
+
+@lru_cache(maxsize=16)
+def _to_id_set(org_ids: tuple) -> FrozenSet[int]:
+    """Convert configured IDs into a set. The result is computed once per setting."""
+    return frozenset(int(org_id) for org_id in org_ids)
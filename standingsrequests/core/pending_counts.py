@@ -0,0 +1,49 @@
+"""Counts of pending standing requests and revocations.
+
+The counts are shown on most pages and in the menu badge,
+so they are kept in the cache and invalidated by signals
+whenever a request or revocation is changed.
+"""
+
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import transaction
+
+from standingsrequests.models import StandingRequest, StandingRevocation
+
+CACHE_KEY = "STANDINGS_REQUESTS_PENDING_COUNTS"
+
+
+@dataclass(frozen=True)
+class PendingCounts:
+    """Counts of pending standing requests and revocations."""
+
+    requests: int
+    revocations: int
+
+    @property
+    def total(self) -> int:
+        return self.requests + self.revocations
+
+
+def pending_counts() -> PendingCounts:
+    """Return current counts of pending requests and revocations."""
+    counts = cache.get(CACHE_KEY)
+    if counts is None:
+        counts = (
+            StandingRequest.objects.pending_requests().count(),
+            StandingRevocation.objects.pending_requests().count(),
+        )
+        cache.set(CACHE_KEY, counts, timeout=None)
+    return PendingCounts(*counts)
+
+
+def invalidate() -> None:
+    """Invalidate the cached counts.
+
+    The counts are invalidated again after the current transaction is committed,
+    so that counts computed from uncommitted data are not kept.
+    """
+    cache.delete(CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
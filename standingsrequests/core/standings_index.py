@@ -0,0 +1,187 @@
+"""API for looking up standings of many Eve entities at once.
+
+Lookups are served from an index of the latest contact set,
+which is kept in memory of each process.
+The index is reloaded only when a new contact set has landed
+or when standing requests have changed.
+
+Example:
+
+.. code-block:: python
+
+    from standingsrequests.core import standings_index
+
+    results = standings_index.lookup([1001, 1002])
+    print(results[1001].standing)
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from standingsrequests import __title__
+from standingsrequests.models import Contact, ContactSet, StandingRequest
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+CACHE_KEY_REQUESTS_VERSION = "STANDINGS_REQUESTS_INDEX_REQUESTS_VERSION"
+
+
+class RequestState:
+    """States of a standing request."""
+
+    PENDING = "pending"
+    ACTIONED = "actioned"
+    EFFECTIVE = "effective"
+
+
+@dataclass(frozen=True)
+class ContactStanding:
+    """Standing of an Eve entity.
+
+    Args:
+    - standing: Standing of the entity or None when it is not a contact
+    - labels: Names of the labels of the contact
+    - request_state: State of the standing request for the entity if any
+    """
+
+    standing: Optional[float] = None
+    labels: Tuple[str, ...] = ()
+    request_state: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class _StandingsIndex:
+    contact_set_id: Optional[int]
+    requests_version: int
+    contacts: Dict[int, ContactStanding]
+
+
+_index: Optional[_StandingsIndex] = None
+_index_lock = threading.Lock()
+
+
+def lookup(entity_ids: Iterable[int]) -> Dict[int, ContactStanding]:
+    """Return standings for the given entity IDs.
+
+    Every requested ID is included in the result.
+    """
+    index = _current_index()
+    no_standing = ContactStanding()
+    return {
+        entity_id: index.contacts.get(entity_id, no_standing)
+        for entity_id in entity_ids
+    }
+
+
+def invalidate_requests() -> None:
+    """Invalidate the request states of the index in all processes.
+
+    The index is invalidated again after the current transaction is committed,
+    so that an index loaded from uncommitted data is not kept.
+    """
+    _bump_requests_version()
+    transaction.on_commit(_bump_requests_version)
+
+
+def _bump_requests_version() -> None:
+    try:
+        cache.incr(CACHE_KEY_REQUESTS_VERSION)
+    except ValueError:
+        _requests_version()
+
+
+def _requests_version() -> int:
+    version = cache.get(CACHE_KEY_REQUESTS_VERSION)
+    if version is None:
+        # start with a version, that was never used before
+        cache.add(CACHE_KEY_REQUESTS_VERSION, int(time.time() * 1000), timeout=None)
+        version = cache.get(CACHE_KEY_REQUESTS_VERSION)
+    return version
+
+
+def _current_index() -> _StandingsIndex:
+    """Return the index for the latest contact set. Reload it when needed."""
+    global _index  # pylint: disable = global-statement
+    contact_set_id = (
+        ContactSet.objects.order_by("-date").values_list("id", flat=True).first()
+    )
+    requests_version = _requests_version()
+    index = _index
+    if _is_current(index, contact_set_id, requests_version):
+        return index
+
+    with _index_lock:
+        index = _index
+        if not _is_current(index, contact_set_id, requests_version):
+            index = _load_index(contact_set_id, requests_version)
+            _index = index
+    return index
+
+
+def _is_current(
+    index: Optional[_StandingsIndex],
+    contact_set_id: Optional[int],
+    requests_version: int,
+) -> bool:
+    return (
+        index is not None
+        and index.contact_set_id == contact_set_id
+        and index.requests_version == requests_version
+    )
+
+
+def _load_index(
+    contact_set_id: Optional[int], requests_version: int
+) -> _StandingsIndex:
+    standings = {}
+    labels = {}
+    if contact_set_id:
+        contacts = Contact.objects.filter(contact_set_id=contact_set_id).values_list(
+            "eve_entity_id", "standing", "label_names"
+        )
+        for entity_id, standing, label_names in contacts:
+            standings[entity_id] = standing
+            if label_names:
+                labels[entity_id] = label_names
+
+    requests = StandingRequest.objects.values_list(
+        "contact_id", "action_date", "is_effective"
+    )
+    request_states = {
+        contact_id: _request_state(action_date, is_effective)
+        for contact_id, action_date, is_effective in requests
+    }
+    contacts = {
+        entity_id: ContactStanding(
+            standing=standings.get(entity_id),
+            labels=tuple(labels.get(entity_id, [])),
+            request_state=request_states.get(entity_id),
+        )
+        for entity_id in standings.keys() | request_states.keys()
+    }
+    logger.debug(
+        "Loaded standings index for contact set %s with %d entities",
+        contact_set_id,
+        len(contacts),
+    )
+    return _StandingsIndex(
+        contact_set_id=contact_set_id,
+        requests_version=requests_version,
+        contacts=contacts,
+    )
+
+
+def _request_state(action_date, is_effective: bool) -> str:
+    if is_effective:
+        return RequestState.EFFECTIVE
+    if action_date:
+        return RequestState.ACTIONED
+    return RequestState.PENDING
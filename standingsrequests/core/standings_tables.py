@@ -0,0 +1,385 @@
+"""Data of the tables on the standings page.
+
+The data is composed from contact snapshots and cached in the standings cache.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from django.db import models
+from django.http import QueryDict
+from eveuniverse.models import EveEntity
+
+from standingsrequests.app_settings import SR_PAGE_CACHE_SECONDS
+from standingsrequests.helpers import standings_cache
+from standingsrequests.helpers.datatables import (
+    DataTablesColumn,
+    DataTablesServerSide,
+    filter_options,
+)
+from standingsrequests.helpers.icon_labels import IconLabelRenderer
+from standingsrequests.models import ContactSnapshot
+
+
+def _owner_columns() -> List[DataTablesColumn]:
+    return [
+        DataTablesColumn("main_character_html", "main_character_name"),
+        DataTablesColumn("state", "state_name"),
+        DataTablesColumn("main_character_name", "main_character_name"),
+    ]
+
+
+def _character_columns(show_mains: bool) -> List[DataTablesColumn]:
+    columns = [
+        DataTablesColumn("character_name_html", "name"),
+        DataTablesColumn("corporation_name", "corporation_name"),
+        DataTablesColumn("alliance_name", "alliance_name"),
+        DataTablesColumn("faction_name", "faction_name"),
+        DataTablesColumn("standing", "standing", numeric=True),
+        DataTablesColumn("labels_str", "labels_str"),
+    ]
+    if show_mains:
+        columns += _owner_columns()
+    return columns
+
+
+def _character_row(
+    snapshot: ContactSnapshot, show_mains: bool, renderer: IconLabelRenderer
+) -> dict:
+    character_name_html = renderer.entity_label(
+        snapshot.contact_id, EveEntity.CATEGORY_CHARACTER, snapshot.name
+    )
+    if show_mains:
+        main_character_name, main_character_html, state = _identify_owner(
+            snapshot, renderer
+        )
+    else:
+        state = main_character_name = main_character_html = ""
+    return {
+        "character_id": snapshot.contact_id,
+        "character_name_html": {
+            "display": character_name_html,
+            "sort": snapshot.name,
+        },
+        "corporation_name": _name_or_unknown(snapshot.corporation_name),
+        "alliance_name": _name_or_unknown(snapshot.alliance_name),
+        "faction_name": _name_or_unknown(snapshot.faction_name),
+        "standing": snapshot.standing if snapshot.standing else "",
+        "labels_str": snapshot.labels_str,
+        "main_character_name": main_character_name,
+        "main_character_html": {
+            "display": main_character_html,
+            "sort": main_character_name,
+        },
+        "state": state,
+    }
+
+
+def _character_compact_row(snapshot: ContactSnapshot, show_mains: bool) -> list:
+    return [
+        snapshot.contact_id,
+        snapshot.name,
+        _name_or_unknown(snapshot.corporation_name),
+        _name_or_unknown(snapshot.alliance_name),
+        _name_or_unknown(snapshot.faction_name),
+        snapshot.standing if snapshot.standing else "",
+        snapshot.labels_str,
+        *_compact_owner(snapshot, show_mains),
+    ]
+
+
+def _corporation_columns(show_mains: bool) -> List[DataTablesColumn]:
+    columns = [
+        DataTablesColumn("corporation_html", "name"),
+        DataTablesColumn("alliance_name", "alliance_name"),
+        DataTablesColumn("faction_name", "faction_name"),
+        DataTablesColumn("standing", "standing", numeric=True),
+        DataTablesColumn("labels_str", "labels_str"),
+    ]
+    if show_mains:
+        columns += _owner_columns()
+    return columns
+
+
+def _corporation_row(
+    snapshot: ContactSnapshot, show_mains: bool, renderer: IconLabelRenderer
+) -> dict:
+    if show_mains:
+        main_character_name, main_character_html, state_name = _identify_owner(
+            snapshot, renderer
+        )
+    else:
+        main_character_name = main_character_html = state_name = ""
+    corporation_html = renderer.entity_label(
+        snapshot.contact_id, EveEntity.CATEGORY_CORPORATION, snapshot.name
+    )
+    return {
+        "corporation_id": snapshot.contact_id,
+        "corporation_html": {
+            "display": corporation_html,
+            "sort": snapshot.name,
+        },
+        "alliance_name": _name_or_unknown(snapshot.alliance_name),
+        "faction_name": _name_or_unknown(snapshot.faction_name),
+        "standing": snapshot.standing,
+        "labels_str": snapshot.labels_str,
+        "state": state_name,
+        "main_character_name": main_character_name,
+        "main_character_html": {
+            "display": main_character_html,
+            "sort": main_character_name,
+        },
+    }
+
+
+def _corporation_compact_row(snapshot: ContactSnapshot, show_mains: bool) -> list:
+    return [
+        snapshot.contact_id,
+        snapshot.name,
+        _name_or_unknown(snapshot.alliance_name),
+        _name_or_unknown(snapshot.faction_name),
+        snapshot.standing,
+        snapshot.labels_str,
+        *_compact_owner(snapshot, show_mains),
+    ]
+
+
+ALLIANCE_COLUMNS = [
+    DataTablesColumn("alliance_html", "name"),
+    DataTablesColumn("standing", "standing", numeric=True),
+    DataTablesColumn("labels_str", "labels_str"),
+]
+
+
+def _alliance_row(
+    snapshot: ContactSnapshot, show_mains: bool, renderer: IconLabelRenderer
+) -> dict:
+    alliance_html = renderer.entity_label(
+        snapshot.contact_id, EveEntity.CATEGORY_ALLIANCE, snapshot.name
+    )
+    return {
+        "alliance_id": snapshot.contact_id,
+        "alliance_html": {
+            "display": alliance_html,
+            "sort": snapshot.name,
+        },
+        "standing": snapshot.standing,
+        "labels_str": snapshot.labels_str,
+    }
+
+
+def _alliance_compact_row(snapshot: ContactSnapshot, show_mains: bool) -> list:
+    return [snapshot.contact_id, snapshot.name, snapshot.standing, snapshot.labels_str]
+
+
+COMPACT_OWNER_COLUMNS = [
+    "main_character_id",
+    "main_character_name",
+    "main_character_ticker",
+    "state",
+]
+
+
+def _compact_owner(snapshot: ContactSnapshot, show_mains: bool) -> list:
+    """Return owner columns of a compact row.
+    The label of the main is rendered by the client from these columns.
+    """
+    if not show_mains:
+        return [None, "", "", ""]
+    if not snapshot.has_owner:
+        return [None, "-", "", "-"]
+    state_name = snapshot.state_name or "-"
+    if not snapshot.main_character_id:
+        return [None, "-", "", state_name]
+    return [
+        snapshot.main_character_id,
+        snapshot.main_character_name,
+        snapshot.main_character_ticker,
+        state_name,
+    ]
+
+
+@dataclass(frozen=True)
+class StandingsTable:
+    """A table on the standings page."""
+
+    name: str
+    category: str
+    columns: Callable[[bool], List[DataTablesColumn]]
+    make_row: Callable[[ContactSnapshot, bool, IconLabelRenderer], dict]
+    compact_columns: List[str]
+    make_compact_row: Callable[[ContactSnapshot, bool], list]
+    has_owners: bool = True
+
+    def snapshots(self) -> models.QuerySet:
+        return ContactSnapshot.objects.filter(category=self.category)
+
+
+CHARACTER_TABLE = StandingsTable(
+    "characters",
+    EveEntity.CATEGORY_CHARACTER,
+    _character_columns,
+    _character_row,
+    [
+        "character_id",
+        "name",
+        "corporation_name",
+        "alliance_name",
+        "faction_name",
+        "standing",
+        "labels_str",
+    ]
+    + COMPACT_OWNER_COLUMNS,
+    _character_compact_row,
+)
+CORPORATION_TABLE = StandingsTable(
+    "corporations",
+    EveEntity.CATEGORY_CORPORATION,
+    _corporation_columns,
+    _corporation_row,
+    [
+        "corporation_id",
+        "name",
+        "alliance_name",
+        "faction_name",
+        "standing",
+        "labels_str",
+    ]
+    + COMPACT_OWNER_COLUMNS,
+    _corporation_compact_row,
+)
+ALLIANCE_TABLE = StandingsTable(
+    "alliances",
+    EveEntity.CATEGORY_ALLIANCE,
+    lambda show_mains: ALLIANCE_COLUMNS,
+    _alliance_row,
+    ["alliance_id", "name", "standing", "labels_str"],
+    _alliance_compact_row,
+    has_owners=False,
+)
+
+
+def table_data(table: StandingsTable, params: QueryDict, show_mains: bool) -> dict:
+    """Return the data of a standings table as requested by the standings page.
+
+    The data is served from the standings cache when possible.
+    Rows are returned as arrays with the column names sent once,
+    when the compact format is requested.
+    """
+    is_compact = params.get("format") == "compact"
+    name = f"{table.name}_compact" if is_compact else table.name
+    if not DataTablesServerSide.is_requested(params):
+        return standings_cache.get_or_build(
+            name,
+            show_mains,
+            "all",
+            lambda: table_rows(
+                table, table.snapshots().order_by("name"), show_mains, is_compact
+            ),
+        )
+
+    server_side = DataTablesServerSide(table.columns(show_mains), params)
+
+    def build_page() -> dict:
+        snapshots_qs, records_total, records_filtered = server_side.process(
+            table.snapshots()
+        )
+        data = table_rows(table, snapshots_qs, show_mains, is_compact)
+        return {
+            **data,
+            **server_side.response_data(data["data"], records_total, records_filtered),
+        }
+
+    # only the initial pages are requested by everyone. Pages of other states,
+    # e.g. searches, are cached briefly to not fill up the cache with them.
+    state = server_side.state()
+    if state == _initial_state(table, show_mains):
+        timeout = standings_cache.DATA_TIMEOUT
+    else:
+        timeout = SR_PAGE_CACHE_SECONDS
+    data = standings_cache.get_or_build(name, show_mains, state, build_page, timeout)
+    return {"draw": server_side.draw, **data}
+
+
+def _initial_state(table: StandingsTable, show_mains: bool) -> tuple:
+    columns = table.columns(show_mains)
+    return DataTablesServerSide(
+        columns, DataTablesServerSide.initial_params(columns)
+    ).state()
+
+
+def table_rows(
+    table: StandingsTable,
+    snapshots_qs: models.QuerySet,
+    show_mains: bool,
+    is_compact: bool,
+) -> dict:
+    if is_compact:
+        return {
+            "columns": table.compact_columns,
+            "data": [
+                table.make_compact_row(snapshot, show_mains)
+                for snapshot in snapshots_qs
+            ],
+        }
+
+    renderer = IconLabelRenderer()
+    return {
+        "data": [
+            table.make_row(snapshot, show_mains, renderer) for snapshot in snapshots_qs
+        ]
+    }
+
+
+def filter_options_data(
+    table: StandingsTable, params: QueryDict, show_mains: bool
+) -> dict:
+    """Return the filter options of a standings table.
+
+    The options are served from the standings cache when possible.
+    """
+    column_names = tuple(params.get("columns", "").split(","))
+    return standings_cache.get_or_build(
+        f"{table.name}_filter_options",
+        show_mains,
+        column_names,
+        lambda: filter_options(
+            table.snapshots(), table.columns(show_mains), column_names
+        ),
+    )
+
+
+def warm_cache() -> None:
+    """Pre-render the initial data of all standings tables
+    for all permission levels into the standings cache.
+
+    The data is rendered in the compact format as requested by the standings page.
+    """
+    for table in (CHARACTER_TABLE, CORPORATION_TABLE, ALLIANCE_TABLE):
+        for show_mains in {False, table.has_owners}:
+            params = DataTablesServerSide.initial_params(table.columns(show_mains))
+            params["format"] = "compact"
+            table_data(table, params, show_mains)
+
+
+def _identify_owner(snapshot: ContactSnapshot, renderer: IconLabelRenderer):
+    """Identify main and state of the user owning a character
+    or requesting standing for a corporation.
+    """
+    if not snapshot.has_owner:
+        return "-", "-", "-"
+
+    state_name = snapshot.state_name or "-"
+    if not snapshot.main_character_id:
+        return "-", "-", state_name
+
+    main_character_html = renderer.entity_label(
+        snapshot.main_character_id,
+        EveEntity.CATEGORY_CHARACTER,
+        f"[{snapshot.main_character_ticker}] {snapshot.main_character_name}",
+    )
+    return snapshot.main_character_name, main_character_html, state_name
+
+
+def _name_or_unknown(name: Optional[str]) -> str:
+    return name if name is not None else "?"
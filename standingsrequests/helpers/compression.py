@@ -0,0 +1,63 @@
+"""Compression of responses negotiated with the client.
+
+Brotli is used when the optional package ``brotli`` is installed
+and the client accepts it. Otherwise responses are compressed with gzip.
+"""
+
+import re
+from functools import wraps
+
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 200  # bytes, smaller responses are not worth compressing
+
+_ACCEPTS_BROTLI = re.compile(r"\bbr\b")
+_ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+def compress_response(view_func):
+    """Decorator for views, which compresses the response with Brotli or gzip
+    depending on what the client accepts.
+    """
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if (
+            response.streaming
+            or response.status_code != 200
+            or response.has_header("Content-Encoding")
+            or len(response.content) < MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli and _ACCEPTS_BROTLI.search(accept_encoding):
+            content = brotli.compress(response.content)
+            encoding = "br"
+        elif _ACCEPTS_GZIP.search(accept_encoding):
+            content = compress_string(response.content)
+            encoding = "gzip"
+        else:
+            return response
+
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        response["Content-Encoding"] = encoding
+        # the content changes with the encoding, so a strong ETag must be weakened
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+    return _wrapped_view
@@ -0,0 +1,229 @@
+"""Server-side processing for DataTables.
+
+Paging, search and ordering requested by a DataTables table are applied
+to a Django queryset, so that they are executed in the database.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import models
+from django.db.models import Q
+from django.http import QueryDict
+
+MAX_PAGE_LENGTH = 1000
+DEFAULT_PAGE_LENGTH = 10
+
+_EXACT_REGEX = re.compile(r"^\^(.*)\$$", re.DOTALL)
+_ESCAPED_CHAR = re.compile(r"\\(.)")
+
+
+@dataclass(frozen=True)
+class DataTablesColumn:
+    """A column of a DataTables table mapped to a field of a queryset.
+
+    Args:
+    - name: Name of the column as in the ``data`` property of the column
+    - field: Lookup of the field used to search and order this column
+    - searchable: Whether this column can be searched
+    - orderable: Whether this column can be ordered
+    - numeric: Whether the field is numeric. Numeric columns only match exactly.
+    """
+
+    name: str
+    field: str
+    searchable: bool = True
+    orderable: bool = True
+    numeric: bool = False
+
+    def search_query(self, value: str, exact: bool) -> Q:
+        """Return query to search this column for a value."""
+        if self.numeric:
+            try:
+                return Q(**{self.field: float(value)})
+            except ValueError:
+                return Q(pk__in=[])
+
+        lookup = "iexact" if exact else "icontains"
+        return Q(**{f"{self.field}__{lookup}": value})
+
+
+class DataTablesServerSide:
+    """Applies the parameters of a DataTables server-side request to a queryset."""
+
+    def __init__(self, columns: Iterable[DataTablesColumn], params: QueryDict) -> None:
+        self._columns = {column.name: column for column in columns}
+        self._params = params
+
+    @staticmethod
+    def is_requested(params: QueryDict) -> bool:
+        """Return True if the parameters are from a server-side request."""
+        return "draw" in params
+
+    @property
+    def draw(self) -> int:
+        return _to_int(self._params.get("draw"), 0)
+
+    def process(self, queryset: models.QuerySet) -> Tuple[models.QuerySet, int, int]:
+        """Apply paging, search and ordering to a queryset.
+
+        Returns the queryset for the current page,
+        the total number of records and the number of records after filtering.
+        """
+        records_total = queryset.count()
+        query = self._search_query()
+        if query:
+            # filtering by pk avoids duplicates from multi-valued relations
+            queryset = queryset.filter(pk__in=queryset.filter(query).values("pk"))
+            records_filtered = queryset.count()
+        else:
+            records_filtered = records_total
+
+        queryset = queryset.order_by(*self._ordering(), "pk")
+        start, length = self._page()
+        return queryset[start : start + length], records_total, records_filtered
+
+    def state(self) -> tuple:
+        """Return the effective state of the requested table, e.g. for cache keys.
+
+        Requests for the same page, search and ordering have the same state.
+        Parameters without effect on the result like ``draw`` are not included.
+        """
+        return (*self._page(), str(self._search_query()), tuple(self._ordering()))
+
+    @staticmethod
+    def response_data(
+        data: List[dict], records_total: int, records_filtered: int
+    ) -> dict:
+        """Return the data for a response to DataTables.
+
+        The draw counter is specific for each request and must be added.
+        """
+        return {
+            "recordsTotal": records_total,
+            "recordsFiltered": records_filtered,
+            "data": data,
+        }
+
+    @staticmethod
+    def initial_params(
+        columns: Iterable[DataTablesColumn],
+        order: Iterable[Tuple[int, str]] = ((0, "asc"),),
+        length: int = DEFAULT_PAGE_LENGTH,
+    ) -> QueryDict:
+        """Return the parameters of the initial request of a table
+        without any search, e.g. for pre-rendering it.
+        """
+        params = QueryDict(mutable=True)
+        params.update({"draw": "1", "start": "0", "length": str(length)})
+        for idx, column in enumerate(columns):
+            params[f"columns[{idx}][data]"] = column.name
+        for idx, (column_idx, direction) in enumerate(order):
+            params[f"order[{idx}][column]"] = str(column_idx)
+            params[f"order[{idx}][dir]"] = direction
+        return params
+
+    def _page(self) -> Tuple[int, int]:
+        start = max(_to_int(self._params.get("start"), 0), 0)
+        length = _to_int(self._params.get("length"), DEFAULT_PAGE_LENGTH)
+        if length < 0 or length > MAX_PAGE_LENGTH:
+            length = MAX_PAGE_LENGTH
+        return start, length
+
+    def _requested_columns(self) -> List[Tuple[int, Optional[DataTablesColumn]]]:
+        result = []
+        idx = 0
+        while f"columns[{idx}][data]" in self._params:
+            name = self._params.get(f"columns[{idx}][data]")
+            result.append((idx, self._columns.get(name)))
+            idx += 1
+        return result
+
+    def _search_query(self) -> Optional[Q]:
+        query = None
+        global_value = self._params.get("search[value]", "").strip()
+        if global_value:
+            global_query = Q()
+            for idx, column in self._requested_columns():
+                if self._is_searchable(idx, column) and not column.numeric:
+                    global_query |= column.search_query(global_value, exact=False)
+            if global_query:
+                query = global_query
+            else:
+                query = Q(pk__in=[])
+
+        for idx, column in self._requested_columns():
+            value = self._params.get(f"columns[{idx}][search][value]", "")
+            if not value or not self._is_searchable(idx, column):
+                continue
+            is_regex = self._params.get(f"columns[{idx}][search][regex]") == "true"
+            value, exact = _parse_search_value(value, is_regex)
+            column_query = column.search_query(value, exact)
+            query = column_query if query is None else query & column_query
+
+        return query
+
+    def _is_searchable(self, idx: int, column: Optional[DataTablesColumn]) -> bool:
+        return (
+            column is not None
+            and column.searchable
+            and self._params.get(f"columns[{idx}][searchable]", "true") == "true"
+        )
+
+    def _ordering(self) -> List[str]:
+        columns = dict(self._requested_columns())
+        ordering = []
+        idx = 0
+        while f"order[{idx}][column]" in self._params:
+            column = columns.get(_to_int(self._params.get(f"order[{idx}][column]")))
+            if column and column.orderable:
+                direction = self._params.get(f"order[{idx}][dir]")
+                prefix = "-" if direction == "desc" else ""
+                ordering.append(f"{prefix}{column.field}")
+            idx += 1
+        return ordering
+
+
+def filter_options(
+    queryset: models.QuerySet,
+    columns: Iterable[DataTablesColumn],
+    column_names: Iterable[str],
+) -> Dict[str, list]:
+    """Return the distinct values of the requested columns,
+    e.g. for the options of drop down filters.
+    """
+    columns_map = {column.name: column for column in columns}
+    result = {}
+    for name in column_names:
+        try:
+            column = columns_map[name]
+        except KeyError:
+            continue
+        result[name] = list(
+            queryset.exclude(**{f"{column.field}__isnull": True})
+            .order_by(column.field)
+            .values_list(column.field, flat=True)
+            .distinct()
+        )
+    return result
+
+
+def _parse_search_value(value: str, is_regex: bool) -> Tuple[str, bool]:
+    """Parse a search value and return it with a flag for exact matches.
+
+    Only the regex for exact matches as created by filterDropDown is supported,
+    all other values are searched as they are.
+    """
+    if is_regex:
+        match = _EXACT_REGEX.match(value)
+        if match:
+            return _ESCAPED_CHAR.sub(r"\1", match.group(1)), True
+    return value, False
+
+
+def _to_int(value, default: Optional[int] = None) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,164 @@
+"""Engine for fetching many objects from ESI concurrently."""
+
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterable, Optional, TypeVar
+
+from django.core.cache import cache
+from django.db import connections
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from standingsrequests import __title__
+from standingsrequests.app_settings import SR_ESI_MAX_CONCURRENCY
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_NO_MORE_KEYS = object()
+
+
+def fetch_many(
+    func: Callable[[K], V],
+    keys: Iterable[K],
+    max_concurrency: Optional[int] = None,
+) -> Dict[K, V]:
+    """Call func for every key concurrently and return the results by key.
+
+    Since the ESI client is synchronous, the calls are run on a thread pool,
+    which is shared between all invocations, so that threads
+    and the connections of the ESI client are reused.
+    Each invocation has at most ``max_concurrency`` calls in flight,
+    which can not exceed ``SR_ESI_MAX_CONCURRENCY``.
+    The total number of calls in flight is also limited by the size of the pool.
+
+    Must not be called from func, i.e. from within the pool.
+
+    Exceptions raised by func are propagated to the caller.
+    """
+    keys_unique = list(dict.fromkeys(keys))
+    if not keys_unique:
+        return {}
+
+    max_concurrency = min(
+        max_concurrency or SR_ESI_MAX_CONCURRENCY, SR_ESI_MAX_CONCURRENCY
+    )
+    logger.debug(
+        "Fetching %d objects with a concurrency of %d",
+        len(keys_unique),
+        max_concurrency,
+    )
+    executor = _shared_executor()
+    keys_iter = iter(keys_unique)
+    in_flight: Dict[Future, K] = {}
+    results = {}
+    try:
+        while True:
+            while len(in_flight) < max_concurrency:
+                key = next(keys_iter, _NO_MORE_KEYS)
+                if key is _NO_MORE_KEYS:
+                    break
+                in_flight[executor.submit(_call_in_worker, func, key)] = key
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[in_flight.pop(future)] = future.result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+    return {key: results[key] for key in keys_unique}
+
+
+def _call_in_worker(func: Callable[[K], V], key: K) -> V:
+    try:
+        return func(key)
+    finally:
+        # workers are long lived, so we must not keep DB connections open
+        connections.close_all()
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by all fetches. Create it on first use."""
+    global _executor  # pylint: disable = global-statement
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SR_ESI_MAX_CONCURRENCY,
+                    thread_name_prefix="standingsrequests_esi",
+                )
+    return _executor
+
+
+class SingleFlight:
+    """De-duplicates concurrent work for the same key.
+
+    Only one caller at a time can hold the flight for a key.
+    Threads of the same process wait on a local lock,
+    other processes wait on a lock in the Django cache.
+    Callers should re-check their cache once they got the flight,
+    because another caller might have just completed the work.
+    """
+
+    POLL_INTERVAL = 0.1  # seconds
+
+    def __init__(self, name: str, timeout: int = 10) -> None:
+        """
+        Params:
+        - name: Unique name used for the locks in the cache
+        - timeout: Max seconds a lock is held in the cache and waited for
+        """
+        self.name = name
+        self.timeout = timeout
+        self._locks: Dict[Hashable, list] = {}
+        self._locks_lock = threading.Lock()
+
+    @contextmanager
+    def flight(self, key: Hashable):
+        """Context manager for doing the work for key as the only caller."""
+        with self._thread_lock(key):
+            with self._process_lock(key):
+                yield
+
+    @contextmanager
+    def _thread_lock(self, key: Hashable):
+        with self._locks_lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    @contextmanager
+    def _process_lock(self, key: Hashable):
+        lock_key = f"{self.name}_LOCK_{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.timeout
+        acquired = cache.add(lock_key, token, self.timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            acquired = cache.add(lock_key, token, self.timeout)
+        if not acquired:
+            logger.warning("Timeout while waiting for lock %s", lock_key)
+        try:
+            yield
+        finally:
+            # the lock might have expired and been acquired by another caller
+            if acquired and cache.get(lock_key) == token:
+                cache.delete(lock_key)
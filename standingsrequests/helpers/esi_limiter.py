@@ -0,0 +1,109 @@
+"""Global rate limiter and error budget guard for all requests to ESI.
+
+The state is kept in the Django cache, so it is shared between all processes,
+e.g. web workers and celery workers.
+"""
+
+import time
+from typing import Mapping, Optional
+
+from requests.adapters import HTTPAdapter
+
+from django.core.cache import cache
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from standingsrequests import __title__
+from standingsrequests.app_settings import (
+    SR_ESI_ERROR_LIMIT_THRESHOLD,
+    SR_ESI_MAX_REQUESTS_PER_SECOND,
+)
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+CACHE_KEY_RATE = "STANDINGS_REQUESTS_ESI_RATE_"
+CACHE_KEY_ERROR_LIMIT = "STANDINGS_REQUESTS_ESI_ERROR_LIMIT"
+ERROR_LIMIT_WINDOW = 60  # seconds, max time until ESI resets the error limit
+
+
+def wait_for_permit() -> None:
+    """Block until a new request to ESI is permitted.
+
+    Waits until the error limit is reset when the remaining error budget is low
+    and until a slot is available within the request rate.
+    """
+    seconds = seconds_until_error_limit_reset()
+    if seconds:
+        logger.warning(
+            "ESI error budget is low. Waiting %.1f seconds until it is reset.",
+            seconds,
+        )
+        time.sleep(seconds)
+
+    _acquire_rate_slot()
+
+
+def seconds_until_error_limit_reset() -> float:
+    """Return seconds until ESI resets the error limit,
+    when the remaining error budget is low. Else return 0.
+    """
+    error_limit = cache.get(CACHE_KEY_ERROR_LIMIT)
+    if not error_limit or error_limit["remain"] >= SR_ESI_ERROR_LIMIT_THRESHOLD:
+        return 0
+
+    return max(0, min(error_limit["reset_at"] - time.time(), ERROR_LIMIT_WINDOW))
+
+
+def record_response_headers(headers: Mapping[str, str]) -> None:
+    """Record the remaining error budget from the headers of an ESI response."""
+    remain = _int_or_none(headers.get("X-Esi-Error-Limit-Remain"))
+    reset = _int_or_none(headers.get("X-Esi-Error-Limit-Reset"))
+    if remain is None or reset is None:
+        return
+
+    cache.set(
+        CACHE_KEY_ERROR_LIMIT,
+        {"remain": remain, "reset_at": time.time() + reset},
+        timeout=max(reset, 1),
+    )
+    if remain < SR_ESI_ERROR_LIMIT_THRESHOLD:
+        logger.warning(
+            "ESI error budget is low: %d errors remaining, reset in %d seconds",
+            remain,
+            reset,
+        )
+
+
+def _acquire_rate_slot() -> None:
+    """Block until a slot within the current one second window is available."""
+    while True:
+        now = time.time()
+        key = f"{CACHE_KEY_RATE}{int(now)}"
+        cache.add(key, 0, timeout=2)
+        try:
+            count = cache.incr(key)
+        except ValueError:  # key expired in the meantime
+            continue
+
+        if count <= SR_ESI_MAX_REQUESTS_PER_SECOND:
+            return
+
+        time.sleep(int(now) + 1 - now)
+
+
+def _int_or_none(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitedHTTPAdapter(HTTPAdapter):
+    """A HTTP adapter which sends all requests through the ESI limiter."""
+
+    def send(self, request, *args, **kwargs):  # pylint: disable = arguments-differ
+        wait_for_permit()
+        response = super().send(request, *args, **kwargs)
+        record_response_headers(response.headers)
+        return response
@@ -1,41 +1,73 @@
+from typing import Dict, Iterable, Optional
+
 from allianceauth.eveonline.evelinks import eveimageserver
 
 from standingsrequests.constants import DEFAULT_IMAGE_SIZE
 from standingsrequests.models import CharacterAffiliation
 
 
-class EveCharacterHelper:
-    """A character object mimicking Alliance Auth's EveCharacter,
-    but with internal standings tool data instead.
+class CharacterAffiliationInfo:
+    """A lightweight record mimicking Alliance Auth's EveCharacter
+    with the affiliation of a character, which is not known to Auth.
     """
 
+    __slots__ = (
+        "character_id",
+        "character_name",
+        "corporation_id",
+        "corporation_name",
+        "alliance_id",
+        "alliance_name",
+    )
+
     corporation_ticker = None  # Not implemented
 
-    user = None
-
-    def __init__(self, character_id):
-        self.character_id = int(character_id)
-        self.alliance_name = None
-        try:
-            assoc = CharacterAffiliation.objects.select_related(
-                "character", "corporation", "alliance"
-            ).get(character_id=self.character_id)
-        except CharacterAffiliation.DoesNotExist:
-            assoc = None
-            self.corporation_id = None
-            self.corporation_name = None
-            self.alliance_id = None
-        else:
-            self.corporation_id = assoc.corporation_id
-            self.alliance_id = assoc.alliance_id
-
-        self.character_name = (
-            assoc.character.name if assoc and assoc.character else None
-        )
-        self.corporation_name = (
-            assoc.corporation.name if assoc and assoc.corporation else None
-        )
-        self.alliance_name = assoc.alliance.name if assoc and assoc.alliance else None
+    def __init__(
+        self,
+        character_id: int,
+        character_name: Optional[str] = None,
+        corporation_id: Optional[int] = None,
+        corporation_name: Optional[str] = None,
+        alliance_id: Optional[int] = None,
+        alliance_name: Optional[str] = None,
+    ) -> None:
+        self.character_id = character_id
+        self.character_name = character_name
+        self.corporation_id = corporation_id
+        self.corporation_name = corporation_name
+        self.alliance_id = alliance_id
+        self.alliance_name = alliance_name
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(character_id={self.character_id})"
 
     def portrait_url(self, size: int = DEFAULT_IMAGE_SIZE) -> str:
         return eveimageserver.character_portrait_url(self.character_id, size)
+
+    @classmethod
+    def preload(
+        cls, character_ids: Iterable[int]
+    ) -> Dict[int, "CharacterAffiliationInfo"]:
+        """Load the affiliations for the given characters with one query.
+
+        Characters without affiliation are included with empty data.
+        """
+        character_ids = set(character_ids)
+        if not character_ids:
+            return {}
+
+        rows = CharacterAffiliation.objects.filter(
+            character_id__in=character_ids
+        ).values_list(
+            "character_id",
+            "character__name",
+            "corporation_id",
+            "corporation__name",
+            "alliance_id",
+            "alliance__name",
+        )
+        result = {row[0]: cls(*row) for row in rows}
+        for character_id in character_ids - set(result.keys()):
+            result[character_id] = cls(character_id)
+
+        return result
@@ -1,10 +1,13 @@
-from concurrent.futures import ThreadPoolExecutor
-from typing import Iterable, List, Optional
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from bravado.exception import HTTPError
+from bravado.exception import HTTPError, HTTPNotFound
 
 from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count
+from esi.models import Token
 from eveuniverse.models import EveEntity
 
 from allianceauth.eveonline.evelinks import eveimageserver
@@ -14,16 +17,18 @@ from app_utils.logging import LoggerAddTag
 
 from standingsrequests import __title__
 from standingsrequests.constants import DEFAULT_IMAGE_SIZE
+from standingsrequests.helpers.esi_fetcher import SingleFlight, fetch_many
 from standingsrequests.providers import esi
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
-MAX_WORKERS = 10
-
 
 class EveCorporation:
     CACHE_PREFIX = "STANDINGS_REQUESTS_EVECORPORATION_"
     CACHE_TIME = 60 * 60  # 60 minutes
+    CACHE_TIME_NOT_FOUND = 60 * 5  # 5 minutes
+
+    _single_flight = SingleFlight(CACHE_PREFIX)
 
     def __init__(self, **kwargs):
         self.corporation_id = int(kwargs.get("corporation_id", 0))
@@ -72,22 +77,88 @@ class EveCorporation:
         - user: user owning the characters
         - quick: if True will not check if tokens are valid to save time
         """
-        from standingsrequests.models import StandingRequest
+        counts = self.member_tokens_counts_for_user(
+            user=user, corporation_ids=[self.corporation_id], quick_check=quick_check
+        )
+        return counts.get(self.corporation_id, 0)
+
+    @classmethod
+    def member_tokens_counts_for_user(
+        cls, user: User, corporation_ids: Iterable[int], quick_check: bool = False
+    ) -> Dict[int, int]:
+        """returns the number of character tokens the given user owns
+        for each of the given corporations
+
+        The counts are aggregated by the database with a single query.
+        Corporations without any tokens are omitted.
 
-        corporation_members = (
-            EveCharacter.objects.filter(character_ownership__user=user)
-            .select_related("character_ownership__user__profile__state")
-            .filter(corporation_id=self.corporation_id)
+        Params:
+        - user: user owning the characters
+        - corporation_ids: IDs of the corporations to count tokens for
+        - quick: if True will not check if tokens are valid to save time
+        """
+        counts = cls.member_tokens_counts_for_users(
+            users=[user], corporation_ids=corporation_ids, quick_check=quick_check
         )
+        return {
+            corporation_id: tokens_count
+            for (_, corporation_id), tokens_count in counts.items()
+        }
+
+    @staticmethod
+    def member_tokens_counts_for_users(
+        users: Iterable[User], corporation_ids: Iterable[int], quick_check: bool = False
+    ) -> Dict[Tuple[int, int], int]:
+        """returns the number of character tokens each of the given users owns
+        for each of the given corporations
+
+        The counts are aggregated by the database with a single query per state.
+        Results are keyed by user ID and corporation ID.
+        Combinations without any tokens are omitted.
+
+        Params:
+        - users: users owning the characters
+        - corporation_ids: IDs of the corporations to count tokens for
+        - quick: if True will not check if tokens are valid to save time
+        """
+        from standingsrequests.models import StandingRequest
 
-        return sum(
-            1
-            if StandingRequest.has_required_scopes_for_request(
-                character=character, user=user, quick_check=quick_check
+        user_ids_by_state = defaultdict(set)
+        for user in users:
+            if not user:
+                continue
+            try:
+                state_name = user.profile.state.name
+            except ObjectDoesNotExist:
+                continue
+            user_ids_by_state[state_name].add(user.pk)
+
+        corporation_ids = list(corporation_ids)
+        result = {}
+        for state_name, user_ids in user_ids_by_state.items():
+            corporation_members = EveCharacter.objects.filter(
+                character_ownership__user_id__in=user_ids,
+                corporation_id__in=corporation_ids,
             )
-            else 0
-            for character in corporation_members
-        )
+            token_qs = StandingRequest.filter_tokens_with_required_scopes(
+                Token.objects.filter(
+                    character_id__in=corporation_members.values("character_id")
+                ),
+                state_name=state_name,
+                quick_check=quick_check,
+            )
+            counts_qs = (
+                corporation_members.filter(
+                    character_id__in=token_qs.values("character_id")
+                )
+                .values("character_ownership__user_id", "corporation_id")
+                .annotate(tokens_count=Count("pk"))
+            )
+            for obj in counts_qs:
+                key = (obj["character_ownership__user_id"], obj["corporation_id"])
+                result[key] = obj["tokens_count"]
+
+        return result
 
     def user_has_all_member_tokens(self, user: User, quick_check: bool = False) -> bool:
         """returns True if given user owns same amount of token than there are
@@ -108,7 +179,10 @@ class EveCorporation:
         cls, corporation_id: int, ignore_cache: bool = False
     ) -> Optional["EveCorporation"]:
         """Get a corporation from the cache or ESI if not cached
-        Corps are cached for 3 hours
+        Corps are cached for 1 hour.
+        Corps not found on ESI are cached for 5 minutes.
+        Other failed fetches are not cached.
+        Concurrent fetches for the same corporation are combined into one.
 
         Params
         - corporation_id: int corporation ID to get
@@ -118,14 +192,37 @@ class EveCorporation:
         """
         logger.debug("Getting corporation by id %d", corporation_id)
         my_cache_key = cls._get_cache_key(corporation_id)
-        corporation = cache.get(my_cache_key)
-        if corporation is None or ignore_cache:
-            logger.debug("Corp not in cache or ignoring cache, fetching")
-            corporation = cls.fetch_corporation_from_api(corporation_id)
+        if not ignore_cache:
+            corporation = cache.get(my_cache_key)
             if corporation is not None:
-                cache.set(my_cache_key, corporation, cls.CACHE_TIME)
-        else:
-            logger.debug("Retrieving corporation %s from cache", corporation_id)
+                logger.debug("Retrieving corporation %s from cache", corporation_id)
+                return corporation or None
+
+        with cls._single_flight.flight(corporation_id):
+            if not ignore_cache:
+                corporation = cache.get(my_cache_key)
+                if corporation is not None:
+                    logger.debug(
+                        "Corporation %s was fetched by another caller", corporation_id
+                    )
+                    return corporation or None
+
+            logger.debug("Corp not in cache or ignoring cache, fetching")
+            try:
+                corporation = cls._fetch_corporation_from_api(corporation_id)
+            except HTTPNotFound:
+                logger.info("Corporation %s does not exist on ESI", corporation_id)
+                cache.set(my_cache_key, False, cls.CACHE_TIME_NOT_FOUND)
+                return None
+            except HTTPError:
+                # transient errors are not cached, so the next call tries again
+                logger.exception(
+                    "Failed to fetch corporation from ESI with id %i", corporation_id
+                )
+                return None
+
+            cache.set(my_cache_key, corporation, cls.CACHE_TIME)
+
         return corporation
 
     @classmethod
@@ -136,19 +233,23 @@ class EveCorporation:
     def fetch_corporation_from_api(
         cls, corporation_id: int
     ) -> Optional["EveCorporation"]:
-        logger.debug(
-            "Attempting to fetch corporation from ESI with id %s", corporation_id
-        )
         try:
-            info = esi.client.Corporation.get_corporations_corporation_id(
-                corporation_id=corporation_id
-            ).results()
+            return cls._fetch_corporation_from_api(corporation_id)
         except HTTPError:
             logger.exception(
                 "Failed to fetch corporation from ESI with id %i", corporation_id
             )
             return None
 
+    @classmethod
+    def _fetch_corporation_from_api(cls, corporation_id: int) -> "EveCorporation":
+        """Fetch a corporation from ESI. Raises HTTPError when the fetch failed."""
+        logger.debug(
+            "Attempting to fetch corporation from ESI with id %s", corporation_id
+        )
+        info = esi.client.Corporation.get_corporations_corporation_id(
+            corporation_id=corporation_id
+        ).results()
         args = {
             "corporation_id": corporation_id,
             "corporation_name": info["name"],
@@ -162,34 +263,39 @@ class EveCorporation:
 
         return cls(**args)
 
+    @classmethod
+    def from_corporation_details(cls, details) -> "EveCorporation":
+        """Create a corporation from stored corporation details without calling ESI.
+
+        Params:
+        - details: CorporationDetails object
+            with ``corporation`` and ``alliance`` selected
+        """
+        return cls(
+            corporation_id=details.corporation_id,
+            corporation_name=details.corporation.name,
+            ticker=details.ticker,
+            member_count=details.member_count,
+            ceo_id=details.ceo_id,
+            alliance_id=details.alliance_id,
+            alliance_name=details.alliance.name if details.alliance else None,
+        )
+
     @classmethod
     def get_many_by_id(cls, corporation_ids: Iterable[int]) -> List["EveCorporation"]:
         """Returns multiple corporations by ID
 
         Fetches requested corporations from cache or API as needed.
-        Uses threads to fetch them in parallel.
+        Fetches from API are done concurrently.
         """
         corporation_ids_unique = set(corporation_ids)
         if not corporation_ids_unique:
             return []
 
-        # make sure client is loaded before starting threads
+        # make sure client is loaded before starting concurrent fetches
         esi.client.Status.get_status().results()
-        logger.info(
-            "Starting to fetch the %d corporations from ESI with up to %d workers",
-            len(corporation_ids_unique),
-            MAX_WORKERS,
-        )
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(cls.get_by_id, corporation_id)
-                for corporation_id in corporation_ids_unique
-            ]
-            logger.info("Waiting for all threads fetching corporations to complete...")
-
-        logger.info(
-            "Completed fetching %d corporations from ESI", len(corporation_ids_unique)
-        )
-        results_raw = (f.result() for f in futures)
-        results = [obj for obj in results_raw if obj is not None]
+        logger.info("Starting to fetch %d corporations", len(corporation_ids_unique))
+        results_raw = fetch_many(cls.get_by_id, corporation_ids_unique)
+        logger.info("Completed fetching %d corporations", len(corporation_ids_unique))
+        results = [obj for obj in results_raw.values() if obj is not None]
         return results
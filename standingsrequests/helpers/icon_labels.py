@@ -0,0 +1,54 @@
+"""Labels with icons for Eve entities."""
+
+from django.utils.html import escape, format_html
+from django.utils.safestring import SafeString, mark_safe
+from eveuniverse.models import EveEntity
+
+from allianceauth.eveonline.evelinks import eveimageserver
+
+DEFAULT_ICON_SIZE = 32
+
+_LABEL_WITH_ICON_HTML = (
+    '<span class="text-nowrap">'
+    '<img src="{icon_url}" class="img-circle" style="width:{size}px;height:{size}px"> '
+    "{text}</span>"
+)
+
+
+def label_with_icon(icon_url: str, text: str):
+    return format_html(
+        _LABEL_WITH_ICON_HTML, icon_url=icon_url, size=DEFAULT_ICON_SIZE, text=text
+    )
+
+
+class IconLabelRenderer:
+    """Renders labels with icon for many rows of a table.
+
+    Produces the same HTML as :func:`label_with_icon`,
+    but the template is compiled once when the renderer is created.
+    Rendering a row then only needs to escape the text and fill in the template.
+    """
+
+    def __init__(self) -> None:
+        self._label_template = _LABEL_WITH_ICON_HTML.replace(
+            "{size}", str(DEFAULT_ICON_SIZE)
+        )
+        self._icon_url_builders = {
+            EveEntity.CATEGORY_ALLIANCE: eveimageserver.alliance_logo_url,
+            EveEntity.CATEGORY_CHARACTER: eveimageserver.character_portrait_url,
+            EveEntity.CATEGORY_CORPORATION: eveimageserver.corporation_logo_url,
+        }
+
+    def label(self, icon_url: str, text: str) -> SafeString:
+        """Render a label with the given icon."""
+        return mark_safe(
+            self._label_template.format(icon_url=escape(icon_url), text=escape(text))
+        )
+
+    def entity_label(self, entity_id: int, category: str, text: str) -> SafeString:
+        """Render a label with the icon of an Eve entity.
+
+        Supported categories are alliance, character and corporation.
+        """
+        icon_url = self._icon_url_builders[category](entity_id, DEFAULT_ICON_SIZE)
+        return self.label(icon_url, text)
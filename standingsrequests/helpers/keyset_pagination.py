@@ -0,0 +1,76 @@
+"""Keyset pagination of querysets.
+
+Pages are fetched by the keys of the last object of the previous page
+instead of an offset. Fetching a page is therefore equally fast for all pages
+and pages do not shift when objects of earlier pages are removed,
+e.g. after a standing request has been actioned.
+"""
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import List, Optional
+
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+
+_CURSOR_SEPARATOR = "_"
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    """A page of objects.
+
+    Args:
+    - object_ids: IDs of the objects on this page in order
+    - next_cursor: Cursor for fetching the next page or None if this is the last
+    """
+
+    object_ids: List[int]
+    next_cursor: Optional[str]
+
+
+def paginate(
+    queryset: models.QuerySet,
+    date_field: str,
+    cursor: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> KeysetPage:
+    """Return the page of a queryset ordered by a date field and pk,
+    which starts after the given cursor.
+
+    Raises ValueError when the cursor is invalid.
+    """
+    if cursor:
+        date, pk = _parse_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f"{date_field}__gt": date}) | Q(**{date_field: date, "pk__gt": pk})
+        )
+
+    rows = list(
+        queryset.order_by(date_field, "pk").values_list(date_field, "pk")[
+            : page_size + 1
+        ]
+    )
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last_date, last_pk = rows[-1]
+        next_cursor = _make_cursor(last_date, last_pk)
+    else:
+        next_cursor = None
+
+    return KeysetPage(object_ids=[pk for _, pk in rows], next_cursor=next_cursor)
+
+
+def _make_cursor(date: dt.datetime, pk: int) -> str:
+    return f"{date.isoformat()}{_CURSOR_SEPARATOR}{pk}"
+
+
+def _parse_cursor(cursor: str):
+    date_str, _, pk_str = cursor.rpartition(_CURSOR_SEPARATOR)
+    date = parse_datetime(date_str)
+    if not date:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return date, int(pk_str)
@@ -0,0 +1,83 @@
+"""Cache for the data of the standings pages.
+
+All cached data is versioned by the contact snapshots it is built from.
+The version is bumped whenever snapshots have changed,
+which invalidates all cached data at once.
+Cached data stays valid as long as the snapshots do not change.
+"""
+
+import hashlib
+import time
+from typing import Callable, Hashable
+
+from django.core.cache import cache
+
+from allianceauth.services.hooks import get_extension_logger
+from app_utils.logging import LoggerAddTag
+
+from standingsrequests import __title__
+
+logger = LoggerAddTag(get_extension_logger(__name__), __title__)
+
+CACHE_KEY_VERSION = "STANDINGS_REQUESTS_STANDINGS_VERSION"
+CACHE_KEY_DATA = "STANDINGS_REQUESTS_STANDINGS_DATA"
+
+# data of outdated versions is never read again,
+# so it only needs to expire eventually to free up the cache
+DATA_TIMEOUT = 7 * 24 * 3600  # seconds
+
+
+def current_version() -> int:
+    """Return the current version of the standings data."""
+    version = cache.get(CACHE_KEY_VERSION)
+    if version is None:
+        # the cache was cleared. Start with a version that was never used before,
+        # since there might still be cached data for older versions.
+        cache.add(CACHE_KEY_VERSION, int(time.time() * 1000), timeout=None)
+        version = cache.get(CACHE_KEY_VERSION)
+    return version
+
+
+def bump_version() -> None:
+    """Bump the version of the standings data, which invalidates all cached data."""
+    try:
+        version = cache.incr(CACHE_KEY_VERSION)
+    except ValueError:
+        version = current_version()
+    logger.debug("Standings data version bumped to %s", version)
+
+
+def etag(show_mains: bool) -> str:
+    """Return ETag for standings data of the current version and permission level."""
+    return f"{current_version()}-{int(show_mains)}"
+
+
+def get_or_build(
+    name: str,
+    show_mains: bool,
+    state: Hashable,
+    build: Callable[[], dict],
+    timeout: int = DATA_TIMEOUT,
+) -> dict:
+    """Return cached data for the current version or build and cache it.
+
+    Args:
+    - name: Name of the data, e.g. the table
+    - show_mains: Whether the data includes mains, i.e. the permission level
+    - state: State of the requested data, e.g. page, search and ordering
+    - build: Function for building the data when it is not cached
+    - timeout: Seconds to keep the data in the cache. Data is not cached when 0.
+    """
+    if not timeout:
+        return build()
+    key = _make_key(name, show_mains, state, current_version())
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=timeout)
+    return data
+
+
+def _make_key(name: str, show_mains: bool, state: Hashable, version: int) -> str:
+    state_hash = hashlib.md5(repr(state).encode("utf-8")).hexdigest()
+    return f"{CACHE_KEY_DATA}_{version}_{name}_{int(show_mains)}_{state_hash}"
@@ -1,35 +1,9 @@
-import codecs
-import csv
-from io import StringIO
+class EchoBuffer:
+    """A file-like object, which returns written values instead of storing them.
 
-
-class UnicodeWriter:
-    """
-    A CSV writer which will write rows to CSV file "f",
-    which is encoded in the given encoding.
-    Credit: https://docs.python.org/2/library/csv.html#examples
+    Used with a csv writer this allows to stream the rows of a CSV file.
+    Credit: https://docs.djangoproject.com/en/4.0/howto/outputting-csv/
     """
 
-    def __init__(self, f, dialect=csv.excel, encoding="utf-8", **kwds):
-        # Redirect output to a queue
-        self.queue = StringIO()
-        self.writer = csv.writer(self.queue, dialect=dialect, **kwds)
-        self.stream = f
-        self.encoder = codecs.getincrementalencoder(encoding)()
-
-    def writerow(self, row):
-        self.writer.writerow([s.encode("utf-8") for s in row])
-        # Fetch UTF-8 output from the queue ...
-        data = self.queue.getvalue()
-        if isinstance(data, bytes):
-            data = data.decode("utf-8")
-        # ... and reencode it into the target encoding
-        data = self.encoder.encode(data)
-        # write to the target stream
-        self.stream.write(data)
-        # empty queue
-        self.queue.truncate(0)
-
-    def writerows(self, rows):
-        for row in rows:
-            self.writerow(row)
+    def write(self, value: str) -> str:
+        return value
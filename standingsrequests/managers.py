@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Optional, Tuple
+import datetime as dt
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Tuple
 
 from bravado.exception import HTTPError
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models, transaction
-from django.db.models import Case, Q, Value, When
+from django.db.models import Case, F, Max, Q, Value, When
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from esi.models import Token
 from eveuniverse.models import EveEntity
@@ -26,10 +29,18 @@ from .app_settings import SR_NOTIFICATIONS_ENABLED
 from .constants import CreateCharacterRequestResult, OperationMode
 from .core import app_config
 from .core.contact_types import ContactTypeId
+from .helpers import standings_cache
+from .helpers.evecorporation import EveCorporation
 from .providers import esi
 
 if TYPE_CHECKING:
-    from .models import AbstractStandingsRequest, ContactSet, StandingRequest
+    from .models import (
+        AbstractStandingsRequest,
+        ContactHistory,
+        ContactLabel,
+        ContactSet,
+        StandingRequest,
+    )
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
@@ -144,6 +155,62 @@ class ContactSetManager(models.Manager):
 
         return contacts_set
 
+    def purge(self, contact_set_pk: int, chunk_size: int = 5_000) -> int:
+        """Delete a contact set with all its contacts and labels.
+
+        Rows are deleted in chunks with one short transaction per chunk,
+        without loading objects into memory.
+
+        Returns the number of deleted rows.
+        """
+        from .models import Contact, ContactLabel
+
+        started = time.monotonic()
+        deleted_count = 0
+        for model, lookup in [
+            (Contact.labels.through, "contact__contact_set_id"),
+            (Contact, "contact_set_id"),
+            (ContactLabel, "contact_set_id"),
+            (self.model, "pk"),
+        ]:
+            deleted_count += self._delete_in_chunks(
+                model.objects.filter(**{lookup: contact_set_pk}), chunk_size
+            )
+            logger.debug(
+                "Contact set %s: purged %s, %d rows deleted so far",
+                contact_set_pk,
+                model._meta.verbose_name_plural,
+                deleted_count,
+            )
+
+        duration = time.monotonic() - started
+        logger.info(
+            "Contact set %s: purged %d rows in %.1f seconds (%.0f rows / second)",
+            contact_set_pk,
+            deleted_count,
+            duration,
+            deleted_count / duration if duration else deleted_count,
+        )
+        return deleted_count
+
+    @staticmethod
+    def _delete_in_chunks(query: models.QuerySet, chunk_size: int) -> int:
+        deleted_count = 0
+        while True:
+            pks = list(query.values_list("pk", flat=True)[:chunk_size])
+            if not pks:
+                break
+            with transaction.atomic(using=query.db):
+                # raw delete skips the collector, which would load all objects
+                # to delete cascading objects and send signals.
+                # This is only safe, because no other model points to
+                # ContactSet, Contact or ContactLabel, apart from the relations
+                # purged by purge(). See TestContactSetManagerPurge.
+                deleted_count += query.model.objects.filter(pk__in=pks)._raw_delete(
+                    query.db
+                )
+        return deleted_count
+
     def _add_labels_from_api(self, contact_set: ContactSet, labels):
         """Add the list of labels to the given ContactSet
 
@@ -162,21 +229,50 @@ class ContactSetManager(models.Manager):
         """Add all contacts to the given ContactSet
         Labels _MUST_ be added before adding contacts
 
+        Duplicate contacts are dropped by the unique constraint of contacts.
+
         :param contact_set: Django ContactSet to add contacts to
         :param contacts: List of _ContactsWrapper.Contact to add
         """
         from .models import Contact
 
+        entity_ids = {contact.id for contact in contacts}
+        existing_entity_ids = set(
+            EveEntity.objects.filter(id__in=entity_ids).values_list("id", flat=True)
+        )
+        EveEntity.objects.bulk_resolve_ids(entity_ids - existing_entity_ids)
+
+        label_bits = contact_set.label_bits()
+        contact_objs = []
         for contact in contacts:
-            eve_entity, _ = EveEntity.objects.get_or_create_esi(id=contact.id)
-            obj = Contact.objects.create(
+            obj = Contact(
                 contact_set=contact_set,
-                eve_entity=eve_entity,
+                eve_entity_id=contact.id,
                 standing=contact.standing,
             )
-            flat_labels = [label.id for label in contact.labels]
-            labels = contact_set.labels.filter(label_id__in=flat_labels)
-            obj.labels.add(*labels)
+            # bulk creating the labels relation below sends no m2m_changed signal
+            obj.set_label_fields(
+                ((label.id, label.name) for label in contact.labels), label_bits
+            )
+            contact_objs.append(obj)
+        Contact.objects.bulk_create(contact_objs, batch_size=500, ignore_conflicts=True)
+        # pks of the created contacts are not returned by all databases
+        contact_pks = dict(contact_set.contacts.values_list("eve_entity_id", "pk"))
+        label_pks = dict(contact_set.labels.values_list("label_id", "pk"))
+        ContactLabelRelation = Contact.labels.through
+        ContactLabelRelation.objects.bulk_create(
+            [
+                ContactLabelRelation(
+                    contact_id=contact_pks[contact.id],
+                    contactlabel_id=label_pks[label.id],
+                )
+                for contact in contacts
+                for label in contact.labels
+                if label.id in label_pks
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
 
 
 class ContactQuerySet(models.QuerySet):
@@ -189,6 +285,17 @@ class ContactQuerySet(models.QuerySet):
     def filter_alliances(self):
         return self.filter(eve_entity__category=EveEntity.CATEGORY_ALLIANCE)
 
+    def filter_label(self, label: ContactLabel) -> models.QuerySet:
+        """Filter contacts which have the given label."""
+        label_bit = label.contact_set.label_bits().get(label.label_id)
+        if not label_bit:
+            return self.filter(labels=label)
+        return (
+            self.filter(contact_set=label.contact_set)
+            .alias(label_bit=F("label_mask").bitand(label_bit))
+            .filter(label_bit=label_bit)
+        )
+
 
 class AbstractStandingsRequestQuerySet(models.QuerySet):
     def annotate_is_pending(self) -> models.QuerySet:
@@ -209,6 +316,19 @@ class AbstractStandingsRequestQuerySet(models.QuerySet):
             )
         )
 
+    def mark_actioned(self, user: User) -> int:
+        """Mark all standing requests of this queryset as actioned by a user
+        with a single update and return how many were updated.
+        """
+        from .core import pending_counts, standings_index
+
+        updated_count = self.update(action_by=user, action_date=now())
+        if updated_count:
+            # updates do not send signals, so caches must be invalidated here
+            pending_counts.invalidate()
+            standings_index.invalidate_requests()
+        return updated_count
+
 
 class _AbstractStandingsRequestManagerBase(models.Manager):
     def filter_characters(self) -> models.QuerySet:
@@ -703,6 +823,32 @@ class CorporationDetailsManager(models.Manager):
         all_ids.discard(None)
         return all_ids
 
+    def corporation_ids_from_requests(self) -> set:
+        """Return IDs of corporations with standing requests or revocations."""
+        from .models import AbstractStandingsRequest
+
+        return set(
+            AbstractStandingsRequest.objects.filter(
+                contact_type_id__in=ContactTypeId.corporation_ids()
+            ).values_list("contact_id", flat=True)
+        )
+
+    def corporation_ids_from_requestors(self) -> set:
+        """Return IDs of corporations users can request standings for,
+        i.e. non NPC corporations of their characters outside the organization.
+        """
+        corporation_ids = set(
+            EveCharacter.objects.filter(character_ownership__isnull=False)
+            .exclude(corporation_id__in=app_config.corporation_ids())
+            .exclude(alliance_id__in=app_config.alliance_ids())
+            .values_list("corporation_id", flat=True)
+        )
+        return {
+            corporation_id
+            for corporation_id in corporation_ids
+            if not EveCorporation.corporation_is_npc(corporation_id)
+        }
+
     def update_or_create_from_esi(self, id: int) -> Tuple[Any, bool]:
         """Updates or create an obj from ESI"""
         logger.info("%s: Fetching corporation from ESI", id)
@@ -740,6 +886,270 @@ class CorporationDetailsManager(models.Manager):
         )
 
 
+class ContactSnapshotManager(models.Manager):
+    def rebuild(self, contact_ids: Optional[Iterable[int]] = None) -> None:
+        """Rebuild snapshots from the latest contact set.
+
+        Only snapshots which have changed are written
+        and the standings cache is invalidated when anything has changed.
+
+        Args:
+        - contact_ids: Only rebuild snapshots for these contacts, when provided
+        """
+        from .models import ContactSet
+
+        try:
+            contact_set = ContactSet.objects.latest()
+        except ContactSet.DoesNotExist:
+            contact_set = None
+
+        existing_qs = self.all()
+        if contact_ids is not None:
+            contact_ids = set(contact_ids)
+            existing_qs = existing_qs.filter(contact_id__in=contact_ids)
+
+        new_objs = (
+            self._generate_snapshots(contact_set, contact_ids) if contact_set else {}
+        )
+        fields = [
+            field.name for field in self.model._meta.fields if not field.primary_key
+        ]
+        with transaction.atomic():
+            existing_objs = {obj.contact_id: obj for obj in existing_qs}
+            objs_to_create = []
+            objs_to_update = []
+            for contact_id, obj in new_objs.items():
+                try:
+                    existing_obj = existing_objs[contact_id]
+                except KeyError:
+                    objs_to_create.append(obj)
+                else:
+                    if any(
+                        getattr(obj, field) != getattr(existing_obj, field)
+                        for field in fields
+                    ):
+                        objs_to_update.append(obj)
+
+            obsolete_ids = set(existing_objs.keys()) - set(new_objs.keys())
+            for ids_chunk in chunks(list(obsolete_ids), 1000):
+                self.filter(contact_id__in=ids_chunk).delete()
+
+            self.bulk_create(objs_to_create, batch_size=500, ignore_conflicts=True)
+            self.bulk_update(objs_to_update, fields=fields, batch_size=500)
+
+        logger.info(
+            "Contact snapshots rebuild: %d created, %d updated, %d deleted",
+            len(objs_to_create),
+            len(objs_to_update),
+            len(obsolete_ids),
+        )
+        if objs_to_create or objs_to_update or obsolete_ids:
+            standings_cache.bump_version()
+
+    def _generate_snapshots(
+        self, contact_set: ContactSet, contact_ids: Optional[Set[int]]
+    ) -> dict:
+        from .models import CharacterAffiliation, CorporationDetails, StandingRequest
+
+        contacts_qs = contact_set.contacts.select_related("eve_entity")
+        if contact_ids is not None:
+            contacts_qs = contacts_qs.filter(eve_entity_id__in=contact_ids)
+
+        contact_ids_qs = contacts_qs.values("eve_entity_id")
+        affiliations = {
+            obj.character_id: obj
+            for obj in CharacterAffiliation.objects.select_related(
+                "corporation",
+                "alliance",
+                "faction",
+                "eve_character__character_ownership__user__profile__main_character",
+                "eve_character__character_ownership__user__profile__state",
+            ).filter(character_id__in=contact_ids_qs)
+        }
+        corporation_details = {
+            obj.corporation_id: obj
+            for obj in CorporationDetails.objects.select_related(
+                "alliance", "faction"
+            ).filter(corporation_id__in=contact_ids_qs)
+        }
+        corporation_requestors = {
+            obj.contact_id: obj.user
+            for obj in StandingRequest.objects.select_related(
+                "user__profile__main_character", "user__profile__state"
+            )
+            .filter(
+                contact_type_id=ContactTypeId.CORPORATION,
+                contact_id__in=contact_ids_qs,
+            )
+            .order_by("pk")
+        }
+        snapshots = {}
+        for contact in contacts_qs:
+            obj = self.model(
+                contact_id=contact.eve_entity_id,
+                category=contact.eve_entity.category,
+                name=contact.eve_entity.name,
+                standing=contact.standing,
+                labels_str=", ".join(contact.label_names),
+            )
+            if contact.eve_entity.is_character:
+                self._add_character_details(
+                    obj, affiliations.get(contact.eve_entity_id)
+                )
+            elif contact.eve_entity.is_corporation:
+                self._add_corporation_details(
+                    obj,
+                    corporation_details.get(contact.eve_entity_id),
+                    corporation_requestors.get(contact.eve_entity_id),
+                )
+            snapshots[obj.contact_id] = obj
+        return snapshots
+
+    @classmethod
+    def _add_character_details(cls, obj, affiliation) -> None:
+        if not affiliation:
+            return
+
+        obj.corporation_id = affiliation.corporation_id
+        obj.corporation_name = affiliation.corporation.name
+        obj.alliance_id = affiliation.alliance_id
+        obj.alliance_name = affiliation.alliance.name if affiliation.alliance else ""
+        obj.faction_name = affiliation.faction.name if affiliation.faction else ""
+        eve_character = affiliation.eve_character
+        if not eve_character:
+            return
+
+        obj.corporation_ticker = eve_character.corporation_ticker or ""
+        try:
+            user = eve_character.character_ownership.user
+        except ObjectDoesNotExist:
+            return
+
+        cls._add_owner_details(obj, user)
+
+    @classmethod
+    def _add_corporation_details(cls, obj, corporation_details, requestor) -> None:
+        if corporation_details:
+            alliance = corporation_details.alliance
+            obj.alliance_id = alliance.id if alliance else None
+            obj.alliance_name = alliance.name if alliance else ""
+            faction = corporation_details.faction
+            obj.faction_name = faction.name if faction else ""
+
+        if requestor:
+            cls._add_owner_details(obj, requestor)
+
+    @staticmethod
+    def _add_owner_details(obj, user: User) -> None:
+        try:
+            profile = user.profile
+        except ObjectDoesNotExist:
+            return
+
+        obj.state_name = profile.state.name if profile.state else ""
+        main = profile.main_character
+        if main:
+            obj.main_character_id = main.character_id
+            obj.main_character_name = main.character_name
+            obj.main_character_ticker = main.corporation_ticker or ""
+
+
+class ContactHistoryQuerySet(models.QuerySet):
+    def valid_at(self, moment: dt.datetime) -> models.QuerySet:
+        """Filter intervals valid at the given moment."""
+        return self.filter(valid_from__lte=moment).filter(
+            Q(valid_to__isnull=True) | Q(valid_to__gt=moment)
+        )
+
+
+class ContactHistoryManagerBase(models.Manager):
+    def update_from_contact_set(self, contact_set: ContactSet) -> None:
+        """Record changes of contacts from the given contact set.
+
+        Open intervals of contacts, which have changed or are no longer contacts,
+        are closed at the date of the contact set.
+        New intervals are opened for changed and new contacts.
+        Contact sets must be recorded in chronological order,
+        so older contact sets are ignored.
+        """
+        latest = self.aggregate(
+            latest_from=Max("valid_from"), latest_to=Max("valid_to")
+        )
+        latest_date = max(filter(None, latest.values()), default=None)
+        if latest_date and contact_set.date <= latest_date:
+            logger.info(
+                "Contact history: Contact set %s is not newer than the history. "
+                "Ignoring it.",
+                contact_set.pk,
+            )
+            return
+
+        current = {
+            contact_id: (standing, tuple(label_names))
+            for contact_id, standing, label_names in contact_set.contacts.values_list(
+                "eve_entity_id", "standing", "label_names"
+            )
+        }
+        with transaction.atomic():
+            open_intervals = {
+                contact_id: (pk, (standing, tuple(label_names)))
+                for contact_id, pk, standing, label_names in self.filter(
+                    valid_to__isnull=True
+                ).values_list("contact_id", "pk", "standing", "label_names")
+            }
+            closed_pks = [
+                pk
+                for contact_id, (pk, values) in open_intervals.items()
+                if current.get(contact_id) != values
+            ]
+            for pks_chunk in chunks(closed_pks, 1000):
+                self.filter(pk__in=pks_chunk).update(valid_to=contact_set.date)
+
+            new_objs = [
+                self.model(
+                    contact_id=contact_id,
+                    standing=standing,
+                    label_names=list(label_names),
+                    valid_from=contact_set.date,
+                )
+                for contact_id, (standing, label_names) in current.items()
+                if contact_id not in open_intervals
+                or open_intervals[contact_id][1] != (standing, label_names)
+            ]
+            self.bulk_create(new_objs, batch_size=500)
+
+        logger.info(
+            "Contact history: %d intervals closed, %d intervals opened",
+            len(closed_pks),
+            len(new_objs),
+        )
+
+    def standings_at(
+        self, moment: dt.datetime, contact_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, ContactHistory]:
+        """Return the standings of contacts at the given moment.
+
+        Args:
+        - moment: Point in time
+        - contact_ids: Only return standings for these contacts, when provided
+
+        Returns:
+        Intervals valid at the moment by contact ID.
+        Entities which were no contacts at that moment are not included.
+        """
+        qs = self.valid_at(moment)
+        if contact_ids is not None:
+            qs = qs.filter(contact_id__in=contact_ids)
+        return {obj.contact_id: obj for obj in qs}
+
+    def history(self, contact_id: int) -> models.QuerySet:
+        """Return all intervals of a contact ordered by time."""
+        return self.filter(contact_id=contact_id).order_by("valid_from")
+
+
+ContactHistoryManager = ContactHistoryManagerBase.from_queryset(ContactHistoryQuerySet)
+
+
 class FrozenQuerySetMixin:
     """Ensures the update method can not be used."""
 
@@ -790,6 +1200,67 @@ class RequestLogEntryManagerBase(models.Manager):
         create_eve_entities.delay(list(eve_entity_ids))
         return new_obj
 
+    def bulk_create_from_standing_requests(
+        self,
+        standing_requests: Iterable[AbstractStandingsRequest],
+        action,
+        action_by: User,
+    ) -> list:
+        """Create log entries for many standing requests at once.
+
+        Frozen alts are resolved in bulk, frozen users are only looked up
+        once per user and all entries are created with a single insert.
+        """
+        from .models import FrozenAlt, FrozenAuthUser, RequestLogEntry
+
+        if action_by:
+            action_by_obj: Optional[
+                FrozenAuthUser
+            ] = FrozenAuthUser.objects.get_or_create_from_user(action_by)[0]
+            eve_entity_ids = action_by_obj.entity_ids()
+        else:
+            action_by_obj = None
+            eve_entity_ids = set()
+
+        standing_requests = list(standing_requests)
+        requested_for_objs = FrozenAlt.objects.get_or_create_from_standing_requests(
+            standing_requests
+        )
+        requested_by_objs = {}
+        new_objs = []
+        for standing_request in standing_requests:
+            requested_for: FrozenAlt = requested_for_objs[standing_request.contact_id]
+            try:
+                requested_by_obj = requested_by_objs[standing_request.user_id]
+            except KeyError:
+                requested_by_obj = FrozenAuthUser.objects.get_or_create_from_user(
+                    standing_request.user
+                )[0]
+                requested_by_objs[standing_request.user_id] = requested_by_obj
+                eve_entity_ids |= requested_by_obj.entity_ids()
+
+            new_objs.append(
+                self.model(
+                    action=RequestLogEntry.Action(action),
+                    action_by=action_by_obj,
+                    request_type=RequestLogEntry.RequestType.from_standing_request(
+                        standing_request
+                    ),
+                    requested_at=standing_request.request_date,
+                    requested_by=requested_by_obj,
+                    requested_for=requested_for,
+                    reason=standing_request.reason,
+                )
+            )
+            eve_entity_ids |= requested_for.entity_ids()
+
+        if not new_objs:
+            return []
+
+        objs = self.bulk_create(new_objs)
+        create_eve_entities.delay(list(eve_entity_ids))
+        return objs
+
 
 RequestLogEntryManager = RequestLogEntryManagerBase.from_queryset(
     RequestLogEntryQuerySet
@@ -861,6 +1332,15 @@ class FrozenAltQuerySet(FrozenQuerySetMixin, models.QuerySet):
 
 
 class FrozenAltManagerBase(models.Manager):
+    # fields identifying a frozen alt
+    _KEY_FIELDS = (
+        "category",
+        "character_id",
+        "corporation_id",
+        "alliance_id",
+        "faction_id",
+    )
+
     def get_or_create_from_standing_request(
         self, standing_request: AbstractStandingsRequest
     ) -> Tuple[Any, bool]:
@@ -900,5 +1380,86 @@ class FrozenAltManagerBase(models.Manager):
             faction=faction,
         )
 
+    def get_or_create_from_standing_requests(
+        self, standing_requests: Iterable[AbstractStandingsRequest]
+    ) -> Dict[int, Any]:
+        """Get or create frozen alts for many standing requests at once.
+
+        Needs a fixed number of queries regardless of the number of requests.
+        Returns the frozen alts by contact ID.
+        """
+        from .models import CharacterAffiliation, CorporationDetails
+
+        standing_requests = list(standing_requests)
+        contact_ids = {obj.contact_id for obj in standing_requests}
+        if not contact_ids:
+            return {}
+
+        EveEntity.objects.bulk_create(
+            [EveEntity(id=contact_id) for contact_id in contact_ids],
+            ignore_conflicts=True,
+        )
+        character_affiliations = {
+            obj[0]: obj[1:]
+            for obj in CharacterAffiliation.objects.filter(
+                character_id__in=contact_ids
+            ).values_list("character_id", "corporation_id", "alliance_id", "faction_id")
+        }
+        corporation_details = {
+            obj[0]: obj[1:]
+            for obj in CorporationDetails.objects.filter(
+                corporation_id__in=contact_ids
+            ).values_list("corporation_id", "alliance_id", "faction_id")
+        }
+        keys = {}
+        for standing_request in standing_requests:
+            contact_id = standing_request.contact_id
+            if standing_request.is_character:
+                corporation_id, alliance_id, faction_id = character_affiliations.get(
+                    contact_id, (None, None, None)
+                )
+                keys[contact_id] = (
+                    self.model.Category.CHARACTER.value,
+                    contact_id,
+                    corporation_id,
+                    alliance_id,
+                    faction_id,
+                )
+            elif standing_request.is_corporation:
+                alliance_id, faction_id = corporation_details.get(
+                    contact_id, (None, None)
+                )
+                keys[contact_id] = (
+                    self.model.Category.CORPORATION.value,
+                    None,
+                    contact_id,
+                    alliance_id,
+                    faction_id,
+                )
+            else:
+                raise NotImplementedError()
+
+        frozen_alts = self._fetch_by_keys(set(keys.values()))
+        missing_keys = set(keys.values()) - frozen_alts.keys()
+        if missing_keys:
+            self.bulk_create(
+                [self.model(**dict(zip(self._KEY_FIELDS, key))) for key in missing_keys]
+            )
+            # primary keys are not returned by bulk create on all databases
+            frozen_alts.update(self._fetch_by_keys(missing_keys))
+
+        return {contact_id: frozen_alts[key] for contact_id, key in keys.items()}
+
+    def _fetch_by_keys(self, keys: Set[tuple]) -> Dict[tuple, Any]:
+        query = Q()
+        for key in keys:
+            query |= Q(**dict(zip(self._KEY_FIELDS, key)))
+
+        result = {}
+        for obj in self.filter(query).order_by("pk"):
+            key = tuple(getattr(obj, field) for field in self._KEY_FIELDS)
+            result.setdefault(key, obj)
+        return result
+
 
 FrozenAltManager = FrozenAltManagerBase.from_queryset(FrozenAltQuerySet)
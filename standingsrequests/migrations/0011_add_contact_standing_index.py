@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingsrequests", "0010_add_request_log"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["contact_set", "standing"], name="sr_contact_set_standing_idx"
+            ),
+        ),
+    ]
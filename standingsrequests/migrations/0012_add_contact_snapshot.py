@@ -0,0 +1,77 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingsrequests", "0011_add_contact_standing_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContactSnapshot",
+            fields=[
+                (
+                    "contact_id",
+                    models.PositiveIntegerField(
+                        help_text="Eve Online ID of this contact",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("category", models.CharField(max_length=16)),
+                ("name", models.CharField(max_length=254)),
+                ("standing", models.FloatField()),
+                ("labels_str", models.TextField(default="")),
+                (
+                    "corporation_id",
+                    models.PositiveIntegerField(
+                        default=None, help_text="Corporation of a character", null=True
+                    ),
+                ),
+                (
+                    "corporation_name",
+                    models.CharField(default=None, max_length=254, null=True),
+                ),
+                ("corporation_ticker", models.CharField(default="", max_length=254)),
+                ("alliance_id", models.PositiveIntegerField(default=None, null=True)),
+                (
+                    "alliance_name",
+                    models.CharField(default=None, max_length=254, null=True),
+                ),
+                (
+                    "faction_name",
+                    models.CharField(default=None, max_length=254, null=True),
+                ),
+                (
+                    "main_character_id",
+                    models.PositiveIntegerField(default=None, null=True),
+                ),
+                ("main_character_name", models.CharField(default="", max_length=254)),
+                ("main_character_ticker", models.CharField(default="", max_length=254)),
+                (
+                    "state_name",
+                    models.CharField(
+                        default=None,
+                        help_text="State of the user owning a character or requesting standing for a corporation. None when there is no such user.",
+                        max_length=254,
+                        null=True,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="contactsnapshot",
+            index=models.Index(
+                fields=["category", "name"], name="sr_snapshot_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contactsnapshot",
+            index=models.Index(
+                fields=["category", "standing"], name="sr_snapshot_standing_idx"
+            ),
+        ),
+    ]
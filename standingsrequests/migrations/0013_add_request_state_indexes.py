@@ -0,0 +1,40 @@
+# Generated by Django 4.0.10 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingsrequests", "0012_add_contact_snapshot"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="abstractstandingsrequest",
+            name="action_date",
+            field=models.DateTimeField(
+                help_text="datetime of action by standing manager", null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="abstractstandingsrequest",
+            name="contact_id",
+            field=models.PositiveIntegerField(
+                help_text="EVE Online ID of contact this standing is for"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="abstractstandingsrequest",
+            index=models.Index(
+                fields=["action_date", "request_date"], name="sr_request_pending_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="abstractstandingsrequest",
+            index=models.Index(
+                fields=["contact_id", "action_date", "is_effective"],
+                name="sr_request_contact_state_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.0.10 on 2026-10-19 16:22
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_contacts(apps, schema_editor):
+    Contact = apps.get_model("standingsrequests", "Contact")
+    duplicates = (
+        Contact.objects.values("contact_set_id", "eve_entity_id")
+        .annotate(contact_count=Count("id"), min_id=Min("id"))
+        .filter(contact_count__gt=1)
+    )
+    for duplicate in duplicates:
+        Contact.objects.filter(
+            contact_set_id=duplicate["contact_set_id"],
+            eve_entity_id=duplicate["eve_entity_id"],
+        ).exclude(id=duplicate["min_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingsrequests", "0013_add_request_state_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_contacts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="contact",
+            constraint=models.UniqueConstraint(
+                fields=("contact_set", "eve_entity"), name="sr_contact_set_entity_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.0.10 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingsrequests", "0014_add_contact_unique_constraint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContactHistory",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "contact_id",
+                    models.PositiveIntegerField(
+                        help_text="Eve Online ID of this contact"
+                    ),
+                ),
+                ("standing", models.FloatField()),
+                ("label_names", models.JSONField(default=list)),
+                ("valid_from", models.DateTimeField()),
+                (
+                    "valid_to",
+                    models.DateTimeField(
+                        default=None,
+                        help_text="End of this interval, None if current",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "contact history",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="contacthistory",
+            index=models.Index(
+                fields=["contact_id", "valid_from"], name="sr_history_contact_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contacthistory",
+            index=models.Index(fields=["valid_to"], name="sr_history_valid_to_idx"),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.0.10 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+LABEL_MASK_BITS = 63
+
+
+def fill_label_fields(apps, schema_editor):
+    ContactSet = apps.get_model("standingsrequests", "ContactSet")
+    Contact = apps.get_model("standingsrequests", "Contact")
+    for contact_set in ContactSet.objects.all():
+        label_ids = contact_set.labels.order_by("label_id").values_list(
+            "label_id", flat=True
+        )
+        label_bits = {
+            label_id: 1 << position
+            for position, label_id in enumerate(label_ids[:LABEL_MASK_BITS])
+        }
+        contact_labels = {}
+        for contact_id, label_id, name in Contact.labels.through.objects.filter(
+            contact__contact_set=contact_set
+        ).values_list("contact_id", "contactlabel__label_id", "contactlabel__name"):
+            contact_labels.setdefault(contact_id, []).append((label_id, name))
+
+        contacts = []
+        for contact in Contact.objects.filter(pk__in=contact_labels.keys()):
+            labels = contact_labels[contact.pk]
+            # sorted in Python, since collations of the database may differ
+            contact.label_names = sorted(name for _, name in labels)
+            contact.label_mask = sum(
+                label_bits.get(label_id, 0) for label_id, _ in labels
+            )
+            contacts.append(contact)
+        Contact.objects.bulk_update(
+            contacts, fields=["label_names", "label_mask"], batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("standingsrequests", "0015_add_contact_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contact",
+            name="label_mask",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Bitmask of the labels of this contact, see ContactSet.label_bits()",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="label_names",
+            field=models.JSONField(
+                default=list, help_text="Sorted names of the labels of this contact"
+            ),
+        ),
+        migrations.RunPython(fill_label_fields, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,5 @@
 import datetime as dt
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
@@ -32,8 +32,10 @@ from .helpers.evecorporation import EveCorporation
 from .managers import (
     AbstractStandingsRequestManager,
     CharacterAffiliationManager,
+    ContactHistoryManager,
     ContactQuerySet,
     ContactSetManager,
+    ContactSnapshotManager,
     CorporationDetailsManager,
     FrozenAltManager,
     FrozenAuthUserManager,
@@ -68,6 +70,42 @@ class ContactSet(models.Model):
     def __repr__(self):
         return f"{type(self).__name__}(pk={self.pk}, date='{self.date}')"
 
+    def label_bits(self) -> Dict[int, int]:
+        """Return the bits of labels in the label masks of contacts by label ID.
+
+        Bits are assigned in order of the label IDs,
+        so they can change when labels are added or removed.
+        Labels beyond the capacity of the mask have no bit.
+        """
+        label_ids = self.labels.order_by("label_id").values_list("label_id", flat=True)
+        return {
+            label_id: 1 << position
+            for position, label_id in enumerate(label_ids[: Contact.LABEL_MASK_BITS])
+        }
+
+    def refresh_contact_label_fields(self) -> None:
+        """Update the denormalised label fields of all contacts of this set.
+
+        Needed when the labels of this set change,
+        because that can change the bits of the other labels.
+        """
+        label_bits = self.label_bits()
+        contact_labels = {}
+        for contact_pk, label_id, name in Contact.labels.through.objects.filter(
+            contact__contact_set=self
+        ).values_list("contact_id", "contactlabel__label_id", "contactlabel__name"):
+            contact_labels.setdefault(contact_pk, []).append((label_id, name))
+
+        changed_contacts = []
+        for contact in self.contacts.only("pk", "label_names", "label_mask"):
+            old_fields = (contact.label_names, contact.label_mask)
+            contact.set_label_fields(contact_labels.get(contact.pk, []), label_bits)
+            if (contact.label_names, contact.label_mask) != old_fields:
+                changed_contacts.append(contact)
+        Contact.objects.bulk_update(
+            changed_contacts, fields=["label_names", "label_mask"], batch_size=500
+        )
+
     def contact_has_satisfied_standing(self, contact_id: int) -> bool:
         """Return True if give contact has standing exists"""
         try:
@@ -163,12 +201,33 @@ class Contact(models.Model):
     eve_entity = models.ForeignKey(
         EveEntity, on_delete=models.CASCADE, related_name="standingrequests_contact"
     )
+    LABEL_MASK_BITS = 63
+
     standing = models.FloatField(db_index=True)
     labels = models.ManyToManyField(ContactLabel, related_name="contacts")
+    label_names = models.JSONField(
+        default=list, help_text="Sorted names of the labels of this contact"
+    )
+    label_mask = models.BigIntegerField(
+        default=0,
+        help_text="Bitmask of the labels of this contact, see ContactSet.label_bits()",
+    )
     is_watched = models.BooleanField(default=False)
 
     objects = ContactQuerySet.as_manager()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["contact_set", "eve_entity"], name="sr_contact_set_entity_uniq"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["contact_set", "standing"], name="sr_contact_set_standing_idx"
+            )
+        ]
+
     def __str__(self):
         return self.eve_entity.name
 
@@ -187,9 +246,30 @@ class Contact(models.Model):
     def is_standing_satisfied(self) -> bool:
         return StandingRequest.is_standing_satisfied(self.standing)
 
-    @cached_property
+    @property
     def labels_sorted(self) -> List[str]:
-        return sorted([label.name for label in self.labels.all()])
+        return list(self.label_names)
+
+    def set_label_fields(
+        self, labels: Iterable[Tuple[int, str]], label_bits: Dict[int, int]
+    ) -> None:
+        """Set the denormalised label fields from labels without saving.
+
+        Args:
+        - labels: ID and name of each label
+        - label_bits: Bits of labels by label ID, see ContactSet.label_bits()
+        """
+        labels = dict(labels)
+        self.label_names = sorted(labels.values())
+        self.label_mask = sum(label_bits.get(label_id, 0) for label_id in labels)
+
+    def refresh_label_fields(self) -> None:
+        """Update the denormalised label fields from the labels relation."""
+        self.set_label_fields(
+            self.labels.values_list("label_id", "name"),
+            self.contact_set.label_bits(),
+        )
+        self.save(update_fields=["label_names", "label_mask"])
 
 
 class AbstractStandingsRequest(models.Model):
@@ -221,7 +301,7 @@ class AbstractStandingsRequest(models.Model):
     REQUEST_PERMISSION_NAME = "standingsrequests.request_standings"
 
     contact_id = models.PositiveIntegerField(
-        db_index=True, help_text="EVE Online ID of contact this standing is for"
+        help_text="EVE Online ID of contact this standing is for"
     )
     contact_type_id = models.PositiveIntegerField(
         db_index=True, help_text="EVE Online Type ID of this contact"
@@ -238,7 +318,7 @@ class AbstractStandingsRequest(models.Model):
         help_text="standing manager that accepted or rejected this requests",
     )
     action_date = models.DateTimeField(
-        null=True, db_index=True, help_text="datetime of action by standing manager"
+        null=True, help_text="datetime of action by standing manager"
     )
     is_effective = models.BooleanField(
         default=False,
@@ -256,6 +336,22 @@ class AbstractStandingsRequest(models.Model):
             ("affect_standings", "User can process standings requests."),
             ("request_standings", "User can request standings."),
         )
+        # Indexes matching the queries for the states of requests.
+        # Partial indexes are not used, because MySQL and MariaDB do not support them.
+        # Boolean fields are compared without a value in SQL, e.g. "NOT is_effective",
+        # which some databases can not use for index lookups.
+        # The pending state is therefore indexed by action_date.
+        indexes = [
+            # pending requests ordered by date
+            models.Index(
+                fields=["action_date", "request_date"], name="sr_request_pending_idx"
+            ),
+            # state of requests for specific contacts
+            models.Index(
+                fields=["contact_id", "action_date", "is_effective"],
+                name="sr_request_contact_state_idx",
+            ),
+        ]
 
     def __repr__(self) -> str:
         try:
@@ -621,16 +717,51 @@ class StandingRequest(AbstractStandingsRequest):
         except ObjectDoesNotExist:
             return False
 
-        scopes_string = " ".join(cls.get_required_scopes_for_state(state_name))
-        token_qs = Token.objects.filter(
-            character_id=character.character_id
-        ).require_scopes(scopes_string)
+        token_qs = cls.filter_tokens_with_required_scopes(
+            Token.objects.filter(character_id=character.character_id),
+            state_name=state_name,
+            quick_check=quick_check,
+        )
+        result = token_qs.exists()
+        return result
+
+    @classmethod
+    def character_ids_with_required_scopes(
+        cls, character_ids: Iterable[int], state_name: str, quick_check: bool = False
+    ) -> Set[int]:
+        """Returns the IDs of all given characters, which have the required scopes
+        for issuing a standings request for the given state.
+
+        Params:
+        - character_ids: IDs of the characters to check
+        - state_name: name of the state of the user owning the characters
+        - quick_check: if True will not check if tokens are valid to save time
+        """
+        token_qs = cls.filter_tokens_with_required_scopes(
+            Token.objects.filter(character_id__in=list(character_ids)),
+            state_name=state_name,
+            quick_check=quick_check,
+        )
+        return set(token_qs.values_list("character_id", flat=True))
+
+    @classmethod
+    def filter_tokens_with_required_scopes(
+        cls, token_qs: models.QuerySet, state_name: str, quick_check: bool = False
+    ) -> models.QuerySet:
+        """Filter given tokens for tokens with the required scopes
+        for issuing a standings request for the given state.
 
+        Params:
+        - token_qs: tokens to filter. Should already be limited to relevant characters
+        - state_name: name of the state of the user owning the characters
+        - quick_check: if True will not check if tokens are valid to save time
+        """
+        scopes_string = " ".join(cls.get_required_scopes_for_state(state_name))
+        token_qs = token_qs.require_scopes(scopes_string)
         if not quick_check:
             token_qs = token_qs.require_valid()
 
-        result = token_qs.exists()
-        return result
+        return token_qs
 
     @staticmethod
     def get_required_scopes_for_state(state_name: str) -> list:
@@ -744,6 +875,95 @@ class CorporationDetails(GatherEntityIdsMixin, models.Model):
         return self.corporation.name
 
 
+class ContactSnapshot(models.Model):
+    """A flattened contact of the latest contact set
+    with everything shown about it on the standings pages.
+
+    Snapshots are rebuilt after each sync, so the standings pages and exports
+    can be served from this table without joins.
+    Names of organizations are None when they are not known.
+    """
+
+    contact_id = models.PositiveIntegerField(
+        primary_key=True, help_text="Eve Online ID of this contact"
+    )
+    category = models.CharField(max_length=16)
+    name = models.CharField(max_length=254)
+    standing = models.FloatField()
+    labels_str = models.TextField(default="")
+    corporation_id = models.PositiveIntegerField(
+        null=True, default=None, help_text="Corporation of a character"
+    )
+    corporation_name = models.CharField(max_length=254, null=True, default=None)
+    corporation_ticker = models.CharField(max_length=254, default="")
+    alliance_id = models.PositiveIntegerField(null=True, default=None)
+    alliance_name = models.CharField(max_length=254, null=True, default=None)
+    faction_name = models.CharField(max_length=254, null=True, default=None)
+    main_character_id = models.PositiveIntegerField(null=True, default=None)
+    main_character_name = models.CharField(max_length=254, default="")
+    main_character_ticker = models.CharField(max_length=254, default="")
+    state_name = models.CharField(
+        max_length=254,
+        null=True,
+        default=None,
+        help_text=(
+            "State of the user owning a character or requesting standing "
+            "for a corporation. None when there is no such user."
+        ),
+    )
+
+    objects = ContactSnapshotManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["category", "name"], name="sr_snapshot_name_idx"),
+            models.Index(
+                fields=["category", "standing"], name="sr_snapshot_standing_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def has_owner(self) -> bool:
+        return self.state_name is not None
+
+
+class ContactHistory(models.Model):
+    """An interval in which a contact had the same standing and labels.
+
+    Intervals are recorded at each sync and are kept when contact sets are purged.
+    The current interval of a contact has no end.
+    """
+
+    contact_id = models.PositiveIntegerField(help_text="Eve Online ID of this contact")
+    standing = models.FloatField()
+    label_names = models.JSONField(default=list)
+    valid_from = models.DateTimeField()
+    valid_to = models.DateTimeField(
+        null=True, default=None, help_text="End of this interval, None if current"
+    )
+
+    objects = ContactHistoryManager()
+
+    class Meta:
+        verbose_name_plural = "contact history"
+        indexes = [
+            models.Index(
+                fields=["contact_id", "valid_from"], name="sr_history_contact_idx"
+            ),
+            models.Index(fields=["valid_to"], name="sr_history_valid_to_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.contact_id}-{self.valid_from}"
+
+    @property
+    def is_current(self) -> bool:
+        return self.valid_to is None
+
+
 class RequestLogEntry(FrozenModelMixin, models.Model):
     class Action(models.TextChoices):
         CONFIRMED = "CN", _("confirmed")
@@ -1,5 +1,23 @@
+from esi import app_settings as esi_app_settings
 from esi.clients import EsiClientProvider
 
 from . import __version__
+from .helpers.esi_limiter import RateLimitedHTTPAdapter
 
-esi = EsiClientProvider(app_info_text=f"aa-standingsrequests v{__version__}")
+
+class RateLimitedEsiClientProvider(EsiClientProvider):
+    """ESI client provider, which sends all requests through the ESI limiter."""
+
+    @property
+    def client(self):
+        if self._client is None:
+            client = super().client
+            http_adapter = RateLimitedHTTPAdapter(
+                pool_maxsize=esi_app_settings.ESI_CONNECTION_POOL_MAXSIZE,
+                max_retries=esi_app_settings.ESI_CONNECTION_ERROR_MAX_RETRIES,
+            )
+            client.swagger_spec.http_client.session.mount("https://", http_adapter)
+        return self._client
+
+
+esi = RateLimitedEsiClientProvider(app_info_text=f"aa-standingsrequests v{__version__}")
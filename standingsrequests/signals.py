@@ -0,0 +1,61 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .core import pending_counts, standings_index
+from .models import (
+    Contact,
+    ContactLabel,
+    ContactSet,
+    StandingRequest,
+    StandingRevocation,
+)
+
+
+@receiver(post_save, sender=StandingRequest)
+@receiver(post_save, sender=StandingRevocation)
+@receiver(post_delete, sender=StandingRequest)
+@receiver(post_delete, sender=StandingRevocation)
+def invalidate_pending_counts(sender, **kwargs):
+    pending_counts.invalidate()
+
+
+@receiver(post_save, sender=StandingRequest)
+@receiver(post_delete, sender=StandingRequest)
+def invalidate_standings_index(sender, **kwargs):
+    standings_index.invalidate_requests()
+
+
+@receiver(m2m_changed, sender=Contact.labels.through)
+def update_contact_label_fields(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the denormalised label fields of contacts in sync with their labels."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            instance.refresh_label_fields()
+        return
+
+    if action == "pre_clear":
+        # contacts of a cleared label are no longer known after the clear
+        instance._contact_pks_before_clear = list(
+            instance.contacts.values_list("pk", flat=True)
+        )
+        return
+    if action in ("post_add", "post_remove"):
+        contact_pks = pk_set
+    elif action == "post_clear":
+        contact_pks = instance.__dict__.pop("_contact_pks_before_clear", [])
+    else:
+        return
+    for contact in Contact.objects.filter(pk__in=contact_pks):
+        contact.refresh_label_fields()
+
+
+@receiver(post_save, sender=ContactLabel)
+@receiver(post_delete, sender=ContactLabel)
+def update_contact_set_label_fields(sender, instance, **kwargs):
+    """Keep the denormalised label fields of all contacts of a set in sync,
+    when its labels change.
+    """
+    contact_set = ContactSet.objects.filter(pk=instance.contact_set_id).first()
+    if not contact_set:  # the set is being deleted
+        return
+    contact_set.refresh_contact_label_fields()
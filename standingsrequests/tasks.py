@@ -1,9 +1,11 @@
 import datetime as dt
+import uuid
 from typing import Optional
 
 from celery import Task, chain, shared_task
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
@@ -13,10 +15,13 @@ from app_utils.logging import LoggerAddTag
 
 from . import __title__
 from .app_settings import SR_STANDINGS_STALE_HOURS, SR_SYNC_BLUE_ALTS_ENABLED
-from .core import app_config
+from .core import app_config, standings_tables
+from .helpers import esi_limiter
 from .models import (
     CharacterAffiliation,
+    ContactHistory,
     ContactSet,
+    ContactSnapshot,
     CorporationDetails,
     StandingRequest,
     StandingRevocation,
@@ -27,6 +32,13 @@ logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 TASK_DEFAULT_PRIORITY = 6
 TASK_LOW_PRIORITY = 8
 
+# each retry waits at most until ESI resets the error limit, i.e. up to 60 seconds
+TASK_ESI_ERROR_LIMIT_MAX_RETRIES = 10
+
+CACHE_KEY_CONTACT_HISTORY_LOCK = "STANDINGS_REQUESTS_CONTACT_HISTORY_LOCK"
+CONTACT_HISTORY_LOCK_TIMEOUT = 600  # seconds
+CONTACT_HISTORY_RETRY_COUNTDOWN = 30  # seconds
+
 
 @shared_task(name="standings_requests.update_all", bind=True)
 def update_all(self, user_pk: int = None):
@@ -71,6 +83,10 @@ def standings_update(self):
         )
 
     priority = _determine_task_priority(self) or TASK_DEFAULT_PRIORITY
+    # dispatched independently, so failures of the chain can not leave gaps
+    # in the history or keep the standings pages on the previous contact set
+    update_contact_history.apply_async(args=[contact_set.pk], priority=priority)
+    update_contact_snapshots.apply_async(priority=priority)
 
     tasks = []
 
@@ -117,8 +133,11 @@ def validate_requests():
 def update_associations_api(self):
     """Update character affiliations from ESI and relations to Eve Characters"""
     priority = _determine_task_priority(self) or TASK_DEFAULT_PRIORITY
-    update_character_affiliations_from_esi.apply_async(priority=priority)
-    update_character_affiliations_to_auth.apply_async(priority=priority)
+    chain(
+        update_character_affiliations_from_esi.si().set(priority=priority),
+        update_character_affiliations_to_auth.si().set(priority=priority),
+        update_contact_snapshots.si().set(priority=priority),
+    ).delay()
     update_all_corporation_details.apply_async(priority=priority)
 
 
@@ -138,9 +157,13 @@ def update_character_affiliations_to_auth():
 def update_all_corporation_details(self):
     existing_corporation_ids = (
         CorporationDetails.objects.corporation_ids_from_contacts()
+        | CorporationDetails.objects.corporation_ids_from_requests()
     )
+    # details of other corporations of requestors are fetched on demand
+    # by the create requests page and kept, but not refreshed periodically
     CorporationDetails.objects.exclude(
         corporation_id__in=existing_corporation_ids
+        | CorporationDetails.objects.corporation_ids_from_requestors()
     ).delete()
 
     if not existing_corporation_ids:
@@ -157,9 +180,53 @@ def update_all_corporation_details(self):
     )
 
 
-@shared_task
-def update_corporation_detail(corporation_id: int):
+@shared_task(bind=True)
+def update_corporation_detail(self, corporation_id: int):
+    seconds = esi_limiter.seconds_until_error_limit_reset()
+    if seconds:
+        # back off instead of blocking a worker until the error limit is reset
+        raise self.retry(
+            countdown=int(seconds) + 1, max_retries=TASK_ESI_ERROR_LIMIT_MAX_RETRIES
+        )
+
     CorporationDetails.objects.update_or_create_from_esi(corporation_id)
+    ContactSnapshot.objects.rebuild(contact_ids=[corporation_id])
+
+
+@shared_task(bind=True)
+def update_contact_snapshots(self):
+    """Rebuild snapshots of the latest contacts for the standings pages."""
+    ContactSnapshot.objects.rebuild()
+    priority = _determine_task_priority(self) or TASK_DEFAULT_PRIORITY
+    warm_standings_cache.apply_async(priority=priority)
+
+
+@shared_task(bind=True)
+def update_contact_history(self, contact_set_pk: int):
+    """Record changes of standings from a contact set in the contact history.
+
+    Only one update runs at a time. Others are retried later.
+    """
+    token = uuid.uuid4().hex
+    if not cache.add(
+        CACHE_KEY_CONTACT_HISTORY_LOCK, token, timeout=CONTACT_HISTORY_LOCK_TIMEOUT
+    ):
+        logger.info("Contact history is already being updated. Retrying later.")
+        raise self.retry(countdown=CONTACT_HISTORY_RETRY_COUNTDOWN)
+
+    try:
+        contact_set = ContactSet.objects.get(pk=contact_set_pk)
+        ContactHistory.objects.update_from_contact_set(contact_set)
+    finally:
+        # the lock might have expired and been acquired by another update
+        if cache.get(CACHE_KEY_CONTACT_HISTORY_LOCK) == token:
+            cache.delete(CACHE_KEY_CONTACT_HISTORY_LOCK)
+
+
+@shared_task
+def warm_standings_cache():
+    """Pre-render the data of the standings pages into the cache."""
+    standings_tables.warm_cache()
 
 
 @shared_task(name="standings_requests.purge_stale_data", bind=True)
@@ -190,8 +257,7 @@ def purge_stale_data(self):
 
 @shared_task
 def purge_contact_set(contact_set_pk: int):
-    obj = ContactSet.objects.filter(pk=contact_set_pk)
-    obj.delete()
+    ContactSet.objects.purge(contact_set_pk)
 
 
 def _determine_task_priority(task_obj: Task) -> Optional[int]:
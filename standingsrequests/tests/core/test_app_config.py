@@ -85,3 +85,17 @@ class TestConfiguredOrganizations(TestCase):
     @patch(MODULE_PATH + ".STR_ALLIANCE_IDS", [])
     def test_pilot_in_organization_matches_none(self):
         self.assertFalse(app_config.is_character_a_member(self.character_1001))
+
+    @patch(MODULE_PATH + ".STR_CORP_IDS", ["2001"])
+    @patch(MODULE_PATH + ".STR_ALLIANCE_IDS", ["3001"])
+    def test_should_compute_organization_ids_only_once(self):
+        # when
+        corporation_ids_1 = app_config.corporation_ids()
+        corporation_ids_2 = app_config.corporation_ids()
+        alliance_ids_1 = app_config.alliance_ids()
+        alliance_ids_2 = app_config.alliance_ids()
+        # then
+        self.assertSetEqual(corporation_ids_1, {2001})
+        self.assertIs(corporation_ids_1, corporation_ids_2)
+        self.assertSetEqual(alliance_ids_1, {3001})
+        self.assertIs(alliance_ids_1, alliance_ids_2)
@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.timezone import now
+
+from allianceauth.tests.auth_utils import AuthUtils
+
+from standingsrequests.core import pending_counts
+from standingsrequests.models import StandingRequest, StandingRevocation
+from standingsrequests.tests.testdata.entity_type_ids import CHARACTER_TYPE_ID
+
+
+class TestPendingCounts(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = AuthUtils.create_member("Bruce Wayne")
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def _create_request(self, contact_id: int) -> StandingRequest:
+        return StandingRequest.objects.create(
+            user=self.user, contact_id=contact_id, contact_type_id=CHARACTER_TYPE_ID
+        )
+
+    def test_should_return_counts(self):
+        # given
+        self._create_request(1001)
+        self._create_request(1002)
+        StandingRevocation.objects.create(
+            contact_id=1003, contact_type_id=CHARACTER_TYPE_ID
+        )
+        # when
+        counts = pending_counts.pending_counts()
+        # then
+        self.assertEqual(counts.requests, 2)
+        self.assertEqual(counts.revocations, 1)
+        self.assertEqual(counts.total, 3)
+
+    def test_should_return_cached_counts_without_queries(self):
+        # given
+        self._create_request(1001)
+        pending_counts.pending_counts()
+        # when
+        with self.assertNumQueries(0):
+            counts = pending_counts.pending_counts()
+        # then
+        self.assertEqual(counts.total, 1)
+
+    def test_should_update_counts_when_request_created(self):
+        # given
+        pending_counts.pending_counts()
+        # when
+        self._create_request(1001)
+        # then
+        self.assertEqual(pending_counts.pending_counts().requests, 1)
+
+    def test_should_update_counts_when_request_actioned(self):
+        # given
+        request = self._create_request(1001)
+        pending_counts.pending_counts()
+        # when
+        request.action_date = now()
+        request.save()
+        # then
+        self.assertEqual(pending_counts.pending_counts().requests, 0)
+
+    def test_should_update_counts_when_revocation_deleted(self):
+        # given
+        StandingRevocation.objects.create(
+            contact_id=1003, contact_type_id=CHARACTER_TYPE_ID
+        )
+        pending_counts.pending_counts()
+        # when
+        StandingRevocation.objects.all().delete()
+        # then
+        self.assertEqual(pending_counts.pending_counts().revocations, 0)
@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.test import TestCase
+from eveuniverse.models import EveEntity
+
+from allianceauth.tests.auth_utils import AuthUtils
+
+from standingsrequests.core import standings_index
+from standingsrequests.models import Contact, ContactSet, StandingRequest
+from standingsrequests.tests.testdata.entity_type_ids import CHARACTER_TYPE_ID
+from standingsrequests.tests.testdata.my_test_data import (
+    create_contacts_set,
+    load_eve_entities,
+)
+
+
+class TestStandingsIndex(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        load_eve_entities()
+        create_contacts_set()
+        cls.user = AuthUtils.create_member("Bruce Wayne")
+
+    def setUp(self) -> None:
+        cache.clear()
+        standings_index._index = None
+
+    def test_should_return_standings_for_contacts(self):
+        # when
+        results = standings_index.lookup([1002, 1009])
+        # then
+        self.assertEqual(
+            results[1002],
+            standings_index.ContactStanding(
+                standing=10.0, labels=("blue", "green"), request_state=None
+            ),
+        )
+        self.assertEqual(results[1009].standing, -10.0)
+        self.assertEqual(results[1009].labels, ("red",))
+
+    def test_should_return_empty_standing_for_unknown_ids(self):
+        # when
+        results = standings_index.lookup([99])
+        # then
+        self.assertEqual(results[99], standings_index.ContactStanding())
+
+    def test_should_return_request_state(self):
+        # given
+        StandingRequest.objects.create(
+            user=self.user,
+            contact_id=1002,
+            contact_type_id=CHARACTER_TYPE_ID,
+            is_effective=True,
+        )
+        StandingRequest.objects.create(
+            user=self.user, contact_id=99, contact_type_id=CHARACTER_TYPE_ID
+        )
+        # when
+        results = standings_index.lookup([1002, 99])
+        # then
+        self.assertEqual(
+            results[1002].request_state, standings_index.RequestState.EFFECTIVE
+        )
+        self.assertEqual(
+            results[99].request_state, standings_index.RequestState.PENDING
+        )
+        self.assertIsNone(results[99].standing)
+
+    def test_should_not_reload_index_when_nothing_changed(self):
+        # given
+        standings_index.lookup([1002])
+        # when
+        with self.assertNumQueries(1):
+            results = standings_index.lookup(list(range(1000, 1500)))
+        # then
+        self.assertEqual(results[1002].standing, 10.0)
+
+    def test_should_reload_index_when_new_contact_set_landed(self):
+        # given
+        standings_index.lookup([1002])
+        contact_set = ContactSet.objects.create(name="New Set")
+        Contact.objects.create(
+            contact_set=contact_set,
+            eve_entity=EveEntity.objects.get(id=1002),
+            standing=-5.0,
+        )
+        # when
+        results = standings_index.lookup([1002, 1009])
+        # then
+        self.assertEqual(results[1002].standing, -5.0)
+        self.assertIsNone(results[1009].standing)
+
+    def test_should_reload_index_when_requests_changed(self):
+        # given
+        standings_index.lookup([1002])
+        # when
+        StandingRequest.objects.create(
+            user=self.user, contact_id=1002, contact_type_id=CHARACTER_TYPE_ID
+        )
+        results = standings_index.lookup([1002])
+        # then
+        self.assertEqual(
+            results[1002].request_state, standings_index.RequestState.PENDING
+        )
+
+    def test_should_invalidate_requests_again_after_commit(self):
+        # given
+        standings_index.lookup([1002])
+        with self.captureOnCommitCallbacks() as callbacks:
+            standings_index.invalidate_requests()
+            version_before_commit = standings_index._requests_version()
+            # index loaded from uncommitted data
+            standings_index.lookup([1002])
+        # when
+        for callback in callbacks:
+            callback()
+        # then
+        self.assertGreater(standings_index._requests_version(), version_before_commit)
+        self.assertFalse(
+            standings_index._is_current(
+                standings_index._index,
+                ContactSet.objects.latest().pk,
+                standings_index._requests_version(),
+            )
+        )
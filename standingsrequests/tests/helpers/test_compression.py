@@ -0,0 +1,75 @@
+import gzip
+from unittest.mock import Mock, patch
+
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory, TestCase
+
+from standingsrequests.helpers.compression import compress_response
+
+MODULE_PATH = "standingsrequests.helpers.compression"
+
+DATA = {"data": [{"name": f"Character {num}", "standing": 5.0} for num in range(100)]}
+
+
+@compress_response
+def my_view(request):
+    response = JsonResponse(DATA)
+    response["ETag"] = '"abc"'
+    return response
+
+
+class TestCompressResponse(TestCase):
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+
+    @patch(MODULE_PATH + ".brotli", None)
+    def test_should_compress_with_gzip_when_accepted(self):
+        # given
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        # when
+        response = my_view(request)
+        # then
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), JsonResponse(DATA).content)
+
+    def test_should_compress_with_brotli_when_available_and_accepted(self):
+        # given
+        mock_brotli = Mock()
+        mock_brotli.compress.return_value = b"compressed"
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        # when
+        with patch(MODULE_PATH + ".brotli", mock_brotli):
+            response = my_view(request)
+        # then
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response.content, b"compressed")
+
+    @patch(MODULE_PATH + ".brotli", None)
+    def test_should_fall_back_to_gzip_when_brotli_not_installed(self):
+        # given
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="br, gzip")
+        # when
+        response = my_view(request)
+        # then
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_should_not_compress_when_not_accepted(self):
+        # given
+        request = self.factory.get("/")
+        # when
+        response = my_view(request)
+        # then
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["ETag"], '"abc"')
+
+    def test_should_not_compress_small_responses(self):
+        # given
+        my_small_view = compress_response(lambda request: HttpResponse("small"))
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        # when
+        response = my_small_view(request)
+        # then
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b"small")
@@ -0,0 +1,140 @@
+from django.http import QueryDict
+from django.test import TestCase
+
+from standingsrequests.helpers.datatables import (
+    MAX_PAGE_LENGTH,
+    DataTablesColumn,
+    DataTablesServerSide,
+    _parse_search_value,
+)
+from standingsrequests.models import Contact
+from standingsrequests.tests.testdata.my_test_data import create_contacts_set
+
+COLUMNS = [
+    DataTablesColumn("name", "eve_entity__name"),
+    DataTablesColumn("standing", "standing", numeric=True),
+]
+
+
+def make_params(**kwargs) -> QueryDict:
+    params = QueryDict(mutable=True)
+    params.update(
+        {
+            "draw": "1",
+            "columns[0][data]": "name",
+            "columns[1][data]": "standing",
+            "order[0][column]": "0",
+            "order[0][dir]": "asc",
+        }
+    )
+    params.update(kwargs)
+    return params
+
+
+class TestParseSearchValue(TestCase):
+    def test_should_return_exact_value_for_filter_drop_down_regex(self):
+        self.assertEqual(
+            _parse_search_value(r"^Wayne Tech\.$", True), ("Wayne Tech.", True)
+        )
+
+    def test_should_return_value_as_is_when_not_regex(self):
+        self.assertEqual(_parse_search_value("^Wayne$", False), ("^Wayne$", False))
+
+    def test_should_return_value_as_is_for_other_regex(self):
+        self.assertEqual(_parse_search_value("Wa.ne", True), ("Wa.ne", False))
+
+
+class TestDataTablesServerSide(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_contacts_set()
+
+    def test_should_detect_server_side_request(self):
+        self.assertTrue(DataTablesServerSide.is_requested(make_params()))
+        self.assertFalse(DataTablesServerSide.is_requested(QueryDict()))
+
+    def test_should_return_ordered_page(self):
+        # given
+        server_side = DataTablesServerSide(
+            COLUMNS, make_params(**{"start": "1", "length": "2"})
+        )
+        # when
+        page_qs, records_total, records_filtered = server_side.process(
+            Contact.objects.all()
+        )
+        # then
+        expected = list(
+            Contact.objects.order_by("eve_entity__name", "pk").values_list(
+                "pk", flat=True
+            )[1:3]
+        )
+        self.assertListEqual([obj.pk for obj in page_qs], expected)
+        self.assertEqual(records_total, Contact.objects.count())
+        self.assertEqual(records_filtered, records_total)
+
+    def test_should_limit_page_length(self):
+        # given
+        server_side = DataTablesServerSide(COLUMNS, make_params(**{"length": "-1"}))
+        # when
+        page_qs, _, _ = server_side.process(Contact.objects.all())
+        # then
+        self.assertEqual(page_qs.query.high_mark, MAX_PAGE_LENGTH)
+
+    def test_should_filter_numeric_column_exactly(self):
+        # given
+        params = make_params(
+            **{
+                "columns[1][search][value]": "^\\-10$",
+                "columns[1][search][regex]": "true",
+            }
+        )
+        server_side = DataTablesServerSide(COLUMNS, params)
+        # when
+        page_qs, _, records_filtered = server_side.process(Contact.objects.all())
+        # then
+        self.assertEqual(records_filtered, Contact.objects.filter(standing=-10).count())
+        self.assertTrue(all(obj.standing == -10 for obj in page_qs))
+
+    def test_should_ignore_unknown_columns(self):
+        # given
+        params = make_params(
+            **{"columns[2][data]": "secret", "columns[2][search][value]": "x"}
+        )
+        server_side = DataTablesServerSide(COLUMNS, params)
+        # when
+        _, records_total, records_filtered = server_side.process(Contact.objects.all())
+        # then
+        self.assertEqual(records_filtered, records_total)
+
+    def test_should_return_same_state_for_same_result(self):
+        # given
+        server_side_1 = DataTablesServerSide(
+            COLUMNS, make_params(**{"draw": "1", "search[value]": "Bruce"})
+        )
+        server_side_2 = DataTablesServerSide(
+            COLUMNS, make_params(**{"draw": "7", "search[value]": " Bruce "})
+        )
+        # when/then
+        self.assertEqual(server_side_1.state(), server_side_2.state())
+
+    def test_should_return_different_state_for_different_result(self):
+        # given
+        server_side_1 = DataTablesServerSide(COLUMNS, make_params())
+        server_side_2 = DataTablesServerSide(
+            COLUMNS, make_params(**{"order[0][dir]": "desc"})
+        )
+        server_side_3 = DataTablesServerSide(COLUMNS, make_params(**{"start": "10"}))
+        # when/then
+        self.assertNotEqual(server_side_1.state(), server_side_2.state())
+        self.assertNotEqual(server_side_1.state(), server_side_3.state())
+
+    def test_should_create_params_for_initial_request(self):
+        # when
+        params = DataTablesServerSide.initial_params(COLUMNS)
+        # then
+        self.assertTrue(DataTablesServerSide.is_requested(params))
+        self.assertEqual(
+            DataTablesServerSide(COLUMNS, params).state(),
+            DataTablesServerSide(COLUMNS, make_params()).state(),
+        )
@@ -0,0 +1,104 @@
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from standingsrequests.helpers import esi_fetcher
+from standingsrequests.helpers.esi_fetcher import SingleFlight, fetch_many
+
+MODULE_PATH = "standingsrequests.helpers.esi_fetcher"
+
+
+class TestFetchMany(TestCase):
+    def setUp(self) -> None:
+        # the pool is sized on first use, so every test gets a new one
+        esi_fetcher._executor = None
+
+    def tearDown(self) -> None:
+        if esi_fetcher._executor:
+            esi_fetcher._executor.shutdown()
+            esi_fetcher._executor = None
+
+    def test_should_return_results_by_key(self):
+        # when
+        result = fetch_many(lambda x: x * 2, [1, 2, 3, 2])
+        # then
+        self.assertDictEqual(result, {1: 2, 2: 4, 3: 6})
+
+    def test_should_return_empty_dict_when_no_keys(self):
+        # when
+        result = fetch_many(lambda x: x * 2, [])
+        # then
+        self.assertDictEqual(result, {})
+
+    def test_should_propagate_exceptions(self):
+        def my_func(key):
+            raise ValueError()
+
+        # when/then
+        with self.assertRaises(ValueError):
+            fetch_many(my_func, [1, 2])
+
+    @patch(MODULE_PATH + ".SR_ESI_MAX_CONCURRENCY", 2)
+    def test_should_not_exceed_max_concurrency(self):
+        # given
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+        # each call waits for a second call, so calls always overlap
+        barrier = threading.Barrier(2, timeout=5)
+
+        def my_func(key):
+            with lock:
+                in_flight.append(key)
+                max_in_flight.append(len(in_flight))
+            barrier.wait()
+            with lock:
+                in_flight.remove(key)
+            return key
+
+        # when
+        result = fetch_many(my_func, range(10), max_concurrency=5)
+        # then
+        self.assertEqual(len(result), 10)
+        self.assertEqual(max(max_in_flight), 2)
+
+    def test_should_run_calls_concurrently(self):
+        # given
+        concurrency = 4
+        barrier = threading.Barrier(concurrency, timeout=5)
+
+        def my_func(key):
+            # only passes when all calls of a batch are in flight at the same time
+            barrier.wait()
+            return key * 2
+
+        # when
+        result = fetch_many(my_func, range(concurrency * 2), max_concurrency=4)
+        # then
+        self.assertDictEqual(result, {key: key * 2 for key in range(8)})
+
+
+class TestSingleFlight(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_release_lock_after_flight(self):
+        # given
+        single_flight = SingleFlight("DUMMY")
+        # when
+        with single_flight.flight(42):
+            self.assertIsNotNone(cache.get("DUMMY_LOCK_42"))
+        # then
+        self.assertIsNone(cache.get("DUMMY_LOCK_42"))
+
+    def test_should_not_release_lock_of_another_caller(self):
+        # given
+        single_flight = SingleFlight("DUMMY")
+        # when
+        with single_flight.flight(42):
+            # the lock expired and was acquired by another caller
+            cache.set("DUMMY_LOCK_42", "other")
+        # then
+        self.assertEqual(cache.get("DUMMY_LOCK_42"), "other")
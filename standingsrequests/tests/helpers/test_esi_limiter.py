@@ -0,0 +1,150 @@
+from unittest.mock import Mock, patch
+
+import requests
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from standingsrequests.helpers import esi_limiter
+from standingsrequests.providers import RateLimitedEsiClientProvider
+
+MODULE_PATH = "standingsrequests.helpers.esi_limiter"
+
+
+class FakeClock:
+    """Replaces the time module of the limiter. Sleeping advances the clock."""
+
+    def __init__(self, start: float = 1_700_000_000.0) -> None:
+        self.now = start
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestErrorBudget(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.clock = FakeClock()
+        patcher = patch(MODULE_PATH + ".time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_should_not_wait_when_no_budget_recorded(self):
+        # when
+        result = esi_limiter.seconds_until_error_limit_reset()
+        # then
+        self.assertEqual(result, 0)
+
+    @patch(MODULE_PATH + ".SR_ESI_ERROR_LIMIT_THRESHOLD", 25)
+    def test_should_not_wait_when_budget_is_sufficient(self):
+        # given
+        esi_limiter.record_response_headers(
+            {"X-Esi-Error-Limit-Remain": "99", "X-Esi-Error-Limit-Reset": "30"}
+        )
+        # when
+        result = esi_limiter.seconds_until_error_limit_reset()
+        # then
+        self.assertEqual(result, 0)
+
+    @patch(MODULE_PATH + ".SR_ESI_ERROR_LIMIT_THRESHOLD", 25)
+    def test_should_wait_until_reset_when_budget_is_low(self):
+        # given
+        esi_limiter.record_response_headers(
+            {"X-Esi-Error-Limit-Remain": "10", "X-Esi-Error-Limit-Reset": "30"}
+        )
+        self.clock.now += 5
+        # when
+        result = esi_limiter.seconds_until_error_limit_reset()
+        # then
+        self.assertEqual(result, 25)
+
+    def test_should_ignore_responses_without_error_limit_headers(self):
+        # when
+        esi_limiter.record_response_headers({"X-Pages": "1"})
+        # then
+        self.assertIsNone(cache.get(esi_limiter.CACHE_KEY_ERROR_LIMIT))
+
+    @patch(MODULE_PATH + ".SR_ESI_ERROR_LIMIT_THRESHOLD", 25)
+    def test_should_back_off_when_budget_is_low(self):
+        # given
+        esi_limiter.record_response_headers(
+            {"X-Esi-Error-Limit-Remain": "10", "X-Esi-Error-Limit-Reset": "30"}
+        )
+        # when
+        esi_limiter.wait_for_permit()
+        # then
+        self.assertEqual(self.clock.sleeps, [30])
+
+
+class TestRateLimit(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.clock = FakeClock(start=1_700_000_000.25)
+        patcher = patch(MODULE_PATH + ".time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch(MODULE_PATH + ".SR_ESI_MAX_REQUESTS_PER_SECOND", 5)
+    def test_should_not_exceed_max_rate(self):
+        # when
+        for _ in range(11):
+            esi_limiter.wait_for_permit()
+        # then
+        self.assertEqual(self.clock.sleeps, [0.75, 1.0])
+
+    @patch(MODULE_PATH + ".SR_ESI_MAX_REQUESTS_PER_SECOND", 100)
+    def test_should_not_wait_below_max_rate(self):
+        # when
+        for _ in range(10):
+            esi_limiter.wait_for_permit()
+        # then
+        self.assertListEqual(self.clock.sleeps, [])
+
+
+class TestRateLimitedHTTPAdapter(TestCase):
+    @patch(MODULE_PATH + ".HTTPAdapter.send")
+    @patch(MODULE_PATH + ".record_response_headers")
+    @patch(MODULE_PATH + ".wait_for_permit")
+    def test_should_wait_before_and_record_after_request(
+        self, mock_wait_for_permit, mock_record_response_headers, mock_send
+    ):
+        # given
+        calls = Mock()
+        calls.attach_mock(mock_wait_for_permit, "wait_for_permit")
+        calls.attach_mock(mock_send, "send")
+        calls.attach_mock(mock_record_response_headers, "record_response_headers")
+        response = Mock(headers={"X-Esi-Error-Limit-Remain": "100"})
+        mock_send.return_value = response
+        adapter = esi_limiter.RateLimitedHTTPAdapter()
+        request = Mock()
+        # when
+        result = adapter.send(request, timeout=5)
+        # then
+        self.assertIs(result, response)
+        self.assertListEqual(
+            [name for name, _, _ in calls.mock_calls],
+            ["wait_for_permit", "send", "record_response_headers"],
+        )
+        mock_send.assert_called_once_with(request, timeout=5)
+        mock_record_response_headers.assert_called_once_with(response.headers)
+
+
+class TestRateLimitedEsiClientProvider(TestCase):
+    @patch("esi.clients.esi_client_factory")
+    def test_should_mount_rate_limited_adapter(self, mock_esi_client_factory):
+        # given
+        session = requests.Session()
+        mock_esi_client_factory.return_value = Mock(
+            **{"swagger_spec.http_client.session": session}
+        )
+        provider = RateLimitedEsiClientProvider()
+        # when
+        provider.client
+        # then
+        adapter = session.get_adapter("https://esi.evetech.net/latest/")
+        self.assertIsInstance(adapter, esi_limiter.RateLimitedHTTPAdapter)
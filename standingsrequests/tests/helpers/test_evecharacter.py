@@ -1,56 +1,56 @@
-from allianceauth.eveonline.models import EveCharacter
 from app_utils.testing import NoSocketsTestCase
 
-from standingsrequests.helpers.evecharacter import EveCharacterHelper
+from standingsrequests.helpers.evecharacter import CharacterAffiliationInfo
 from standingsrequests.tests.testdata.my_test_data import (
     create_contacts_set,
-    create_entity,
     generate_eve_entities_from_allianceauth,
-    get_my_test_data,
 )
 
 MODULE_PATH = "standingsrequests.helpers.evecorporation"
 
 
-class TestEveCharacter(NoSocketsTestCase):
+class TestCharacterAffiliationInfo(NoSocketsTestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
         create_contacts_set()
-        create_entity(EveCharacter, 1001)
         generate_eve_entities_from_allianceauth()
 
-    def test_init_with_data_has_alliance(self):
-        character = EveCharacterHelper(character_id=1002)
+    def test_should_preload_affiliations_with_one_query(self):
+        # when
+        with self.assertNumQueries(1):
+            result = CharacterAffiliationInfo.preload([1002, 1004])
+        # then
+        self.assertSetEqual(set(result.keys()), {1002, 1004})
+        character = result[1002]
         self.assertEqual(character.character_id, 1002)
         self.assertEqual(character.character_name, "Peter Parker")
         self.assertEqual(character.corporation_id, 2001)
         self.assertEqual(character.corporation_name, "Wayne Technologies")
         self.assertEqual(character.alliance_id, 3001)
         self.assertEqual(character.alliance_name, "Wayne Enterprises")
-
-    def test_init_with_data_has_no_alliance(self):
-        character = EveCharacterHelper(character_id=1004)
-        self.assertEqual(character.character_id, 1004)
-        self.assertEqual(character.character_name, "Kara Danvers")
+        self.assertIsNone(character.corporation_ticker)
+        character = result[1004]
         self.assertEqual(character.corporation_id, 2003)
-        self.assertEqual(character.corporation_name, "CatCo Worldwide Media")
         self.assertIsNone(character.alliance_id)
         self.assertIsNone(character.alliance_name)
 
-    def test_init_with_data_has_no_main(self):
-        character = EveCharacterHelper(character_id=1001)
-        self.assertEqual(character.character_id, 1001)
-        self.assertEqual(character.character_name, "Bruce Wayne")
-        self.assertEqual(character.corporation_id, 2001)
-        self.assertEqual(character.corporation_name, "Wayne Technologies")
-        self.assertEqual(character.alliance_id, 3001)
-        self.assertEqual(character.alliance_name, "Wayne Enterprises")
-
-    def test_init_without_data(self):
-        EveCharacter.objects.filter(character_id=1001).delete()
-        data = get_my_test_data()["EveCharacter"]["1001"]
-        EveCharacter.objects.create(**data)
-        character = EveCharacterHelper(character_id=1001)
-        self.assertEqual(character.character_id, 1001)
-        self.assertEqual(character.character_name, "Bruce Wayne")
+    def test_should_return_empty_record_for_unknown_character(self):
+        # when
+        result = CharacterAffiliationInfo.preload([9999])
+        # then
+        character = result[9999]
+        self.assertEqual(character.character_id, 9999)
+        self.assertIsNone(character.character_name)
+        self.assertIsNone(character.corporation_id)
+        self.assertEqual(
+            character.portrait_url(32),
+            "https://images.evetech.net/characters/9999/portrait?size=32",
+        )
+
+    def test_should_return_empty_dict_when_no_characters(self):
+        # when
+        with self.assertNumQueries(0):
+            result = CharacterAffiliationInfo.preload([])
+        # then
+        self.assertDictEqual(result, {})
@@ -1,9 +1,16 @@
+import threading
+import time
 from unittest.mock import patch
 
+from bravado.exception import HTTPInternalServerError
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 from eveuniverse.models import EveEntity
 
 from allianceauth.eveonline.models import EveCharacter
+from app_utils.esi_testing import BravadoResponseStub
 from app_utils.testing import (
     NoSocketsTestCase,
     add_character_to_user,
@@ -120,6 +127,82 @@ class TestEveCorporation(NoSocketsTestCase):
         self.assertIsNone(normal_corp.alliance_name)
 
 
+@patch(EVECORPORATION_PATH + ".esi")
+class TestEveCorporationGetByIdCaching(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        EveEntity.objects.create(id=3001, name="Wayne Enterprises", category="alliance")
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_cache_corporations_not_found(self, mock_esi):
+        # given
+        mock_Corporation = mock_esi.client.Corporation
+        mock_Corporation.get_corporations_corporation_id.side_effect = (
+            esi_get_corporations_corporation_id
+        )
+        # when
+        result_1 = EveCorporation.get_by_id(9876)
+        result_2 = EveCorporation.get_by_id(9876)
+        # then
+        self.assertIsNone(result_1)
+        self.assertIsNone(result_2)
+        self.assertEqual(mock_Corporation.get_corporations_corporation_id.call_count, 1)
+
+    def test_should_not_cache_transient_errors(self, mock_esi):
+        # given
+        mock_Corporation = mock_esi.client.Corporation
+        mock_Corporation.get_corporations_corporation_id.side_effect = [
+            HTTPInternalServerError(BravadoResponseStub(500, reason="Test Exception")),
+            esi_get_corporations_corporation_id(2102),
+        ]
+        # when
+        result_1 = EveCorporation.get_by_id(2102)
+        result_2 = EveCorporation.get_by_id(2102)
+        # then
+        self.assertIsNone(result_1)
+        self.assertEqual(result_2.corporation_id, 2102)
+        self.assertEqual(mock_Corporation.get_corporations_corporation_id.call_count, 2)
+
+    def test_should_refetch_corporations_not_found_when_ignoring_cache(self, mock_esi):
+        # given
+        mock_Corporation = mock_esi.client.Corporation
+        mock_Corporation.get_corporations_corporation_id.side_effect = (
+            esi_get_corporations_corporation_id
+        )
+        EveCorporation.get_by_id(9876)
+        # when
+        EveCorporation.get_by_id(9876, ignore_cache=True)
+        # then
+        self.assertEqual(mock_Corporation.get_corporations_corporation_id.call_count, 2)
+
+    def test_should_fetch_only_once_for_concurrent_requests(self, mock_esi):
+        # given
+        def slow_esi_stub(*args, **kwargs):
+            time.sleep(0.1)
+            return esi_get_corporations_corporation_id(*args, **kwargs)
+
+        mock_Corporation = mock_esi.client.Corporation
+        mock_Corporation.get_corporations_corporation_id.side_effect = slow_esi_stub
+        results = []
+        # when
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(EveCorporation.get_by_id(2102))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # then
+        self.assertEqual(mock_Corporation.get_corporations_corporation_id.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(obj.corporation_id == 2102 for obj in results))
+
+
 class TestMemberTokensCountForUser(TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -148,6 +231,58 @@ class TestMemberTokensCountForUser(TestCase):
         self.assertEqual(result, 2)
 
 
+class TestMemberTokensCountsForUser(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        create_eve_objects()
+
+    def test_should_count_valid_characters_per_corporation(self):
+        # given
+        user, _ = create_user_from_evecharacter(1001, scopes=["special-scope"])
+        add_character_to_user(
+            user, EveCharacter.objects.get(character_id=1002), scopes=["special-scope"]
+        )  # same corp and valid scope
+        add_character_to_user(
+            user, EveCharacter.objects.get(character_id=1003)
+        )  # same corp, but invalid scope
+        add_character_to_user(
+            user, EveCharacter.objects.get(character_id=1006), scopes=["special-scope"]
+        )  # different corp and valid scope
+        add_character_to_user(
+            user, EveCharacter.objects.get(character_id=1008), scopes=["special-scope"]
+        )  # corp not requested
+        character_1006 = EveCharacter.objects.get(character_id=1006)
+
+        # when
+        with patch(MODELS_PATH + ".SR_REQUIRED_SCOPES", {"Guest": {"special-scope"}}):
+            result = EveCorporation.member_tokens_counts_for_user(
+                user, [2001, character_1006.corporation_id, 2987], quick_check=True
+            )
+
+        # then
+        self.assertDictEqual(result, {2001: 2, character_1006.corporation_id: 1})
+
+    def test_should_need_constant_number_of_queries(self):
+        # given
+        user, _ = create_user_from_evecharacter(1001, scopes=["special-scope"])
+        for character_id in [1002, 1003, 1006]:
+            add_character_to_user(
+                user,
+                EveCharacter.objects.get(character_id=character_id),
+                scopes=["special-scope"],
+            )
+        user = User.objects.select_related("profile__state").get(pk=user.pk)
+
+        # when/then
+        with patch(
+            MODELS_PATH + ".SR_REQUIRED_SCOPES", {"Guest": {"special-scope"}}
+        ), self.assertNumQueries(2):
+            EveCorporation.member_tokens_counts_for_user(
+                user, [2001, 2002, 2003], quick_check=True
+            )
+
+
 class TestGetManyById(TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from eveuniverse.models import EveEntity
+
+from standingsrequests.helpers.icon_labels import (
+    DEFAULT_ICON_SIZE,
+    IconLabelRenderer,
+    label_with_icon,
+)
+
+MODULE_PATH = "standingsrequests.helpers.icon_labels"
+
+
+class TestIconLabelRenderer(TestCase):
+    def test_should_render_same_html_as_label_with_icon(self):
+        # given
+        renderer = IconLabelRenderer()
+        for category in [
+            EveEntity.CATEGORY_ALLIANCE,
+            EveEntity.CATEGORY_CHARACTER,
+            EveEntity.CATEGORY_CORPORATION,
+        ]:
+            with self.subTest(category=category):
+                entity = EveEntity(id=2001, name="Wayne <Tech>", category=category)
+                # when
+                result = renderer.entity_label(entity.id, category, entity.name)
+                # then
+                expected = label_with_icon(
+                    entity.icon_url(DEFAULT_ICON_SIZE), entity.name
+                )
+                self.assertEqual(result, expected)
+
+    def test_should_render_label_with_any_icon(self):
+        # given
+        renderer = IconLabelRenderer()
+        # when
+        result = renderer.label("https://a.b/c?x=1&y=2", "Bruce & Alfred")
+        # then
+        self.assertEqual(
+            result, label_with_icon("https://a.b/c?x=1&y=2", "Bruce & Alfred")
+        )
+
+    @patch(MODULE_PATH + ".eveimageserver")
+    def test_should_render_icons_with_eveimageserver(self, mock_eveimageserver):
+        # given
+        mock_eveimageserver.character_portrait_url.return_value = "https://a.b/c"
+        renderer = IconLabelRenderer()
+        # when
+        result = renderer.entity_label(1001, EveEntity.CATEGORY_CHARACTER, "Bruce")
+        # then
+        mock_eveimageserver.character_portrait_url.assert_called_once_with(
+            1001, DEFAULT_ICON_SIZE
+        )
+        self.assertEqual(result, label_with_icon("https://a.b/c", "Bruce"))
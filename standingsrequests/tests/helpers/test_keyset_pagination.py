@@ -0,0 +1,70 @@
+import datetime as dt
+
+from django.test import TestCase
+from django.utils.timezone import now
+
+from allianceauth.tests.auth_utils import AuthUtils
+
+from standingsrequests.helpers import keyset_pagination
+from standingsrequests.models import StandingRequest
+
+from ..testdata.entity_type_ids import CHARACTER_TYPE_ID
+
+
+class TestKeysetPagination(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        user = AuthUtils.create_member("Bruce Wayne")
+        base_date = now()
+        cls.request_ids = []
+        # the last two requests share the same date
+        for contact_id, minutes in [(1001, 0), (1002, 1), (1003, 2), (1004, 2)]:
+            obj = StandingRequest.objects.create(
+                user=user, contact_id=contact_id, contact_type_id=CHARACTER_TYPE_ID
+            )
+            StandingRequest.objects.filter(pk=obj.pk).update(
+                request_date=base_date + dt.timedelta(minutes=minutes)
+            )
+            cls.request_ids.append(obj.pk)
+
+    def test_should_return_all_objects_on_one_page(self):
+        # when
+        page = keyset_pagination.paginate(
+            StandingRequest.objects.all(), "request_date", page_size=10
+        )
+        # then
+        self.assertListEqual(page.object_ids, self.request_ids)
+        self.assertIsNone(page.next_cursor)
+
+    def test_should_return_pages_in_order(self):
+        # given
+        qs = StandingRequest.objects.all()
+        # when
+        page_1 = keyset_pagination.paginate(qs, "request_date", page_size=3)
+        page_2 = keyset_pagination.paginate(
+            qs, "request_date", cursor=page_1.next_cursor, page_size=3
+        )
+        # then
+        self.assertListEqual(page_1.object_ids, self.request_ids[:3])
+        self.assertIsNotNone(page_1.next_cursor)
+        self.assertListEqual(page_2.object_ids, self.request_ids[3:])
+        self.assertIsNone(page_2.next_cursor)
+
+    def test_should_not_shift_pages_when_objects_are_removed(self):
+        # given
+        qs = StandingRequest.objects.all()
+        page_1 = keyset_pagination.paginate(qs, "request_date", page_size=2)
+        StandingRequest.objects.filter(pk=self.request_ids[0]).delete()
+        # when
+        page_2 = keyset_pagination.paginate(
+            qs, "request_date", cursor=page_1.next_cursor, page_size=2
+        )
+        # then
+        self.assertListEqual(page_2.object_ids, self.request_ids[2:])
+
+    def test_should_raise_error_for_invalid_cursor(self):
+        qs = StandingRequest.objects.all()
+        for cursor in ["invalid", "2022-01-01T00:00:00+00:00_abc", "_12"]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    keyset_pagination.paginate(qs, "request_date", cursor=cursor)
@@ -0,0 +1,78 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from standingsrequests.helpers import standings_cache
+
+MODULE_PATH = "standingsrequests.helpers.standings_cache"
+
+
+class TestStandingsCache(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_build_and_cache_data(self):
+        # given
+        build = Mock(return_value={"data": [1, 2]})
+        # when
+        data_1 = standings_cache.get_or_build("characters", True, (0, 10), build)
+        data_2 = standings_cache.get_or_build("characters", True, (0, 10), build)
+        # then
+        self.assertDictEqual(data_1, {"data": [1, 2]})
+        self.assertDictEqual(data_2, {"data": [1, 2]})
+        self.assertEqual(build.call_count, 1)
+
+    def test_should_not_cache_data_when_timeout_is_zero(self):
+        # given
+        build = Mock(return_value={"data": [1, 2]})
+        # when
+        standings_cache.get_or_build("characters", True, (0, 10), build, timeout=0)
+        standings_cache.get_or_build("characters", True, (0, 10), build, timeout=0)
+        # then
+        self.assertEqual(build.call_count, 2)
+
+    def test_should_cache_data_per_permission_level_and_state(self):
+        # given
+        standings_cache.get_or_build("characters", True, (0, 10), lambda: {"a": 1})
+        # when
+        data_1 = standings_cache.get_or_build(
+            "characters", False, (0, 10), lambda: {"b": 2}
+        )
+        data_2 = standings_cache.get_or_build(
+            "characters", True, (10, 10), lambda: {"c": 3}
+        )
+        # then
+        self.assertDictEqual(data_1, {"b": 2})
+        self.assertDictEqual(data_2, {"c": 3})
+
+    def test_should_rebuild_data_after_version_was_bumped(self):
+        # given
+        standings_cache.get_or_build("characters", True, (0, 10), lambda: {"a": 1})
+        # when
+        standings_cache.bump_version()
+        data = standings_cache.get_or_build(
+            "characters", True, (0, 10), lambda: {"a": 2}
+        )
+        # then
+        self.assertDictEqual(data, {"a": 2})
+
+    @patch(MODULE_PATH + ".time.time")
+    def test_should_start_with_new_version_after_cache_was_cleared(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        standings_cache.get_or_build("characters", True, (0, 10), lambda: {"a": 1})
+        cache.delete(standings_cache.CACHE_KEY_VERSION)
+        mock_time.return_value = 1001.0
+        # when
+        data = standings_cache.get_or_build(
+            "characters", True, (0, 10), lambda: {"a": 2}
+        )
+        # then
+        self.assertDictEqual(data, {"a": 2})
+
+    def test_should_bump_version_when_not_yet_set(self):
+        # when
+        standings_cache.bump_version()
+        # then
+        self.assertIsNotNone(cache.get(standings_cache.CACHE_KEY_VERSION))
@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from allianceauth.tests.auth_utils import AuthUtils
+
+from standingsrequests.auth_hooks import StandingsRequestMenuItem
+from standingsrequests.models import StandingRequest
+
+from .testdata.entity_type_ids import CHARACTER_TYPE_ID
+
+
+class TestStandingsRequestMenuItem(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.factory = RequestFactory()
+        cls.user = AuthUtils.create_member("Bruce Wayne")
+        cls.user = AuthUtils.add_permission_to_user_by_name(
+            StandingRequest.REQUEST_PERMISSION_NAME, cls.user
+        )
+        cls.user = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.affect_standings", cls.user
+        )
+        StandingRequest.objects.create(
+            user=cls.user, contact_id=1001, contact_type_id=CHARACTER_TYPE_ID
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_show_pending_count_without_queries(self):
+        # given
+        menu_item = StandingsRequestMenuItem()
+        request = self.factory.get("/")
+        request.user = self.user
+        menu_item.render(request)
+        # when
+        with self.assertNumQueries(0):
+            menu_item.render(request)
+        # then
+        self.assertEqual(menu_item.count, 1)
@@ -17,6 +17,7 @@ from standingsrequests import tasks
 from standingsrequests.core.contact_types import ContactTypeId
 from standingsrequests.models import (
     Contact,
+    CorporationDetails,
     RequestLogEntry,
     StandingRequest,
     StandingRevocation,
@@ -79,6 +80,14 @@ class TestMainUseCases(WebTest):
         cls.alt_corporation = EveCorporationInfo.objects.get(
             corporation_id=cls.alt_character_1.corporation_id
         )
+        alt_corporation_data = esi_get_corporations_corporation_id(
+            cls.alt_corporation.corporation_id
+        ).results()
+        CorporationDetails.objects.create(
+            corporation_id=cls.alt_corporation.corporation_id,
+            member_count=alt_corporation_data["member_count"],
+            ticker=alt_corporation_data["ticker"],
+        )
         cls.alt_character_2 = EveCharacter.objects.get(character_id=1008)
         add_character_to_user(
             cls.user_requestor,
@@ -160,7 +169,7 @@ class TestMainUseCases(WebTest):
         self.contact_set.refresh_from_db()
 
     def _parse_contacts_data(self, response, key: str):
-        return {row["contact_id"]: row for row in response.context.dicts[3][key]}
+        return {row["contact_id"]: row for row in response.context[key]}
 
     def _setup_mocks(self, mock_esi, mock_esi_manager):
         mock_esi.client.Corporation.get_corporations_corporation_id.side_effect = (
@@ -9,15 +9,19 @@ from eveuniverse.models import EveEntity
 
 from allianceauth.eveonline.models import EveCharacter
 from allianceauth.tests.auth_utils import AuthUtils
-from app_utils.esi_testing import BravadoResponseStub
+from app_utils.esi_testing import BravadoOperationStub, BravadoResponseStub
 from app_utils.testing import NoSocketsTestCase, add_character_to_user, create_fake_user
 
 from standingsrequests.core import app_config
+from standingsrequests.helpers import standings_cache
 from standingsrequests.models import (
     AbstractStandingsRequest,
     CharacterAffiliation,
     Contact,
+    ContactHistory,
+    ContactLabel,
     ContactSet,
+    ContactSnapshot,
     CorporationDetails,
     FrozenAlt,
     FrozenAuthUser,
@@ -32,11 +36,13 @@ from .testdata.my_test_data import (
     TEST_STANDINGS_API_CHARNAME,
     create_contacts_set,
     create_entity,
+    create_eve_objects,
     create_standings_char,
     esi_get_alliances_alliance_id_contacts,
     esi_get_alliances_alliance_id_contacts_labels,
     esi_get_corporations_corporation_id,
     esi_post_characters_affiliation,
+    load_corporation_details,
     load_eve_entities,
 )
 
@@ -97,6 +103,47 @@ class TestContactSetManager(NoSocketsTestCase):
         }
         self.assertSetEqual(all_contacts, expected)
 
+    @patch(CORE_PATH + ".app_config.STANDINGS_API_CHARID", TEST_STANDINGS_API_CHARID)
+    @patch(CORE_PATH + ".app_config.SR_OPERATION_MODE", "alliance")
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_add_labels_to_contacts(self, mock_esi):
+        # given
+        mock_Contacts = mock_esi.client.Contacts
+        mock_Contacts.get_alliances_alliance_id_contacts_labels.side_effect = (
+            esi_get_alliances_alliance_id_contacts_labels
+        )
+        mock_Contacts.get_alliances_alliance_id_contacts.side_effect = (
+            esi_get_alliances_alliance_id_contacts
+        )
+        # when
+        contact_set = ContactSet.objects.create_new_from_api()
+        # then
+        contact_1002 = contact_set.contacts.get(eve_entity_id=1002)
+        self.assertListEqual(contact_1002.labels_sorted, ["blue", "green"])
+        self.assertEqual(contact_1002.label_mask, 0b11)
+        contact_1003 = contact_set.contacts.get(eve_entity_id=1003)
+        self.assertListEqual(contact_1003.labels_sorted, ["yellow"])
+        self.assertEqual(contact_1003.label_mask, 0b100)
+
+    @patch(CORE_PATH + ".app_config.STANDINGS_API_CHARID", TEST_STANDINGS_API_CHARID)
+    @patch(CORE_PATH + ".app_config.SR_OPERATION_MODE", "alliance")
+    @patch(MANAGERS_PATH + ".esi")
+    def test_should_ignore_duplicate_contacts(self, mock_esi):
+        # given
+        mock_Contacts = mock_esi.client.Contacts
+        mock_Contacts.get_alliances_alliance_id_contacts_labels.side_effect = (
+            esi_get_alliances_alliance_id_contacts_labels
+        )
+        contacts = esi_get_alliances_alliance_id_contacts().results()
+        mock_Contacts.get_alliances_alliance_id_contacts.return_value = (
+            BravadoOperationStub(contacts + contacts[:2])
+        )
+        # when
+        contact_set = ContactSet.objects.create_new_from_api()
+        # then
+        self.assertEqual(contact_set.contacts.count(), len(contacts))
+        self.assertEqual(contact_set.contacts.filter(eve_entity_id=1001).count(), 1)
+
     @patch(CORE_PATH + ".app_config.STANDINGS_API_CHARID", TEST_STANDINGS_API_CHARID)
     def test_standings_character_exists(self):
         character = create_standings_char()
@@ -118,6 +165,100 @@ class TestContactSetManager(NoSocketsTestCase):
         self.assertTrue(EveEntity.objects.filter(id=TEST_STANDINGS_API_CHARID).exists())
 
 
+class TestContactSetManagerPurge(TestCase):
+    def test_should_delete_contact_set_with_contacts_and_labels(self):
+        # given
+        set_1 = create_contacts_set()
+        set_2 = create_contacts_set()
+        contacts_count = set_1.contacts.count()
+        labels_count = set_1.labels.count()
+        relations_count = Contact.labels.through.objects.filter(
+            contact__contact_set=set_1
+        ).count()
+        # when
+        deleted_count = ContactSet.objects.purge(set_1.pk, chunk_size=3)
+        # then
+        self.assertEqual(
+            deleted_count, contacts_count + labels_count + relations_count + 1
+        )
+        self.assertFalse(ContactSet.objects.filter(pk=set_1.pk).exists())
+        self.assertFalse(Contact.objects.filter(contact_set_id=set_1.pk).exists())
+        self.assertFalse(ContactLabel.objects.filter(contact_set_id=set_1.pk).exists())
+        self.assertFalse(
+            Contact.labels.through.objects.filter(
+                contact__contact_set_id=set_1.pk
+            ).exists()
+        )
+        self.assertEqual(set_2.contacts.count(), contacts_count)
+        self.assertEqual(set_2.labels.count(), labels_count)
+
+    def test_should_do_nothing_when_contact_set_does_not_exist(self):
+        # when
+        deleted_count = ContactSet.objects.purge(999)
+        # then
+        self.assertEqual(deleted_count, 0)
+
+    def test_should_purge_all_relations_to_contact_sets(self):
+        """Purging skips cascades of the delete collector with raw deletes,
+        so new relations to these models must be purged explicitly.
+        """
+        # when
+        relations = {
+            (model.__name__, rel.related_model._meta.label, rel.field.name)
+            for model in [ContactSet, Contact, ContactLabel]
+            for rel in model._meta.get_fields(include_hidden=True)
+            if rel.auto_created and not rel.concrete
+        }
+        # then
+        expected = {
+            ("ContactSet", "standingsrequests.Contact", "contact_set"),
+            ("ContactSet", "standingsrequests.ContactLabel", "contact_set"),
+            ("Contact", "standingsrequests.Contact_labels", "contact"),
+            ("ContactLabel", "standingsrequests.Contact_labels", "contactlabel"),
+            ("ContactLabel", "standingsrequests.Contact", "labels"),
+        }
+        self.assertSetEqual(relations, expected)
+
+
+class TestContactQuerySet(TestCase):
+    def test_should_filter_contacts_by_label(self):
+        # given
+        contact_set = create_contacts_set()
+        create_contacts_set()
+        label = contact_set.labels.get(name="green")
+        # when
+        contact_ids = set(
+            Contact.objects.filter_label(label).values_list("eve_entity_id", flat=True)
+        )
+        # then
+        expected = set(
+            contact_set.contacts.filter(labels=label).values_list(
+                "eve_entity_id", flat=True
+            )
+        )
+        self.assertTrue(expected)
+        self.assertSetEqual(contact_ids, expected)
+
+    def test_should_filter_contacts_by_label_without_bit(self):
+        # given
+        contact_set = create_contacts_set()
+        label = contact_set.labels.get(name="green")
+        # when
+        with patch(MODELS_PATH + ".Contact.LABEL_MASK_BITS", 1):
+            contact_ids = set(
+                Contact.objects.filter_label(label).values_list(
+                    "eve_entity_id", flat=True
+                )
+            )
+        # then
+        expected = set(
+            contact_set.contacts.filter(labels=label).values_list(
+                "eve_entity_id", flat=True
+            )
+        )
+        self.assertSetEqual(contact_ids, expected)
+
+
 class TestAbstractStandingsRequestManager(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -318,6 +459,42 @@ class TestAbstractStandingsRequestAnnotations(TestCase):
         self.assertFalse(requests.get(pk=r2.pk).is_pending_annotated)
 
 
+class TestAbstractStandingsRequestQueryPlans(TestCase):
+    """Ensure the queries for the states of requests use the matching indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = AuthUtils.create_user("Roger Requestor")
+        for contact_id in range(1001, 1011):
+            StandingRequest.objects.create(
+                user=user, contact_id=contact_id, contact_type_id=CHARACTER_TYPE_ID
+            )
+
+    def assertQueryUsesIndex(self, qs, index_name: str):
+        plan = qs.explain()
+        self.assertIn(index_name, plan, f"Index not used. Query plan:\n{plan}")
+
+    def test_pending_requests(self):
+        for model in [StandingRequest, StandingRevocation]:
+            with self.subTest(model=model.__name__):
+                qs = model.objects.pending_requests().order_by("request_date", "pk")
+                self.assertQueryUsesIndex(qs, "sr_request_pending_idx")
+
+    def test_has_pending_request(self):
+        for model in [StandingRequest, StandingRevocation]:
+            with self.subTest(model=model.__name__):
+                qs = model.objects.pending_requests().filter(contact_id=1001)
+                self.assertQueryUsesIndex(qs, "sr_request_contact_state_idx")
+
+    def test_request_states_of_contacts(self):
+        qs = (
+            StandingRequest.objects.filter(contact_id__in=[1001, 1002])
+            .annotate_is_pending()
+            .annotate_is_actioned()
+        )
+        self.assertQueryUsesIndex(qs, "sr_request_contact_state_idx")
+
+
 @patch(MODELS_PATH + ".StandingRequest.can_request_corporation_standing")
 class TestStandingsRequestValidateRequests(TestCase):
     @classmethod
@@ -595,8 +772,282 @@ class TestCorporationDetailsManager(NoSocketsTestCase):
         expected = {2001, 2003, 2004, 2102}
         self.assertSetEqual(result, expected)
 
+    def test_should_return_corporation_ids_from_requests(self, _mock_esi):
+        # given
+        user = AuthUtils.create_user("Bruce_Wayne")
+        StandingRequest.objects.create(
+            user=user, contact_id=2001, contact_type_id=CORPORATION_TYPE_ID
+        )
+        StandingRevocation.objects.create(
+            contact_id=2003, contact_type_id=CORPORATION_TYPE_ID
+        )
+        StandingRequest.objects.create(
+            user=user, contact_id=1001, contact_type_id=CHARACTER_TYPE_ID
+        )
+        # when
+        result = CorporationDetails.objects.corporation_ids_from_requests()
+        # then
+        self.assertSetEqual(result, {2001, 2003})
+
+    @patch(CORE_PATH + ".app_config.STR_CORP_IDS", [])
+    @patch(CORE_PATH + ".app_config.STR_ALLIANCE_IDS", [3001])
+    def test_should_return_corporation_ids_from_requestors(self, _mock_esi):
+        # given
+        create_eve_objects()
+        user = AuthUtils.create_user("Bruce_Wayne")
+        for character_id in [1001, 1007]:
+            add_character_to_user(
+                user, EveCharacter.objects.get(character_id=character_id)
+            )
+        # when
+        result = CorporationDetails.objects.corporation_ids_from_requestors()
+        # then
+        expected = {EveCharacter.objects.get(character_id=1007).corporation_id}
+        self.assertSetEqual(result, expected)
+
+
+class TestContactSnapshotManager(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        load_eve_entities()
+        create_eve_objects()
+        load_corporation_details()
+
+    def setUp(self) -> None:
+        self.contact_set = create_contacts_set()
+        CharacterAffiliation.objects.update_evecharacter_relations()
+
+    def test_should_create_snapshots_for_all_contacts(self):
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        self.assertSetEqual(
+            set(ContactSnapshot.objects.values_list("contact_id", flat=True)),
+            set(self.contact_set.contacts.values_list("eve_entity_id", flat=True)),
+        )
+        obj = ContactSnapshot.objects.get(contact_id=1002)
+        self.assertEqual(obj.category, EveEntity.CATEGORY_CHARACTER)
+        self.assertEqual(obj.name, "Peter Parker")
+        self.assertEqual(obj.standing, 10.0)
+        self.assertEqual(obj.labels_str, "blue, green")
+        self.assertEqual(obj.corporation_id, 2001)
+        self.assertEqual(obj.corporation_name, "Wayne Technologies")
+        self.assertEqual(obj.corporation_ticker, "WYE")
+        self.assertEqual(obj.alliance_id, 3001)
+        self.assertEqual(obj.alliance_name, "Wayne Enterprises")
+        self.assertEqual(obj.faction_name, "")
+        self.assertFalse(obj.has_owner)
+        obj = ContactSnapshot.objects.get(contact_id=2001)
+        self.assertEqual(obj.category, EveEntity.CATEGORY_CORPORATION)
+        self.assertEqual(obj.alliance_id, 3001)
+        self.assertEqual(obj.alliance_name, "Wayne Enterprises")
+
+    def test_should_add_owner_of_character(self):
+        # given
+        user = AuthUtils.create_member("Peter Parker")
+        character = EveCharacter.objects.get(character_id=1002)
+        add_character_to_user(user, character, is_main=True)
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        obj = ContactSnapshot.objects.get(contact_id=1002)
+        self.assertEqual(obj.state_name, "Guest")
+        self.assertEqual(obj.main_character_id, 1002)
+        self.assertEqual(obj.main_character_name, "Peter Parker")
+        self.assertEqual(obj.main_character_ticker, "WYE")
+
+    def test_should_add_requestor_of_corporation(self):
+        # given
+        user = AuthUtils.create_member("Peter Parker")
+        character = EveCharacter.objects.get(character_id=1002)
+        add_character_to_user(user, character, is_main=True)
+        StandingRequest.objects.create(
+            user=user, contact_id=2102, contact_type_id=CORPORATION_TYPE_ID
+        )
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        obj = ContactSnapshot.objects.get(contact_id=2102)
+        self.assertEqual(obj.state_name, "Guest")
+        self.assertEqual(obj.main_character_name, "Peter Parker")
+
+    def test_should_mark_unknown_organizations(self):
+        # given
+        CharacterAffiliation.objects.filter(character_id=1002).delete()
+        CorporationDetails.objects.filter(corporation_id=2001).delete()
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        obj = ContactSnapshot.objects.get(contact_id=1002)
+        self.assertIsNone(obj.corporation_name)
+        self.assertIsNone(obj.alliance_name)
+        obj = ContactSnapshot.objects.get(contact_id=2001)
+        self.assertIsNone(obj.alliance_name)
+
+    def test_should_only_write_changed_snapshots(self):
+        # given
+        ContactSnapshot.objects.rebuild()
+        self.contact_set.contacts.filter(eve_entity_id=1002).update(standing=5.0)
+        self.contact_set.contacts.filter(eve_entity_id=1004).delete()
+        # when
+        with patch(
+            MANAGERS_PATH + ".ContactSnapshotManager.bulk_update",
+            wraps=ContactSnapshot.objects.bulk_update,
+        ) as spy_bulk_update:
+            ContactSnapshot.objects.rebuild()
+        # then
+        updated_objs = spy_bulk_update.call_args[0][0]
+        self.assertListEqual([obj.contact_id for obj in updated_objs], [1002])
+        self.assertEqual(ContactSnapshot.objects.get(contact_id=1002).standing, 5.0)
+        self.assertFalse(ContactSnapshot.objects.filter(contact_id=1004).exists())
+
+    def test_should_rebuild_given_contacts_only(self):
+        # given
+        ContactSnapshot.objects.rebuild()
+        self.contact_set.contacts.filter(eve_entity_id__in=[1002, 2001]).update(
+            standing=0.0
+        )
+        # when
+        ContactSnapshot.objects.rebuild(contact_ids=[2001])
+        # then
+        self.assertEqual(ContactSnapshot.objects.get(contact_id=2001).standing, 0.0)
+        self.assertEqual(ContactSnapshot.objects.get(contact_id=1002).standing, 10.0)
+
+    def test_should_use_latest_contact_set(self):
+        # given
+        ContactSnapshot.objects.rebuild()
+        new_contact_set = ContactSet.objects.create(name="New Set")
+        Contact.objects.create(
+            contact_set=new_contact_set,
+            eve_entity=EveEntity.objects.get(id=1002),
+            standing=-5.0,
+        )
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        self.assertListEqual(
+            list(ContactSnapshot.objects.values_list("contact_id", "standing")),
+            [(1002, -5.0)],
+        )
+
+    def test_should_delete_all_snapshots_without_contact_set(self):
+        # given
+        ContactSnapshot.objects.rebuild()
+        ContactSet.objects.all().delete()
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        self.assertFalse(ContactSnapshot.objects.exists())
+
+    def test_should_invalidate_standings_cache_when_snapshots_changed(self):
+        # given
+        ContactSnapshot.objects.rebuild()
+        version = standings_cache.current_version()
+        self.contact_set.contacts.filter(eve_entity_id=1002).update(standing=5.0)
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        self.assertGreater(standings_cache.current_version(), version)
+
+    def test_should_keep_standings_cache_when_nothing_changed(self):
+        # given
+        ContactSnapshot.objects.rebuild()
+        version = standings_cache.current_version()
+        # when
+        ContactSnapshot.objects.rebuild()
+        # then
+        self.assertEqual(standings_cache.current_version(), version)
+
 
 @override_settings(CELERY_ALWAYS_EAGER=True, CELERY_EAGER_PROPAGATES_EXCEPTIONS=True)
+class TestContactHistoryManager(NoSocketsTestCase):
+    def setUp(self) -> None:
+        self.date_1 = now() - timedelta(days=2)
+        self.date_2 = now() - timedelta(days=1)
+        self.set_1 = create_contacts_set()
+        ContactSet.objects.filter(pk=self.set_1.pk).update(date=self.date_1)
+        self.set_1.refresh_from_db()
+
+    def _create_changed_contact_set(self) -> ContactSet:
+        set_2 = create_contacts_set()
+        ContactSet.objects.filter(pk=set_2.pk).update(date=self.date_2)
+        set_2.refresh_from_db()
+        set_2.contacts.filter(eve_entity_id=1001).update(standing=-10)
+        set_2.contacts.filter(eve_entity_id=1002).delete()
+        set_2.contacts.filter(eve_entity_id=1003).update(label_names=["red", "yellow"])
+        return set_2
+
+    def test_should_open_intervals_for_first_contact_set(self):
+        # when
+        ContactHistory.objects.update_from_contact_set(self.set_1)
+        # then
+        self.assertEqual(ContactHistory.objects.count(), self.set_1.contacts.count())
+        obj = ContactHistory.objects.get(contact_id=1002)
+        self.assertEqual(obj.standing, 10)
+        self.assertEqual(obj.label_names, ["blue", "green"])
+        self.assertEqual(obj.valid_from, self.date_1)
+        self.assertTrue(obj.is_current)
+
+    def test_should_record_changes_from_next_contact_set(self):
+        # given
+        ContactHistory.objects.update_from_contact_set(self.set_1)
+        set_2 = self._create_changed_contact_set()
+        # when
+        ContactHistory.objects.update_from_contact_set(set_2)
+        # then
+        history_1001 = list(
+            ContactHistory.objects.history(1001).values_list(
+                "standing", "valid_from", "valid_to"
+            )
+        )
+        self.assertListEqual(
+            history_1001, [(10, self.date_1, self.date_2), (-10, self.date_2, None)]
+        )
+        history_1002 = list(
+            ContactHistory.objects.history(1002).values_list("valid_from", "valid_to")
+        )
+        self.assertListEqual(history_1002, [(self.date_1, self.date_2)])
+        history_1003 = list(
+            ContactHistory.objects.history(1003).values_list("label_names", "valid_to")
+        )
+        self.assertListEqual(
+            history_1003, [(["yellow"], self.date_2), (["red", "yellow"], None)]
+        )
+        self.assertEqual(ContactHistory.objects.history(1004).count(), 1)
+
+    def test_should_ignore_contact_set_older_than_history(self):
+        # given
+        set_2 = self._create_changed_contact_set()
+        ContactHistory.objects.update_from_contact_set(set_2)
+        # when
+        ContactHistory.objects.update_from_contact_set(self.set_1)
+        # then
+        self.assertEqual(ContactHistory.objects.history(1001).count(), 1)
+        self.assertFalse(ContactHistory.objects.filter(contact_id=1002).exists())
+
+    def test_should_return_standings_at_moment(self):
+        # given
+        ContactHistory.objects.update_from_contact_set(self.set_1)
+        ContactHistory.objects.update_from_contact_set(
+            self._create_changed_contact_set()
+        )
+        moment_1 = self.date_1 + timedelta(hours=1)
+        moment_2 = self.date_2 + timedelta(hours=1)
+        # when
+        standings_1 = ContactHistory.objects.standings_at(moment_1, [1001, 1002])
+        standings_2 = ContactHistory.objects.standings_at(moment_2, [1001, 1002])
+        standings_0 = ContactHistory.objects.standings_at(
+            self.date_1 - timedelta(hours=1)
+        )
+        # then
+        self.assertEqual(standings_1[1001].standing, 10)
+        self.assertEqual(standings_1[1002].standing, 10)
+        self.assertEqual(standings_2[1001].standing, -10)
+        self.assertNotIn(1002, standings_2)
+        self.assertDictEqual(standings_0, {})
+
+
 class TestRequestLogEntryManager(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -652,6 +1103,46 @@ class TestRequestLogEntryManager(TestCase):
         # then
         self.assertIsInstance(obj, RequestLogEntry)
 
+    def test_should_bulk_create_entries_for_requests(self):
+        # given
+        request_1 = StandingRequest.objects.create(
+            user=self.user_requestor, contact_id=1007, contact_type_id=CHARACTER_TYPE_ID
+        )
+        request_2 = StandingRequest.objects.create(
+            user=self.user_requestor, contact_id=1008, contact_type_id=CHARACTER_TYPE_ID
+        )
+        # when
+        objs = RequestLogEntry.objects.bulk_create_from_standing_requests(
+            [request_1, request_2], RequestLogEntry.Action.REJECTED, self.user_manager
+        )
+        # then
+        self.assertEqual(len(objs), 2)
+        self.assertEqual(
+            RequestLogEntry.objects.filter(
+                action=RequestLogEntry.Action.REJECTED,
+                action_by__user=self.user_manager,
+                requested_by__user=self.user_requestor,
+            ).count(),
+            2,
+        )
+        self.assertSetEqual(
+            set(
+                RequestLogEntry.objects.values_list(
+                    "requested_for__character_id", flat=True
+                )
+            ),
+            {1007, 1008},
+        )
+
+    def test_should_not_create_entries_when_no_requests(self):
+        # when
+        objs = RequestLogEntry.objects.bulk_create_from_standing_requests(
+            [], RequestLogEntry.Action.CONFIRMED, self.user_manager
+        )
+        # then
+        self.assertListEqual(objs, [])
+        self.assertFalse(RequestLogEntry.objects.exists())
+
 
 class TestFrozenAuthUserManager(NoSocketsTestCase):
     @classmethod
@@ -923,3 +1414,46 @@ class TestFrozenAltManager(NoSocketsTestCase):
         # then
         self.assertFalse(created)
         self.assertEqual(existing_obj, obj)
+
+    def test_should_get_or_create_many_from_standing_requests(self):
+        # given
+        character = EveEntity.objects.create(
+            id=1099, category=EveEntity.CATEGORY_CHARACTER, name="dummy"
+        )
+        CharacterAffiliation.objects.create(
+            character=character,
+            corporation_id=2001,
+            alliance_id=3001,
+            faction_id=500001,
+        )
+        existing_obj = FrozenAlt.objects.create(
+            character_id=1099,
+            corporation_id=2001,
+            alliance_id=3001,
+            category="CH",
+            faction_id=500001,
+        )
+        request_1 = StandingRequest.objects.create(
+            user=self.user, contact_id=1099, contact_type_id=CHARACTER_TYPE_ID
+        )
+        request_2 = StandingRequest.objects.create(
+            user=self.user, contact_id=1002, contact_type_id=CHARACTER_TYPE_ID
+        )
+        request_3 = StandingRequest.objects.create(
+            user=self.user, contact_id=2001, contact_type_id=CORPORATION_TYPE_ID
+        )
+        # when
+        result = FrozenAlt.objects.get_or_create_from_standing_requests(
+            [request_1, request_2, request_3]
+        )
+        # then
+        self.assertEqual(result[1099], existing_obj)
+        self.assertEqual(
+            result[1002],
+            FrozenAlt.objects.get_or_create_from_standing_request(request_2)[0],
+        )
+        self.assertEqual(
+            result[2001],
+            FrozenAlt.objects.get_or_create_from_standing_request(request_3)[0],
+        )
+        self.assertEqual(FrozenAlt.objects.count(), 3)
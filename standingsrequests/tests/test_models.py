@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 
 from django.contrib.auth.models import User
+from django.db import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
 from eveuniverse.models import EveEntity
@@ -55,6 +56,113 @@ class TestContactSet(TestCase):
         self.assertIsInstance(str(my_set), str)
 
 
+class TestContact(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        load_eve_entities()
+
+    def test_should_not_allow_duplicate_contacts_in_a_set(self):
+        # given
+        contact_set = ContactSet.objects.create(name="Dummy Set")
+        Contact.objects.create(contact_set=contact_set, eve_entity_id=1001, standing=10)
+        # when/then
+        with self.assertRaises(IntegrityError):
+            Contact.objects.create(
+                contact_set=contact_set, eve_entity_id=1001, standing=5
+            )
+
+    def test_should_update_label_fields_when_labels_change(self):
+        # given
+        contact_set = ContactSet.objects.create(name="Dummy Set")
+        label_1 = ContactLabel.objects.create(
+            contact_set=contact_set, label_id=1, name="red, blue"
+        )
+        label_2 = ContactLabel.objects.create(
+            contact_set=contact_set, label_id=2, name="Green"
+        )
+        obj = Contact.objects.create(
+            contact_set=contact_set, eve_entity_id=1001, standing=10
+        )
+        # when
+        obj.labels.add(label_1, label_2)
+        # then
+        obj.refresh_from_db()
+        self.assertListEqual(obj.labels_sorted, ["Green", "red, blue"])
+        self.assertEqual(obj.label_mask, 0b11)
+        # when
+        obj.labels.remove(label_1)
+        # then
+        obj.refresh_from_db()
+        self.assertListEqual(obj.labels_sorted, ["Green"])
+        self.assertEqual(obj.label_mask, 0b10)
+
+    def test_should_update_label_fields_when_contacts_of_label_change(self):
+        # given
+        contact_set = ContactSet.objects.create(name="Dummy Set")
+        label = ContactLabel.objects.create(
+            contact_set=contact_set, label_id=1, name="blue"
+        )
+        obj = Contact.objects.create(
+            contact_set=contact_set, eve_entity_id=1001, standing=10
+        )
+        # when
+        label.contacts.add(obj)
+        # then
+        obj.refresh_from_db()
+        self.assertListEqual(obj.labels_sorted, ["blue"])
+        self.assertEqual(obj.label_mask, 0b1)
+        # when
+        label.contacts.clear()
+        # then
+        obj.refresh_from_db()
+        self.assertListEqual(obj.labels_sorted, [])
+        self.assertEqual(obj.label_mask, 0)
+
+    def test_should_update_label_bits_of_all_contacts_when_labels_of_set_change(
+        self,
+    ):
+        # given
+        contact_set = ContactSet.objects.create(name="Dummy Set")
+        label_1 = ContactLabel.objects.create(
+            contact_set=contact_set, label_id=1, name="blue"
+        )
+        label_3 = ContactLabel.objects.create(
+            contact_set=contact_set, label_id=3, name="green"
+        )
+        obj_1 = Contact.objects.create(
+            contact_set=contact_set, eve_entity_id=1001, standing=10
+        )
+        obj_1.labels.add(label_1, label_3)
+        obj_2 = Contact.objects.create(
+            contact_set=contact_set, eve_entity_id=1002, standing=10
+        )
+        obj_2.labels.add(label_3)
+        # when
+        ContactLabel.objects.create(contact_set=contact_set, label_id=2, name="red")
+        # then
+        obj_1.refresh_from_db()
+        self.assertEqual(obj_1.label_mask, 0b101)
+        obj_2.refresh_from_db()
+        self.assertEqual(obj_2.label_mask, 0b100)
+        self.assertSetEqual(
+            set(
+                Contact.objects.filter_label(label_3).values_list(
+                    "eve_entity_id", flat=True
+                )
+            ),
+            {1001, 1002},
+        )
+        # when
+        label_1.delete()
+        # then
+        obj_1.refresh_from_db()
+        self.assertListEqual(obj_1.labels_sorted, ["green"])
+        self.assertEqual(obj_1.label_mask, 0b10)
+        obj_2.refresh_from_db()
+        self.assertEqual(obj_2.label_mask, 0b10)
+
+
 class TestContactSetCreateStanding(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -63,20 +171,20 @@ class TestContactSetCreateStanding(TestCase):
 
     def test_can_create_pilot_standing(self):
         obj = Contact.objects.create(
-            contact_set=self.contact_set, eve_entity_id=1009, standing=-10
+            contact_set=self.contact_set, eve_entity_id=1007, standing=-10
         )
         obj.labels.add(*ContactLabel.objects.all())
         self.assertIsInstance(obj, Contact)
-        self.assertEqual(obj.eve_entity_id, 1009)
+        self.assertEqual(obj.eve_entity_id, 1007)
         self.assertEqual(obj.standing, -10)
 
     def test_can_create_corp_standing(self):
         obj = Contact.objects.create(
-            contact_set=self.contact_set, eve_entity_id=2102, standing=-10
+            contact_set=self.contact_set, eve_entity_id=2004, standing=-10
         )
         obj.labels.add(*ContactLabel.objects.all())
         self.assertIsInstance(obj, Contact)
-        self.assertEqual(obj.eve_entity_id, 2102)
+        self.assertEqual(obj.eve_entity_id, 2004)
         self.assertEqual(obj.standing, -10)
 
     def test_can_create_alliance_standing(self):
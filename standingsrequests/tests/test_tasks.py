@@ -1,12 +1,25 @@
 from datetime import timedelta
 from unittest.mock import patch
 
+from celery.exceptions import Retry
+
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django.utils.timezone import now
+from eveuniverse.models import EveEntity
+
+from allianceauth.tests.auth_utils import AuthUtils
 
 from standingsrequests import tasks
-from standingsrequests.models import ContactSet
+from standingsrequests.models import (
+    ContactHistory,
+    ContactSet,
+    ContactSnapshot,
+    CorporationDetails,
+    StandingRequest,
+)
 
+from .testdata.entity_type_ids import CORPORATION_TYPE_ID
 from .testdata.my_test_data import create_contacts_set
 
 MODULE_PATH = "standingsrequests.tasks"
@@ -38,6 +51,31 @@ class TestStandingsUpdate(TestCase):
         self.assertTrue(mock_create_new_from_api.called)
         self.assertTrue(mock_requests_process_standings.called)
         self.assertTrue(mock_revocations_process_standings.called)
+        self.assertEqual(
+            ContactHistory.objects.count(), self.contact_set.contacts.count()
+        )
+
+    def test_should_update_history_and_snapshots_when_processing_fails(
+        self,
+        mock_create_new_from_api,
+        mock_requests_process_standings,
+        mock_revocations_process_standings,
+    ):
+        # given
+        mock_create_new_from_api.return_value = self.contact_set
+        mock_requests_process_standings.side_effect = RuntimeError
+
+        # when
+        with self.assertRaises(RuntimeError):
+            tasks.standings_update.delay()
+
+        # then
+        self.assertEqual(
+            ContactHistory.objects.count(), self.contact_set.contacts.count()
+        )
+        self.assertEqual(
+            ContactSnapshot.objects.count(), self.contact_set.contacts.count()
+        )
 
     def test_should_abort_with_error_when_api_failed(
         self,
@@ -80,6 +118,49 @@ class TestOtherTasks(TestCase):
         self.assertTrue(mock_update_or_create_from_esi.called)
 
 
+class TestUpdateContactHistory(TestCase):
+    def setUp(self) -> None:
+        cache.delete(tasks.CACHE_KEY_CONTACT_HISTORY_LOCK)
+
+    def test_should_record_contacts_from_contact_set(self):
+        # given
+        contact_set = create_contacts_set()
+        # when
+        tasks.update_contact_history(contact_set.pk)
+        # then
+        self.assertEqual(ContactHistory.objects.count(), contact_set.contacts.count())
+        self.assertIsNone(cache.get(tasks.CACHE_KEY_CONTACT_HISTORY_LOCK))
+
+    def test_should_retry_later_when_history_is_locked(self):
+        # given
+        contact_set = create_contacts_set()
+        cache.set(tasks.CACHE_KEY_CONTACT_HISTORY_LOCK, "other", timeout=60)
+        # when
+        with patch(MODULE_PATH + ".update_contact_history.retry") as mock_retry:
+            mock_retry.side_effect = Retry
+            with self.assertRaises(Retry):
+                tasks.update_contact_history(contact_set.pk)
+        # then
+        self.assertFalse(ContactHistory.objects.exists())
+        self.assertEqual(cache.get(tasks.CACHE_KEY_CONTACT_HISTORY_LOCK), "other")
+
+    def test_should_not_release_lock_acquired_by_another_update(self):
+        # given
+        contact_set = create_contacts_set()
+
+        def steal_lock(*args, **kwargs):
+            cache.set(tasks.CACHE_KEY_CONTACT_HISTORY_LOCK, "other", timeout=60)
+
+        # when
+        with patch(
+            MODULE_PATH + ".ContactHistory.objects.update_from_contact_set"
+        ) as mock_update_from_contact_set:
+            mock_update_from_contact_set.side_effect = steal_lock
+            tasks.update_contact_history(contact_set.pk)
+        # then
+        self.assertEqual(cache.get(tasks.CACHE_KEY_CONTACT_HISTORY_LOCK), "other")
+
+
 @override_settings(CELERY_ALWAYS_EAGER=True, CELERY_EAGER_PROPAGATES_EXCEPTIONS=True)
 @patch(MODULE_PATH + ".SR_STANDINGS_STALE_HOURS", 48)
 class TestPurgeData(TestCase):
@@ -149,3 +230,95 @@ class TestUpdateAllCorporationDetails(TestCase):
             obj[0][0] for obj in mock_update_or_create_from_esi.call_args_list
         }
         self.assertSetEqual(called_corporation_ids, {2001, 2003, 2004, 2102})
+
+    @patch(MODULE_PATH + ".CorporationDetails.objects.update_or_create_from_esi")
+    def test_should_not_update_other_corporations_of_requestors(
+        self, mock_update_or_create_from_esi
+    ):
+        # given
+        user = AuthUtils.create_user("Bruce_Wayne")
+        StandingRequest.objects.create(
+            user=user, contact_id=2005, contact_type_id=CORPORATION_TYPE_ID
+        )
+        for corporation_id in [2006, 2007]:
+            EveEntity.objects.create(
+                id=corporation_id, category=EveEntity.CATEGORY_CORPORATION
+            )
+            CorporationDetails.objects.create(
+                corporation_id=corporation_id, member_count=1, ticker="DUMMY"
+            )
+        # when
+        with patch(
+            MODULE_PATH + ".CorporationDetails.objects.corporation_ids_from_requestors"
+        ) as mock_corporation_ids_from_requestors:
+            mock_corporation_ids_from_requestors.return_value = {2006}
+            tasks.update_all_corporation_details.delay()
+        # then
+        called_corporation_ids = {
+            obj[0][0] for obj in mock_update_or_create_from_esi.call_args_list
+        }
+        self.assertSetEqual(called_corporation_ids, {2001, 2003, 2004, 2005, 2102})
+        self.assertSetEqual(
+            set(CorporationDetails.objects.values_list("corporation_id", flat=True)),
+            {2006},
+        )
+
+
+@patch(MODULE_PATH + ".CorporationDetails.objects.update_or_create_from_esi")
+@patch(MODULE_PATH + ".esi_limiter.seconds_until_error_limit_reset")
+class TestUpdateCorporationDetail(TestCase):
+    def test_should_update_corporation(
+        self, mock_seconds_until_error_limit_reset, mock_update_or_create_from_esi
+    ):
+        # given
+        mock_seconds_until_error_limit_reset.return_value = 0
+        # when
+        with patch(MODULE_PATH + ".ContactSnapshot.objects.rebuild") as mock_rebuild:
+            tasks.update_corporation_detail(2001)
+        # then
+        self.assertTrue(mock_update_or_create_from_esi.called)
+        self.assertEqual(mock_rebuild.call_args[1]["contact_ids"], [2001])
+
+    def test_should_retry_later_when_esi_error_budget_is_low(
+        self, mock_seconds_until_error_limit_reset, mock_update_or_create_from_esi
+    ):
+        # given
+        mock_seconds_until_error_limit_reset.return_value = 30.5
+        # when
+        with patch(MODULE_PATH + ".update_corporation_detail.retry") as mock_retry:
+            mock_retry.side_effect = Retry
+            with self.assertRaises(Retry):
+                tasks.update_corporation_detail(2001)
+        # then
+        self.assertFalse(mock_update_or_create_from_esi.called)
+        self.assertEqual(mock_retry.call_args[1]["countdown"], 31)
+        self.assertEqual(
+            mock_retry.call_args[1]["max_retries"],
+            tasks.TASK_ESI_ERROR_LIMIT_MAX_RETRIES,
+        )
+
+
+@patch(MODULE_PATH + ".warm_standings_cache")
+class TestUpdateContactSnapshots(TestCase):
+    def test_should_rebuild_snapshots_from_latest_contact_set(
+        self, mock_warm_standings_cache
+    ):
+        # given
+        contact_set = create_contacts_set()
+        # when
+        tasks.update_contact_snapshots()
+        # then
+        self.assertSetEqual(
+            set(ContactSnapshot.objects.values_list("contact_id", flat=True)),
+            set(contact_set.contacts.values_list("eve_entity_id", flat=True)),
+        )
+        self.assertTrue(mock_warm_standings_cache.apply_async.called)
+
+
+class TestWarmStandingsCache(TestCase):
+    @patch(MODULE_PATH + ".standings_tables.warm_cache")
+    def test_should_pre_render_standings_pages(self, mock_warm_cache):
+        # when
+        tasks.warm_standings_cache()
+        # then
+        self.assertTrue(mock_warm_cache.called)
@@ -230,13 +230,11 @@ def create_contacts_set(my_set: ContactSet = None, include_assoc=True) -> Contac
                 "category": category,
             },
         )
+        labels = my_set.labels.filter(label_id__in=contact["label_ids"])
         my_standing = Contact.objects.create(
-            contact_set=my_set,
-            eve_entity=eve_entity,
-            standing=contact["standing"],
+            contact_set=my_set, eve_entity=eve_entity, standing=contact["standing"]
         )
-        for label_id in contact["label_ids"]:
-            my_standing.labels.add(my_set.labels.get(label_id=label_id))
+        my_standing.labels.add(*labels)
 
     # update EveEntity based on characters
     for character_id, character_data in _my_test_data["EveCharacter"].items():
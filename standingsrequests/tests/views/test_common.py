@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from standingsrequests.models import StandingRequest
+from standingsrequests.tests.utils import TestViewPagesBase
+from standingsrequests.views._common import compose_standing_requests_data
+
+MODULE_PATH = "standingsrequests.views._common"
+
+
+class TestComposeStandingRequestsData(TestViewPagesBase):
+    def test_should_compose_all_fields_by_default(self):
+        # given
+        self._create_standing_for_alt(self.alt_character_1)
+        # when
+        result = compose_standing_requests_data(StandingRequest.objects.all())
+        # then
+        self.assertEqual(len(result), 1)
+        self.assertIn("main_character_html", result[0])
+        self.assertIn("labels", result[0])
+        self.assertTrue(result[0]["has_scopes"])
+
+    def test_should_compose_requested_fields_only(self):
+        # given
+        self._create_standing_for_alt(self.alt_character_1)
+        # when
+        result = compose_standing_requests_data(
+            StandingRequest.objects.all(), fields=["contact_id", "contact_name"]
+        )
+        # then
+        self.assertListEqual(
+            result, [{"contact_id": 1007, "contact_name": "James Gordon"}]
+        )
+
+    @patch(MODULE_PATH + "._identify_contacts")
+    @patch(MODULE_PATH + ".RequiredScopesResolver")
+    def test_should_not_resolve_scopes_and_labels_when_not_requested(
+        self, mock_scopes_resolver, mock_identify_contacts
+    ):
+        # given
+        self._create_standing_for_alt(self.alt_character_1)
+        # when
+        result = compose_standing_requests_data(
+            StandingRequest.objects.all(), fields=["contact_id", "corporation_name"]
+        )
+        # then
+        self.assertListEqual(
+            result, [{"contact_id": 1007, "corporation_name": "Metro Police"}]
+        )
+        self.assertFalse(mock_scopes_resolver.called)
+        self.assertFalse(mock_identify_contacts.called)
+
+    def test_should_need_less_queries_for_fewer_fields(self):
+        # given
+        self._create_standing_for_alt(self.alt_character_1)
+        self._create_standing_for_alt(self.alt_character_2)
+        requests_qs = StandingRequest.objects.all()
+        # when/then
+        with self.assertNumQueries(1):
+            compose_standing_requests_data(
+                requests_qs, fields=["contact_id", "state", "action_by"]
+            )
+
+    def test_should_raise_error_for_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            compose_standing_requests_data(
+                StandingRequest.objects.all(), fields=["unknown"]
+            )
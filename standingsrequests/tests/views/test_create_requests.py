@@ -1,8 +1,11 @@
 from unittest.mock import Mock, patch
 
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.db import connection
 from django.http import Http404
 from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from esi.models import Token
 
@@ -17,11 +20,13 @@ from app_utils.testing import (
 from standingsrequests.core.contact_types import ContactTypeId
 from standingsrequests.helpers.evecorporation import EveCorporation
 from standingsrequests.models import (
+    CorporationDetails,
     RequestLogEntry,
     StandingRequest,
     StandingRevocation,
 )
 from standingsrequests.tests.testdata.my_test_data import (
+    TEST_SCOPE,
     TEST_STANDINGS_API_CHARID,
     TEST_STANDINGS_API_CHARNAME,
     create_contacts_set,
@@ -237,6 +242,114 @@ class TestViewsBasics(TestViewPagesBase):
 #         self.assertEqual(response.status_code, 200)
 
 
+@patch(
+    "allianceauth.notifications.templatetags.auth_notifications.Notification.objects.user_unread_count",
+    lambda *args, **kwargs: 1,
+)
+@patch(MODELS_PATH + ".SR_REQUIRED_SCOPES", {"Member": [TEST_SCOPE]})
+class TestRequestCharacters(TestViewPagesBase):
+    def _character_rows(self) -> dict:
+        self.client.force_login(self.user_requestor)
+        response = self.client.get(reverse("standingsrequests:request_characters"))
+        self.assertEqual(response.status_code, 200)
+        return {
+            row["character"].character_id: row for row in response.context["characters"]
+        }
+
+    def test_should_show_scopes_and_membership_of_characters(self):
+        # given
+        character = EveCharacter.objects.filter(
+            character_ownership__isnull=True
+        ).first()
+        add_character_to_user(self.user_requestor, character, scopes=["other_scope"])
+        # when
+        rows = self._character_rows()
+        # then
+        self.assertTrue(rows[self.main_character_1.character_id]["hasRequiredScopes"])
+        self.assertTrue(rows[self.main_character_1.character_id]["inOrganisation"])
+        self.assertFalse(rows[character.character_id]["hasRequiredScopes"])
+        self.assertEqual(
+            rows[character.character_id]["inOrganisation"],
+            character.alliance_id == 3001,
+        )
+
+    def test_should_not_need_more_queries_for_more_characters(self):
+        # given
+        self._character_rows()  # warm up caches
+        with CaptureQueriesContext(connection) as queries_before:
+            self._character_rows()
+        character = EveCharacter.objects.filter(
+            character_ownership__isnull=True
+        ).first()
+        add_character_to_user(self.user_requestor, character, scopes=[TEST_SCOPE])
+        # when
+        with CaptureQueriesContext(connection) as queries_after:
+            rows = self._character_rows()
+        # then
+        self.assertIn(character.character_id, rows)
+        self.assertEqual(len(queries_after), len(queries_before))
+
+
+@patch(
+    "allianceauth.notifications.templatetags.auth_notifications.Notification.objects.user_unread_count",
+    lambda *args, **kwargs: 1,
+)
+@patch(VIEWS_PATH + ".update_corporation_detail")
+@patch(HELPERS_EVECORPORATION_PATH + ".esi")
+class TestRequestCorporations(TestViewPagesBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        load_eve_entities()
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def _corporation_rows(self) -> dict:
+        self.client.force_login(self.user_requestor)
+        response = self.client.get(reverse("standingsrequests:request_corporations"))
+        self.assertEqual(response.status_code, 200)
+        return {row["corp"].corporation_id: row for row in response.context["corps"]}
+
+    def test_should_show_corporations_from_details_without_esi(
+        self, mock_esi, mock_update_corporation_detail
+    ):
+        # given
+        corporation_id = self.alt_corporation.corporation_id
+        CorporationDetails.objects.create(
+            corporation_id=corporation_id,
+            member_count=2,
+            ticker=self.alt_corporation.corporation_ticker,
+        )
+        # when
+        rows = self._corporation_rows()
+        # then
+        self.assertSetEqual(set(rows.keys()), {corporation_id})
+        corporation = rows[corporation_id]["corp"]
+        self.assertEqual(
+            corporation.corporation_name, self.alt_corporation.corporation_name
+        )
+        self.assertEqual(corporation.ticker, self.alt_corporation.corporation_ticker)
+        self.assertEqual(corporation.member_count, 2)
+        self.assertEqual(rows[corporation_id]["token_count"], 2)
+        self.assertFalse(mock_esi.client.mock_calls)
+        self.assertFalse(mock_update_corporation_detail.delay.called)
+
+    def test_should_queue_unknown_corporations_once(
+        self, mock_esi, mock_update_corporation_detail
+    ):
+        # when
+        rows_1 = self._corporation_rows()
+        rows_2 = self._corporation_rows()
+        # then
+        self.assertDictEqual(rows_1, {})
+        self.assertDictEqual(rows_2, {})
+        self.assertFalse(mock_esi.client.mock_calls)
+        mock_update_corporation_detail.delay.assert_called_once_with(
+            self.alt_corporation.corporation_id
+        )
+
+
 @patch(MODELS_PATH + ".SR_REQUIRED_SCOPES", {"Guest": ["required_scope"]})
 @patch(MANAGERS_PATH + ".create_eve_entities", Mock())
 @patch(VIEWS_PATH + ".update_associations_api.delay")
@@ -1,5 +1,6 @@
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.urls import reverse
 
 from standingsrequests.tests.testdata.my_test_data import (
@@ -15,6 +16,10 @@ HELPERS_EVECORPORATION_PATH = "standingsrequests.helpers.evecorporation"
 @patch(HELPERS_EVECORPORATION_PATH + ".cache")
 @patch(HELPERS_EVECORPORATION_PATH + ".esi")
 class TestEffectiveRequestsData(TestViewPagesBase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
     def test_request_character(self, mock_esi, mock_cache):
         # given
         alt_id = self.alt_character_1.character_id
@@ -87,3 +92,40 @@ class TestEffectiveRequestsData(TestViewPagesBase):
             "labels_str": "",
         }
         self.assertPartialDictEqual(data[alt_id], expected_alt_1)
+
+    def test_should_return_not_modified_when_data_is_unchanged(
+        self, mock_esi, mock_cache
+    ):
+        # given
+        self._create_standing_for_alt(self.alt_character_1)
+        request = self.factory.get(reverse("standingsrequests:effective_requests_data"))
+        request.user = self.user_manager
+        my_view = effective_requests_data.__wrapped__
+        etag = my_view(request)["ETag"]
+        request = self.factory.get(
+            reverse("standingsrequests:effective_requests_data"),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        request.user = self.user_manager
+        # when
+        with self.assertNumQueries(0):
+            response = my_view(request)
+        # then
+        self.assertEqual(response.status_code, 304)
+
+    def test_should_return_data_with_etag(self, mock_esi, mock_cache):
+        # given
+        self._create_standing_for_alt(self.alt_character_1)
+        request = self.factory.get(
+            reverse("standingsrequests:effective_requests_data"),
+            HTTP_IF_NONE_MATCH='"outdated"',
+        )
+        request.user = self.user_manager
+        my_view = effective_requests_data.__wrapped__
+        # when
+        response = my_view(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"])
+        data = json_response_to_dict_2(response, "contact_id")
+        self.assertSetEqual(set(data.keys()), {self.alt_character_1.character_id})
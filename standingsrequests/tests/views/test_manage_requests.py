@@ -1,17 +1,29 @@
+import json
 from unittest.mock import patch
 
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from allianceauth.eveonline.models import EveCharacter
 
-from standingsrequests.models import StandingRequest, StandingRevocation
+from standingsrequests.models import (
+    RequestLogEntry,
+    StandingRequest,
+    StandingRevocation,
+)
 from standingsrequests.tests.testdata.my_test_data import (
     esi_get_corporations_corporation_id,
     esi_post_universe_names,
 )
 from standingsrequests.tests.utils import TestViewPagesBase
+from standingsrequests.views._common import compose_standing_requests_data
 
 HELPERS_EVECORPORATION_PATH = "standingsrequests.helpers.evecorporation"
+VIEWS_PATH = "standingsrequests.views.manage_requests"
+CSRF_TOKEN = "x" * 32
 
 
 @patch(HELPERS_EVECORPORATION_PATH + ".cache")
@@ -41,7 +53,7 @@ class TestViewManageRequests(TestViewPagesBase):
 
         # then
         self.assertEqual(response.status_code, 200)
-        data = {obj["contact_id"]: obj for obj in response.context.dicts[3]["requests"]}
+        data = {obj["contact_id"]: obj for obj in response.context["requests"]}
         expected = {alt_id}
         self.assertSetEqual(set(data.keys()), expected)
         self.maxDiff = None
@@ -96,7 +108,7 @@ class TestViewManageRequests(TestViewPagesBase):
 
         # then
         self.assertEqual(response.status_code, 200)
-        data = {obj["contact_id"]: obj for obj in response.context.dicts[3]["requests"]}
+        data = {obj["contact_id"]: obj for obj in response.context["requests"]}
         expected = {alt_id}
         self.assertSetEqual(set(data.keys()), expected)
         self.maxDiff = None
@@ -127,6 +139,40 @@ class TestViewManageRequests(TestViewPagesBase):
         }
         self.assertPartialDictEqual(data[alt_id], expected_alt_1)
 
+    def test_should_need_same_number_of_queries_for_more_requests(
+        self, mock_esi, mock_cache
+    ):
+        # given
+        mock_Corporation = mock_esi.client.Corporation
+        mock_Corporation.get_corporations_corporation_id.side_effect = (
+            esi_get_corporations_corporation_id
+        )
+        mock_esi.client.Universe.post_universe_names.side_effect = (
+            esi_post_universe_names
+        )
+        mock_cache.get.return_value = None
+        self.client.force_login(self.user_manager)
+        url = reverse("standingsrequests:manage_requests_list")
+        StandingRequest.objects.get_or_create_2(
+            self.user_requestor,
+            self.alt_character_2.character_id,
+            StandingRequest.ContactType.CHARACTER,
+        )
+        with CaptureQueriesContext(connection) as one_request:
+            self.client.get(url)
+        StandingRequest.objects.get_or_create_2(
+            self.user_requestor,
+            self.alt_character_1.character_id,
+            StandingRequest.ContactType.CHARACTER,
+        )
+        # when
+        with CaptureQueriesContext(connection) as two_requests:
+            response = self.client.get(url)
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["requests"]), 2)
+        self.assertEqual(len(two_requests), len(one_request))
+
 
 @patch(HELPERS_EVECORPORATION_PATH + ".cache")
 @patch(HELPERS_EVECORPORATION_PATH + ".esi")
@@ -149,9 +195,7 @@ class TestViewManageRevocations(TestViewPagesBase):
 
         # then
         self.assertEqual(response.status_code, 200)
-        data = {
-            obj["contact_id"]: obj for obj in response.context.dicts[3]["revocations"]
-        }
+        data = {obj["contact_id"]: obj for obj in response.context["revocations"]}
         expected = {alt_id}
         self.assertSetEqual(set(data.keys()), expected)
         self.maxDiff = None
@@ -207,9 +251,7 @@ class TestViewManageRevocations(TestViewPagesBase):
 
         # then
         self.assertEqual(response.status_code, 200)
-        data = {
-            obj["contact_id"]: obj for obj in response.context.dicts[3]["revocations"]
-        }
+        data = {obj["contact_id"]: obj for obj in response.context["revocations"]}
         expected = {alt_id}
         self.assertSetEqual(set(data.keys()), expected)
         self.maxDiff = None
@@ -256,9 +298,7 @@ class TestViewManageRevocations(TestViewPagesBase):
 
         # then
         self.assertEqual(response.status_code, 200)
-        data = {
-            obj["contact_id"]: obj for obj in response.context.dicts[3]["revocations"]
-        }
+        data = {obj["contact_id"]: obj for obj in response.context["revocations"]}
         expected = {alt_id}
         self.assertSetEqual(set(data.keys()), expected)
         self.maxDiff = None
@@ -305,9 +345,7 @@ class TestViewManageRevocations(TestViewPagesBase):
 
         # then
         self.assertEqual(response.status_code, 200)
-        data = {
-            obj["contact_id"]: obj for obj in response.context.dicts[3]["revocations"]
-        }
+        data = {obj["contact_id"]: obj for obj in response.context["revocations"]}
         expected = {alt_id}
         self.assertSetEqual(set(data.keys()), expected)
         self.maxDiff = None
@@ -338,3 +376,335 @@ class TestViewManageRevocations(TestViewPagesBase):
             "labels": ["yellow"],
         }
         self.assertPartialDictEqual(data_alt_1, expected_alt_1)
+
+    def test_should_show_revocation_for_character_not_in_auth(
+        self, mock_esi, mock_cache
+    ):
+        # given
+        alt_id = 1006
+        my_alt = EveCharacter.objects.get(character_id=alt_id)
+        self._create_standing_for_alt(my_alt)
+        StandingRevocation.objects.add_revocation(
+            alt_id, StandingRevocation.ContactType.CHARACTER
+        )
+        my_alt.delete()
+        self.client.force_login(self.user_manager)
+
+        # when
+        response = self.client.get(reverse("standingsrequests:manage_revocations_list"))
+
+        # then
+        self.assertEqual(response.status_code, 200)
+        data = {obj["contact_id"]: obj for obj in response.context["revocations"]}
+        expected_alt_1 = {
+            "contact_id": alt_id,
+            "contact_name": "Steven Roger",
+            "contact_icon_url": f"https://images.evetech.net/characters/{alt_id}/portrait?size=32",
+            "corporation_id": 2003,
+            "corporation_name": "CatCo Worldwide Media",
+            "corporation_ticker": "",
+            "alliance_id": None,
+            "alliance_name": "",
+            "has_scopes": False,
+        }
+        self.assertPartialDictEqual(data[alt_id], expected_alt_1)
+
+
+@patch(HELPERS_EVECORPORATION_PATH + ".cache")
+@patch(HELPERS_EVECORPORATION_PATH + ".esi")
+@patch(VIEWS_PATH + ".MANAGE_LIST_PAGE_SIZE", 1)
+class TestViewManageListPagination(TestViewPagesBase):
+    def setUp(self) -> None:
+        self.client.force_login(self.user_manager)
+
+    @staticmethod
+    def _setup_mocks(mock_esi, mock_cache):
+        mock_esi.client.Corporation.get_corporations_corporation_id.side_effect = (
+            esi_get_corporations_corporation_id
+        )
+        mock_esi.client.Universe.post_universe_names.side_effect = (
+            esi_post_universe_names
+        )
+        mock_cache.get.return_value = None
+
+    def _create_requests(self) -> list:
+        return [
+            StandingRequest.objects.get_or_create_2(
+                self.user_requestor,
+                character.character_id,
+                StandingRequest.ContactType.CHARACTER,
+            )
+            for character in [self.alt_character_1, self.alt_character_2]
+        ]
+
+    def test_should_render_first_page_with_link_to_next_page(
+        self, mock_esi, mock_cache
+    ):
+        # given
+        self._setup_mocks(mock_esi, mock_cache)
+        request_1, _ = self._create_requests()
+        # when
+        response = self.client.get(reverse("standingsrequests:manage_requests_list"))
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response, "standingsrequests/partials/manage_requests_list.html"
+        )
+        contact_ids = [obj["contact_id"] for obj in response.context["requests"]]
+        self.assertListEqual(contact_ids, [request_1.contact_id])
+        self.assertTrue(response.context["is_first_page"])
+        self.assertIn("after=", response.context["next_page_url"])
+        self.assertContains(response, '<td colspan="6">')
+
+    def test_should_render_next_page_as_rows_only(self, mock_esi, mock_cache):
+        # given
+        self._setup_mocks(mock_esi, mock_cache)
+        _, request_2 = self._create_requests()
+        response = self.client.get(reverse("standingsrequests:manage_requests_list"))
+        next_page_url = response.context["next_page_url"]
+        # when
+        response = self.client.get(next_page_url)
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response, "standingsrequests/partials/manage_requests_rows.html"
+        )
+        self.assertTemplateNotUsed(
+            response, "standingsrequests/partials/manage_requests_list.html"
+        )
+        contact_ids = [obj["contact_id"] for obj in response.context["requests"]]
+        self.assertListEqual(contact_ids, [request_2.contact_id])
+        self.assertFalse(response.context["is_first_page"])
+        self.assertIsNone(response.context["next_page_url"])
+
+    def test_should_compose_data_for_current_page_only(self, mock_esi, mock_cache):
+        # given
+        self._setup_mocks(mock_esi, mock_cache)
+        self._create_requests()
+        # when
+        with patch(
+            VIEWS_PATH + ".compose_standing_requests_data",
+            wraps=compose_standing_requests_data,
+        ) as spy:
+            self.client.get(reverse("standingsrequests:manage_requests_list"))
+        # then
+        self.assertEqual(spy.call_count, 1)
+        requests_qs = spy.call_args[0][0]
+        self.assertEqual(requests_qs.count(), 1)
+
+    def test_should_paginate_revocations(self, mock_esi, mock_cache):
+        # given
+        self._setup_mocks(mock_esi, mock_cache)
+        for character in [self.alt_character_1, self.alt_character_2]:
+            StandingRevocation.objects.add_revocation(
+                character.character_id,
+                StandingRevocation.ContactType.CHARACTER,
+                user=self.user_requestor,
+            )
+        # when
+        response = self.client.get(reverse("standingsrequests:manage_revocations_list"))
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["revocations"]), 1)
+        self.assertIsNotNone(response.context["next_page_url"])
+        self.assertContains(response, '<td colspan="7">')
+
+    def test_should_return_400_for_invalid_cursor(self, mock_esi, mock_cache):
+        # when
+        response = self.client.get(
+            reverse("standingsrequests:manage_requests_list") + "?after=invalid"
+        )
+        # then
+        self.assertEqual(response.status_code, 400)
+
+
+@patch(VIEWS_PATH + ".notify")
+@patch(VIEWS_PATH + ".SR_NOTIFICATIONS_ENABLED", True)
+class TestViewManageBulkWrite(TestViewPagesBase):
+    def _post(self, url_name: str, payload):
+        self.client.force_login(self.user_manager)
+        return self.client.post(
+            reverse(f"standingsrequests:{url_name}"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def _create_requests(self) -> list:
+        return [
+            StandingRequest.objects.get_or_create_2(
+                self.user_requestor,
+                character.character_id,
+                StandingRequest.ContactType.CHARACTER,
+            )
+            for character in [self.alt_character_1, self.alt_character_2]
+        ]
+
+    def test_should_confirm_requests(self, mock_notify):
+        # given
+        request_1, request_2 = self._create_requests()
+        # when
+        response = self._post(
+            "manage_requests_bulk_write",
+            {
+                "action": "confirm",
+                "contact_ids": [request_1.contact_id, request_2.contact_id, 1099],
+            },
+        )
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(
+            response.json()["results"],
+            {
+                str(request_1.contact_id): "confirmed",
+                str(request_2.contact_id): "confirmed",
+                "1099": "not_found",
+            },
+        )
+        for obj in [request_1, request_2]:
+            obj.refresh_from_db()
+            self.assertEqual(obj.action_by, self.user_manager)
+            self.assertIsNotNone(obj.action_date)
+        self.assertEqual(
+            RequestLogEntry.objects.filter(
+                action=RequestLogEntry.Action.CONFIRMED,
+                request_type=RequestLogEntry.RequestType.REQUEST,
+            ).count(),
+            2,
+        )
+        self.assertFalse(mock_notify.called)
+
+    def test_should_reject_requests(self, mock_notify):
+        # given
+        request_1, request_2 = self._create_requests()
+        # when
+        response = self._post(
+            "manage_requests_bulk_write",
+            {"action": "reject", "contact_ids": [request_1.contact_id]},
+        )
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(
+            response.json()["results"], {str(request_1.contact_id): "rejected"}
+        )
+        self.assertFalse(StandingRequest.objects.filter(pk=request_1.pk).exists())
+        self.assertTrue(StandingRequest.objects.filter(pk=request_2.pk).exists())
+        self.assertEqual(
+            RequestLogEntry.objects.filter(
+                action=RequestLogEntry.Action.REJECTED
+            ).count(),
+            1,
+        )
+        self.assertEqual(mock_notify.call_count, 1)
+
+    def test_should_add_revocation_when_rejecting_effective_request(self, mock_notify):
+        # given
+        request_1, _ = self._create_requests()
+        request_1.mark_actioned(self.user_manager)
+        request_1.mark_effective()
+        # when
+        response = self._post(
+            "manage_requests_bulk_write",
+            {"action": "reject", "contact_ids": [request_1.contact_id]},
+        )
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(StandingRequest.objects.filter(pk=request_1.pk).exists())
+        self.assertTrue(
+            StandingRevocation.objects.filter(contact_id=request_1.contact_id).exists()
+        )
+
+    def test_should_confirm_pending_revocations(self, mock_notify):
+        # given
+        revocation = StandingRevocation.objects.add_revocation(
+            self.alt_character_1.character_id,
+            StandingRevocation.ContactType.CHARACTER,
+            user=self.user_requestor,
+            reason=StandingRevocation.Reason.OWNER_REQUEST,
+        )
+        # when
+        response = self._post(
+            "manage_revocations_bulk_write",
+            {"action": "confirm", "contact_ids": [revocation.contact_id]},
+        )
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(
+            response.json()["results"], {str(revocation.contact_id): "confirmed"}
+        )
+        revocation.refresh_from_db()
+        self.assertEqual(revocation.action_by, self.user_manager)
+        self.assertEqual(
+            RequestLogEntry.objects.filter(
+                action=RequestLogEntry.Action.CONFIRMED,
+                request_type=RequestLogEntry.RequestType.REVOCATION,
+            ).count(),
+            1,
+        )
+
+    def test_should_need_same_number_of_queries_for_more_requests(self, mock_notify):
+        # given
+        request_1, request_2 = self._create_requests()
+        self._post(  # warm up frozen objects
+            "manage_requests_bulk_write",
+            {
+                "action": "confirm",
+                "contact_ids": [request_1.contact_id, request_2.contact_id],
+            },
+        )
+        # when
+        with CaptureQueriesContext(connection) as queries_1:
+            self._post(
+                "manage_requests_bulk_write",
+                {"action": "confirm", "contact_ids": [request_1.contact_id]},
+            )
+        with CaptureQueriesContext(connection) as queries_2:
+            self._post(
+                "manage_requests_bulk_write",
+                {
+                    "action": "confirm",
+                    "contact_ids": [request_1.contact_id, request_2.contact_id],
+                },
+            )
+        # then
+        self.assertEqual(len(queries_2), len(queries_1))
+
+    def test_should_reject_invalid_payload(self, mock_notify):
+        for payload in [
+            {"action": "confirm"},
+            {"action": "unknown", "contact_ids": [1]},
+            {"action": "confirm", "contact_ids": ["abc"]},
+            {"action": "confirm", "contact_ids": "123"},
+            ["invalid"],
+        ]:
+            with self.subTest(payload=payload):
+                # when
+                response = self._post("manage_requests_bulk_write", payload)
+                # then
+                self.assertEqual(response.status_code, 400)
+
+    def test_should_not_allow_get(self, mock_notify):
+        # given
+        self.client.force_login(self.user_manager)
+        # when
+        response = self.client.get(
+            reverse("standingsrequests:manage_requests_bulk_write")
+        )
+        # then
+        self.assertEqual(response.status_code, 405)
+
+    def test_should_require_csrf_token(self, mock_notify):
+        # given
+        request_1, _ = self._create_requests()
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user_manager)
+        client.cookies[settings.CSRF_COOKIE_NAME] = CSRF_TOKEN
+        url = reverse("standingsrequests:manage_requests_bulk_write")
+        body = json.dumps({"action": "confirm", "contact_ids": [request_1.contact_id]})
+        # when
+        response_1 = client.post(url, data=body, content_type="application/json")
+        response_2 = client.post(
+            url, data=body, content_type="application/json", HTTP_X_CSRFTOKEN=CSRF_TOKEN
+        )
+        # then
+        self.assertEqual(response_1.status_code, 403)
+        self.assertEqual(response_2.status_code, 200)
@@ -1,19 +1,34 @@
+import csv
 import datetime as dt
+import io
+import json
 from unittest.mock import patch
 
-from django.test import RequestFactory, TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+from django.test import Client, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 
 from allianceauth.eveonline.models import EveAllianceInfo, EveCharacter
 from allianceauth.tests.auth_utils import AuthUtils
-from app_utils.testing import add_character_to_user
+from app_utils.testing import add_character_to_user, json_response_to_python
 
+from standingsrequests.core import standings_tables
 from standingsrequests.core.contact_types import ContactTypeId
-from standingsrequests.models import CharacterAffiliation, StandingRequest
+from standingsrequests.helpers import standings_cache
+from standingsrequests.models import (
+    CharacterAffiliation,
+    ContactSnapshot,
+    StandingRequest,
+)
 from standingsrequests.tests.testdata.my_test_data import (
     create_contacts_set,
     create_eve_objects,
+    create_standings_char,
     load_corporation_details,
     load_eve_entities,
 )
@@ -22,6 +37,33 @@ from standingsrequests.views import standings
 
 TEST_SCOPE = "publicData"
 MODULE_PATH = "standingsrequests.views.standings"
+CSRF_TOKEN = "x" * 32
+
+
+def datatables_params(
+    columns, start=0, length=10, search="", order=None, column_search=None
+) -> dict:
+    """Return query params as send by DataTables in server-side mode."""
+    params = {
+        "draw": 3,
+        "start": start,
+        "length": length,
+        "search[value]": search,
+        "search[regex]": "false",
+    }
+    for idx, name in enumerate(columns):
+        params[f"columns[{idx}][data]"] = name
+        params[f"columns[{idx}][searchable]"] = "true"
+        params[f"columns[{idx}][orderable]"] = "true"
+        params[f"columns[{idx}][search][value]"] = ""
+        params[f"columns[{idx}][search][regex]"] = "false"
+    for idx, value in (column_search or {}).items():
+        params[f"columns[{idx}][search][value]"] = value
+        params[f"columns[{idx}][search][regex]"] = "true"
+    for idx, (column, direction) in enumerate(order or [(0, "asc")]):
+        params[f"order[{idx}][column]"] = column
+        params[f"order[{idx}][dir]"] = direction
+    return params
 
 
 @patch("standingsrequests.core.app_config.STANDINGS_API_CHARID", 1001)
@@ -37,7 +79,7 @@ class TestStandingsView(TestCase):
 
         cls.user = AuthUtils.create_member("John Doe")
         cls.user = AuthUtils.add_permission_to_user_by_name(
-            "standingsrequests.request_standings", cls.user
+            "standingsrequests.affect_standings", cls.user
         )
 
     def test_can_open_standings_page(self):
@@ -64,7 +106,7 @@ class TestCharacterStandingsData(PartialDictEqualMixin, TestCase):
         member_state.member_alliances.add(EveAllianceInfo.objects.get(alliance_id=3001))
         cls.user = AuthUtils.create_member("John Doe")
         cls.user = AuthUtils.add_permission_to_user_by_name(
-            "standingsrequests.request_standings", cls.user
+            "standingsrequests.affect_standings", cls.user
         )
         EveCharacter.objects.get(character_id=1009).delete()
         cls.main_character_1 = EveCharacter.objects.get(character_id=1002)
@@ -81,6 +123,10 @@ class TestCharacterStandingsData(PartialDictEqualMixin, TestCase):
             cls.alt_character_1,
             scopes=[TEST_SCOPE],
         )
+        ContactSnapshot.objects.rebuild()
+
+    def setUp(self) -> None:
+        cache.clear()
 
     def test_normal_with_full_permissions(self):
         # given
@@ -156,6 +202,372 @@ class TestCharacterStandingsData(PartialDictEqualMixin, TestCase):
         }
         self.assertPartialDictEqual(data_character_1002, expected)
 
+    def test_should_return_page_in_server_side_mode(self):
+        # given
+        columns = [
+            "character_name_html",
+            "corporation_name",
+            "alliance_name",
+            "faction_name",
+            "standing",
+            "labels_str",
+        ]
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            datatables_params(columns, start=2, length=3, order=[(4, "desc")]),
+        )
+        request.user = self.user
+        my_view_without_cache = standings.character_standings_data.__wrapped__
+        # when
+        response = my_view_without_cache(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        result = json_response_to_python(response)
+        self.assertEqual(result["draw"], 3)
+        self.assertEqual(result["recordsTotal"], 10)
+        self.assertEqual(result["recordsFiltered"], 10)
+        self.assertEqual(len(result["data"]), 3)
+        standings_values = [obj["standing"] for obj in result["data"]]
+        self.assertListEqual(standings_values, sorted(standings_values, reverse=True))
+
+    def test_should_search_in_server_side_mode(self):
+        # given
+        columns = ["character_name_html", "corporation_name", "labels_str"]
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            datatables_params(columns, search="wayne tech"),
+        )
+        request.user = self.user
+        my_view_without_cache = standings.character_standings_data.__wrapped__
+        # when
+        response = my_view_without_cache(request)
+        # then
+        result = json_response_to_python(response)
+        corporation_names = {obj["corporation_name"] for obj in result["data"]}
+        self.assertSetEqual(corporation_names, {"Wayne Technologies"})
+        self.assertEqual(result["recordsFiltered"], len(result["data"]))
+
+    def test_should_filter_column_in_server_side_mode(self):
+        # given
+        columns = ["character_name_html", "corporation_name", "labels_str"]
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            datatables_params(columns, column_search={2: "^red$"}),
+        )
+        request.user = self.user
+        my_view_without_cache = standings.character_standings_data.__wrapped__
+        # when
+        response = my_view_without_cache(request)
+        # then
+        result = json_response_to_python(response)
+        self.assertTrue(result["data"])
+        for obj in result["data"]:
+            self.assertIn("red", obj["labels_str"])
+
+    def test_should_not_search_mains_without_permission(self):
+        # given
+        columns = ["character_name_html", "main_character_name"]
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            datatables_params(columns, column_search={1: "^Peter Parker$"}),
+        )
+        request.user = self.user
+        my_view_without_cache = standings.character_standings_data.__wrapped__
+        # when
+        response = my_view_without_cache(request)
+        # then
+        result = json_response_to_python(response)
+        self.assertEqual(result["recordsFiltered"], 10)
+
+    def test_should_return_filter_options(self):
+        # given
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_filter_options"),
+            {"columns": "alliance_name,main_character_name"},
+        )
+        request.user = self.user
+        my_view_without_cache = standings.character_standings_filter_options.__wrapped__
+        # when
+        response = my_view_without_cache(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        result = json_response_to_python(response)
+        self.assertIn("Wayne Enterprises", result["alliance_name"])
+        self.assertNotIn("main_character_name", result)
+
+    def test_should_serve_data_from_cache_until_snapshots_change(self):
+        # given
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data")
+        )
+        request.user = self.user
+        my_view = standings.character_standings_data.__wrapped__
+        my_view(request)
+        ContactSnapshot.objects.filter(contact_id=1002).update(name="Changed")
+        # when
+        response_1 = my_view(request)
+        standings_cache.bump_version()
+        response_2 = my_view(request)
+        # then
+        data_1 = json_response_to_dict_2(response_1, "character_id")
+        self.assertEqual(data_1[1002]["character_name_html"]["sort"], "Peter Parker")
+        data_2 = json_response_to_dict_2(response_2, "character_id")
+        self.assertEqual(data_2[1002]["character_name_html"]["sort"], "Changed")
+
+    def test_should_return_draw_of_request_for_cached_page(self):
+        # given
+        columns = ["character_name_html", "corporation_name"]
+        params = datatables_params(columns)
+        my_view = standings.character_standings_data.__wrapped__
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"), params
+        )
+        request.user = self.user
+        my_view(request)
+        params["draw"] = 4
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"), params
+        )
+        request.user = self.user
+        # when
+        response = my_view(request)
+        # then
+        result = json_response_to_python(response)
+        self.assertEqual(result["draw"], 4)
+        self.assertEqual(result["recordsTotal"], 10)
+
+    def test_should_pre_render_initial_pages(self):
+        # given
+        table = standings_tables.CHARACTER_TABLE
+        columns = [column.name for column in table.columns(True)]
+        # when
+        standings_tables.warm_cache()
+        # then
+        with self.assertNumQueries(0):
+            result = standings_tables.table_data(
+                table, {**datatables_params(columns), "format": "compact"}, True
+            )
+        self.assertEqual(len(result["data"]), 10)
+
+    @patch("standingsrequests.core.standings_tables.SR_PAGE_CACHE_SECONDS", 0)
+    def test_should_keep_only_initial_pages_in_standings_cache(self):
+        # given
+        table = standings_tables.CHARACTER_TABLE
+        columns = [column.name for column in table.columns(True)]
+        initial_params = datatables_params(columns)
+        searched_params = datatables_params(columns, search="Peter")
+        standings_tables.table_data(table, initial_params, True)
+        standings_tables.table_data(table, searched_params, True)
+        # when
+        with CaptureQueriesContext(connection) as initial_queries:
+            standings_tables.table_data(table, initial_params, True)
+        with CaptureQueriesContext(connection) as searched_queries:
+            standings_tables.table_data(table, searched_params, True)
+        # then
+        self.assertEqual(len(initial_queries), 0)
+        self.assertGreater(len(searched_queries), 0)
+
+    def test_should_return_not_modified_when_data_is_unchanged(self):
+        # given
+        my_view = standings.character_standings_data.__wrapped__
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data")
+        )
+        request.user = self.user
+        etag = my_view(request)["ETag"]
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        request.user = self.user
+        # when
+        with self.assertNumQueries(0):
+            response = my_view(request)
+        # then
+        self.assertEqual(response.status_code, 304)
+
+    def test_should_return_data_when_changed(self):
+        # given
+        my_view = standings.character_standings_data.__wrapped__
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data")
+        )
+        request.user = self.user
+        etag = my_view(request)["ETag"]
+        standings_cache.bump_version()
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        request.user = self.user
+        # when
+        response = my_view(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_should_use_different_etags_for_permission_levels(self):
+        # given
+        standings_cache.current_version()
+        user_2 = AuthUtils.create_member("Jane Doe")
+        user_2 = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.affect_standings", user_2
+        )
+        user_2 = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.view", user_2
+        )
+        my_view = standings.character_standings_data.__wrapped__
+        request_1 = self.factory.get(
+            reverse("standingsrequests:character_standings_data")
+        )
+        request_1.user = self.user
+        request_2 = self.factory.get(
+            reverse("standingsrequests:character_standings_data")
+        )
+        request_2.user = user_2
+        # when
+        response_1 = my_view(request_1)
+        response_2 = my_view(request_2)
+        # then
+        self.assertNotEqual(response_1["ETag"], response_2["ETag"])
+
+    def test_should_return_compact_format(self):
+        # given
+        user = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.view", self.user
+        )
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            {"format": "compact"},
+        )
+        request.user = user
+        my_view = standings.character_standings_data.__wrapped__
+        # when
+        response = my_view(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        result = json_response_to_python(response)
+        data = {row[0]: dict(zip(result["columns"], row)) for row in result["data"]}
+        expected = {1001, 1002, 1003, 1004, 1005, 1006, 1008, 1009, 1010, 1110}
+        self.assertSetEqual(set(data.keys()), expected)
+        self.assertDictEqual(
+            data[1002],
+            {
+                "character_id": 1002,
+                "name": "Peter Parker",
+                "corporation_name": "Wayne Technologies",
+                "alliance_name": "Wayne Enterprises",
+                "faction_name": "",
+                "standing": 10.0,
+                "labels_str": "blue, green",
+                "main_character_id": 1002,
+                "main_character_name": "Peter Parker",
+                "main_character_ticker": "WYE",
+                "state": "Member",
+            },
+        )
+        self.assertEqual(data[1009]["main_character_id"], None)
+        self.assertEqual(data[1009]["main_character_name"], "-")
+        self.assertEqual(data[1009]["state"], "-")
+
+    def test_should_compress_data_when_accepted(self):
+        # given
+        request = self.factory.get(
+            reverse("standingsrequests:character_standings_data"),
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+        request.user = self.user
+        my_view = standings.character_standings_data.__wrapped__
+        # when
+        response = my_view(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_compact_format_should_be_smaller(self):
+        # given
+        snapshots = [
+            ContactSnapshot(
+                contact_id=90_000_000 + num,
+                category="character",
+                name=f"Character {num}",
+                standing=5.0,
+                labels_str="blue, green",
+                corporation_name="Wayne Technologies",
+                alliance_name="Wayne Enterprises",
+                faction_name="",
+                main_character_id=1002,
+                main_character_name="Peter Parker",
+                main_character_ticker="WYE",
+                state_name="Member",
+            )
+            for num in range(1_000)
+        ]
+        # when
+        content_full = JsonResponse(
+            standings_tables.table_rows(
+                standings_tables.CHARACTER_TABLE, snapshots, True, is_compact=False
+            )
+        ).content
+        content_compact = JsonResponse(
+            standings_tables.table_rows(
+                standings_tables.CHARACTER_TABLE, snapshots, True, is_compact=True
+            )
+        ).content
+        # then
+        self.assertLess(len(content_compact) * 3, len(content_full))
+
+    def test_should_download_standings_as_csv(self):
+        # given
+        user = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.download", self.user
+        )
+        request = self.factory.get(reverse("standingsrequests:download_pilots"))
+        request.user = user
+        # when
+        response = standings.download_pilot_standings(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content)
+        rows = list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+        data = {int(row["character_id"]): row for row in rows}
+        self.assertEqual(len(data), ContactSnapshot.objects.count())
+        self.assertDictEqual(
+            data[1002],
+            {
+                "character_id": "1002",
+                "character_name": "Peter Parker",
+                "corporation_id": "2001",
+                "corporation_name": "Wayne Technologies",
+                "corporation_ticker": "WYE",
+                "alliance_id": "3001",
+                "alliance_name": "Wayne Enterprises",
+                "has_scopes": "True",
+                "state": "Member",
+                "main_character_name": "Peter Parker",
+                "main_character_ticker": "WYE",
+                "standing": "10.0",
+                "labels": "blue, green",
+            },
+        )
+        self.assertEqual(data[1009]["has_scopes"], "False")
+        self.assertEqual(data[1009]["state"], "")
+
+    def test_should_stream_csv_header_before_loading_data(self):
+        # given
+        user = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.download", self.user
+        )
+        request = self.factory.get(reverse("standingsrequests:download_pilots"))
+        request.user = user
+        response = standings.download_pilot_standings(request)
+        # when
+        with self.assertNumQueries(0):
+            first_line = next(iter(response.streaming_content))
+        # then
+        self.assertTrue(first_line.startswith(b"character_id,character_name,"))
+
 
 class TestCorporationStandingsData(PartialDictEqualMixin, TestCase):
     @classmethod
@@ -170,7 +582,7 @@ class TestCorporationStandingsData(PartialDictEqualMixin, TestCase):
         member_state.member_alliances.add(EveAllianceInfo.objects.get(alliance_id=3001))
         cls.user_1 = AuthUtils.create_member("John Doe")
         cls.user_1 = AuthUtils.add_permission_to_user_by_name(
-            "standingsrequests.request_standings", cls.user_1
+            "standingsrequests.affect_standings", cls.user_1
         )
         EveCharacter.objects.get(character_id=1009).delete()
         cls.main_character_1 = EveCharacter.objects.get(character_id=1002)
@@ -196,6 +608,10 @@ class TestCorporationStandingsData(PartialDictEqualMixin, TestCase):
             is_effective=True,
             effective_date=now() - dt.timedelta(days=1),
         )
+        ContactSnapshot.objects.rebuild()
+
+    def setUp(self) -> None:
+        cache.clear()
 
     def test_with_full_permissions(self):
         # given
@@ -263,6 +679,28 @@ class TestCorporationStandingsData(PartialDictEqualMixin, TestCase):
             },
         )
 
+    def test_should_order_by_main_in_server_side_mode(self):
+        # given
+        self.user_1 = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.view", self.user_1
+        )
+        columns = ["corporation_html", "standing", "main_character_name"]
+        request = self.factory.get(
+            reverse("standingsrequests:corporation_standings_data"),
+            datatables_params(columns, length=1, order=[(2, "desc")]),
+        )
+        request.user = self.user_1
+        my_view_without_cache = standings.corporation_standings_data.__wrapped__
+        # when
+        response = my_view_without_cache(request)
+        # then
+        result = json_response_to_python(response)
+        self.assertEqual(result["recordsTotal"], 3)
+        self.assertEqual(len(result["data"]), 1)
+        obj = result["data"][0]
+        self.assertEqual(obj["corporation_id"], 2102)
+        self.assertEqual(obj["main_character_name"], "Peter Parker")
+
 
 class TestAllianceStandingsData(PartialDictEqualMixin, TestCase):
     @classmethod
@@ -277,7 +715,7 @@ class TestAllianceStandingsData(PartialDictEqualMixin, TestCase):
         member_state.member_alliances.add(EveAllianceInfo.objects.get(alliance_id=3001))
         cls.user = AuthUtils.create_member("John Doe")
         cls.user = AuthUtils.add_permission_to_user_by_name(
-            "standingsrequests.request_standings", cls.user
+            "standingsrequests.affect_standings", cls.user
         )
         EveCharacter.objects.get(character_id=1009).delete()
         cls.main_character_1 = EveCharacter.objects.get(character_id=1002)
@@ -294,6 +732,10 @@ class TestAllianceStandingsData(PartialDictEqualMixin, TestCase):
             cls.alt_character_1,
             scopes=[TEST_SCOPE],
         )
+        ContactSnapshot.objects.rebuild()
+
+    def setUp(self) -> None:
+        cache.clear()
 
     def test_normal(self):
         # given
@@ -309,3 +751,128 @@ class TestAllianceStandingsData(PartialDictEqualMixin, TestCase):
         self.assertSetEqual(set(data.keys()), {3010})
         obj = data[3010]
         self.assertPartialDictEqual(obj, {"alliance_id": 3010, "standing": -10.0})
+
+
+class TestStandingsLookup(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.factory = RequestFactory()
+        load_eve_entities()
+        create_contacts_set()
+        cls.user = AuthUtils.create_member("John Doe")
+        cls.user = AuthUtils.add_permission_to_user_by_name(
+            "standingsrequests.affect_standings", cls.user
+        )
+
+    def test_should_return_standings_for_ids(self):
+        # given
+        request = self.factory.get(
+            reverse("standingsrequests:standings_lookup"), {"ids": "1002,99"}
+        )
+        request.user = self.user
+        # when
+        response = standings.standings_lookup(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        result = json_response_to_python(response)
+        self.assertDictEqual(
+            result,
+            {
+                "1002": {
+                    "standing": 10.0,
+                    "labels": ["blue", "green"],
+                    "request_state": None,
+                },
+                "99": {"standing": None, "labels": [], "request_state": None},
+            },
+        )
+
+    def test_should_reject_invalid_ids(self):
+        # given
+        request = self.factory.get(
+            reverse("standingsrequests:standings_lookup"), {"ids": "1002,abc"}
+        )
+        request.user = self.user
+        # when
+        response = standings.standings_lookup(request)
+        # then
+        self.assertEqual(response.status_code, 400)
+
+    def test_should_reject_too_many_ids(self):
+        # given
+        ids = ",".join(str(num) for num in range(standings.MAX_LOOKUP_IDS_GET + 1))
+        request = self.factory.get(
+            reverse("standingsrequests:standings_lookup"), {"ids": ids}
+        )
+        request.user = self.user
+        # when
+        response = standings.standings_lookup(request)
+        # then
+        self.assertEqual(response.status_code, 400)
+
+    def test_should_return_standings_for_ids_in_post_body(self):
+        # given
+        request = self.factory.post(
+            reverse("standingsrequests:standings_lookup"),
+            data=json.dumps({"ids": [1002, 99]}),
+            content_type="application/json",
+        )
+        request.user = self.user
+        # when
+        response = standings.standings_lookup(request)
+        # then
+        self.assertEqual(response.status_code, 200)
+        result = json_response_to_python(response)
+        self.assertEqual(result["1002"]["standing"], 10.0)
+        self.assertIsNone(result["99"]["standing"])
+
+    def test_should_reject_too_many_ids_in_post_body(self):
+        # given
+        request = self.factory.post(
+            reverse("standingsrequests:standings_lookup"),
+            data=json.dumps({"ids": list(range(standings.MAX_LOOKUP_IDS + 1))}),
+            content_type="application/json",
+        )
+        request.user = self.user
+        # when
+        response = standings.standings_lookup(request)
+        # then
+        self.assertEqual(response.status_code, 400)
+
+    def test_should_reject_invalid_post_body(self):
+        for body in [
+            "invalid",
+            json.dumps({"ids": ["abc"]}),
+            json.dumps({"ids": "123"}),
+            json.dumps([1]),
+        ]:
+            with self.subTest(body=body):
+                # given
+                request = self.factory.post(
+                    reverse("standingsrequests:standings_lookup"),
+                    data=body,
+                    content_type="application/json",
+                )
+                request.user = self.user
+                # when
+                response = standings.standings_lookup(request)
+                # then
+                self.assertEqual(response.status_code, 400)
+
+    def test_should_require_csrf_token_for_post(self):
+        # given
+        add_character_to_user(self.user, create_standings_char(), is_main=True)
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        client.cookies[settings.CSRF_COOKIE_NAME] = CSRF_TOKEN
+        url = reverse("standingsrequests:standings_lookup")
+        body = json.dumps({"ids": [1002]})
+        # when
+        response_1 = client.post(url, data=body, content_type="application/json")
+        response_2 = client.post(
+            url, data=body, content_type="application/json", HTTP_X_CSRFTOKEN=CSRF_TOKEN
+        )
+        # then
+        self.assertEqual(response_1.status_code, 403)
+        self.assertEqual(response_2.status_code, 200)
@@ -80,6 +80,11 @@ urlpatterns = [
         manage_requests.manage_requests_write,
         name="manage_requests_write",
     ),
+    path(
+        "manage/requests/bulk/",
+        manage_requests.manage_requests_bulk_write,
+        name="manage_requests_bulk_write",
+    ),
     path(
         "manage/revocations/",
         manage_requests.manage_revocations_list,
@@ -90,6 +95,11 @@ urlpatterns = [
         manage_requests.manage_revocations_write,
         name="manage_revocations_write",
     ),
+    path(
+        "manage/revocations/bulk/",
+        manage_requests.manage_revocations_bulk_write,
+        name="manage_revocations_bulk_write",
+    ),
     # Standings
     path("standings", standings.standings, name="standings"),
     path(
@@ -97,6 +107,11 @@ urlpatterns = [
         standings.character_standings_data,
         name="character_standings_data",
     ),
+    path(
+        "standings/characters/filter_options",
+        standings.character_standings_filter_options,
+        name="character_standings_filter_options",
+    ),
     path(
         "standings/characters/download",
         standings.download_pilot_standings,
@@ -107,9 +122,24 @@ urlpatterns = [
         standings.corporation_standings_data,
         name="corporation_standings_data",
     ),
+    path(
+        "standings/corporations/filter_options",
+        standings.corporation_standings_filter_options,
+        name="corporation_standings_filter_options",
+    ),
     path(
         "standings/alliances/data",
         standings.alliance_standings_data,
         name="alliance_standings_data",
     ),
+    path(
+        "standings/alliances/filter_options",
+        standings.alliance_standings_filter_options,
+        name="alliance_standings_filter_options",
+    ),
+    path(
+        "standings/lookup",
+        standings.standings_lookup,
+        name="standings_lookup",
+    ),
 ]
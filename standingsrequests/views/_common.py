@@ -1,40 +1,29 @@
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
 
 from django.contrib.auth.models import User
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils.html import format_html
 
+from allianceauth.authentication.models import CharacterOwnership
 from allianceauth.eveonline.models import EveCharacter
 
 from standingsrequests import __title__
 from standingsrequests.constants import DATETIME_FORMAT_HTML
-from standingsrequests.core import app_config
+from standingsrequests.core import app_config, pending_counts
 from standingsrequests.core.contact_types import ContactTypeId
-from standingsrequests.helpers.evecharacter import EveCharacterHelper
+from standingsrequests.helpers.evecharacter import CharacterAffiliationInfo
 from standingsrequests.helpers.evecorporation import EveCorporation
+from standingsrequests.helpers.icon_labels import DEFAULT_ICON_SIZE, label_with_icon
 from standingsrequests.models import (
     AbstractStandingsRequest,
     Contact,
     ContactSet,
     StandingRequest,
-    StandingRevocation,
 )
 
-DEFAULT_ICON_SIZE = 32
-
-
-def label_with_icon(icon_url: str, text: str):
-    return format_html(
-        '<span class="text-nowrap">'
-        '<img src="{}" class="img-circle" style="width:{}px;height:{}px"> {}'
-        "</span>",
-        icon_url,
-        DEFAULT_ICON_SIZE,
-        DEFAULT_ICON_SIZE,
-        text,
-    )
-
 
 def add_common_context(request, context: dict) -> dict:
     """adds the common context used by all view"""
@@ -42,10 +31,7 @@ def add_common_context(request, context: dict) -> dict:
         **{
             "app_title": __title__,
             "operation_mode": str(app_config.operation_mode()),
-            "pending_total_count": (
-                StandingRequest.objects.pending_requests().count()
-                + StandingRevocation.objects.pending_requests().count()
-            ),
+            "pending_total_count": pending_counts.pending_counts().total,
             "DATETIME_FORMAT_HTML": DATETIME_FORMAT_HTML,
         },
         **context,
@@ -87,6 +73,101 @@ class MainCharacterInfo:
         return obj
 
 
+class RequiredScopesResolver:
+    """Resolves whether the contacts of standing requests have the required scopes.
+
+    All checks are done in bulk when the resolver is created,
+    which needs a fixed number of queries per state,
+    regardless of the number of requests.
+    """
+
+    def __init__(
+        self,
+        requests: List[AbstractStandingsRequest],
+        eve_corporations: Dict[int, EveCorporation],
+        quick_check: bool = False,
+    ) -> None:
+        self._eve_corporations = eve_corporations
+        self._state_names = self._identify_state_names(
+            [req for req in requests if req.is_character]
+        )
+        self._characters_with_scopes = self._resolve_characters(
+            [req for req in requests if req.is_character], quick_check
+        )
+        self._tokens_counts = EveCorporation.member_tokens_counts_for_users(
+            users={req.user for req in requests if req.is_corporation},
+            corporation_ids={req.contact_id for req in requests if req.is_corporation},
+            quick_check=quick_check,
+        )
+
+    def has_scopes(self, req: AbstractStandingsRequest) -> bool:
+        """Return True if the contact of a request has the required scopes."""
+        if req.is_character:
+            state_name = self._state_names.get(req.pk)
+            return (
+                state_name is not None
+                and req.contact_id in self._characters_with_scopes[state_name]
+            )
+
+        if req.is_corporation:
+            try:
+                corporation = self._eve_corporations[req.contact_id]
+            except KeyError:
+                return False
+            tokens_count = self._tokens_counts.get((req.user_id, req.contact_id), 0)
+            return (
+                not corporation.is_npc
+                and corporation.member_count is not None
+                and tokens_count >= corporation.member_count
+            )
+
+        return False
+
+    @staticmethod
+    def _identify_state_names(
+        requests: List[AbstractStandingsRequest],
+    ) -> Dict[int, str]:
+        """Identify the state relevant for each character request.
+        This is the state of the requestor or else the state of the owner.
+        """
+        owners = {
+            obj.character.character_id: obj.user
+            for obj in CharacterOwnership.objects.select_related(
+                "character", "user__profile__state"
+            ).filter(
+                character__character_id__in=[
+                    req.contact_id for req in requests if not req.user
+                ]
+            )
+        }
+        state_names = {}
+        for req in requests:
+            user = req.user if req.user else owners.get(req.contact_id)
+            try:
+                state_names[req.pk] = user.profile.state.name
+            except (AttributeError, ObjectDoesNotExist):
+                pass
+        return state_names
+
+    def _resolve_characters(
+        self, requests: List[AbstractStandingsRequest], quick_check: bool
+    ) -> Dict[str, Set[int]]:
+        character_ids_by_state = defaultdict(set)
+        for req in requests:
+            if req.pk in self._state_names:
+                character_ids_by_state[self._state_names[req.pk]].add(req.contact_id)
+
+        return defaultdict(
+            set,
+            {
+                state_name: StandingRequest.character_ids_with_required_scopes(
+                    character_ids, state_name=state_name, quick_check=quick_check
+                )
+                for state_name, character_ids in character_ids_by_state.items()
+            },
+        )
+
+
 @dataclass(frozen=True)
 class OrganizationInfo:
     """Organizational info about a requestor."""
@@ -121,8 +202,9 @@ class OrganizationInfo:
     @classmethod
     def create(
         cls,
-        quick_check: bool,
+        scopes_resolver: Optional[RequiredScopesResolver],
         eve_characters: Dict[int, EveCharacter],
+        character_affiliations: Dict[int, CharacterAffiliationInfo],
         eve_corporations: Dict[int, EveCorporation],
         req: AbstractStandingsRequest,
     ) -> "OrganizationInfo":
@@ -130,8 +212,9 @@ class OrganizationInfo:
             if req.contact_id in eve_characters:
                 character = eve_characters[req.contact_id]
             else:
-                # TODO: remove EveCharacterHelper usage
-                character = EveCharacterHelper(req.contact_id)
+                character = character_affiliations.get(
+                    req.contact_id, CharacterAffiliationInfo(req.contact_id)
+                )
 
             contact_name = character.character_name
             contact_icon_url = character.portrait_url(DEFAULT_ICON_SIZE)
@@ -144,9 +227,7 @@ class OrganizationInfo:
             )
             alliance_id = character.alliance_id
             alliance_name = character.alliance_name if character.alliance_name else ""
-            has_scopes = StandingRequest.has_required_scopes_for_request(
-                character=character, user=req.user, quick_check=quick_check
-            )
+            has_scopes = scopes_resolver.has_scopes(req) if scopes_resolver else False
             return cls(
                 contact_name,
                 contact_icon_url,
@@ -167,12 +248,7 @@ class OrganizationInfo:
             corporation_ticker = corporation.ticker
             alliance_id = None
             alliance_name = ""
-            has_scopes = (
-                not corporation.is_npc
-                and corporation.user_has_all_member_tokens(
-                    user=req.user, quick_check=quick_check
-                )
-            )
+            has_scopes = scopes_resolver.has_scopes(req) if scopes_resolver else False
             return cls(
                 contact_name,
                 contact_icon_url,
@@ -187,60 +263,159 @@ class OrganizationInfo:
         return cls()
 
 
+@dataclass(frozen=True)
+class _RequestRow:
+    """Everything known about a request for composing its output fields."""
+
+    req: AbstractStandingsRequest
+    organization: OrganizationInfo
+    main_character: MainCharacterInfo
+    labels: List[str]
+
+
+def _state_name(row: _RequestRow) -> str:
+    return row.req.user.profile.state.name if row.req.user else "-"
+
+
+def _reason(row: _RequestRow) -> Optional[str]:
+    return row.req.get_reason_display() if row.req.is_standing_revocation else None
+
+
+def _action_by(row: _RequestRow) -> str:
+    return row.req.action_by.username if row.req.action_by else "(System)"
+
+
+_REQUEST_FIELDS: Dict[str, Callable[[_RequestRow], Any]] = {
+    "contact_id": lambda row: row.req.contact_id,
+    "contact_name": lambda row: row.organization.contact_name,
+    "contact_icon_url": lambda row: row.organization.contact_icon_url,
+    "contact_name_html": lambda row: {
+        "display": row.organization.contact_name_html(),
+        "sort": row.organization.contact_name,
+    },
+    "corporation_id": lambda row: row.organization.corporation_id,
+    "corporation_name": lambda row: row.organization.corporation_name,
+    "corporation_ticker": lambda row: row.organization.corporation_ticker,
+    "alliance_id": lambda row: row.organization.alliance_id,
+    "alliance_name": lambda row: row.organization.alliance_name,
+    "organization_html": lambda row: row.organization.organization_html(),
+    "request_date": lambda row: row.req.request_date,
+    "action_date": lambda row: row.req.action_date,
+    "has_scopes": lambda row: row.organization.has_scopes,
+    "state": _state_name,
+    "reason": _reason,
+    "labels": lambda row: row.labels,
+    "main_character_name": lambda row: row.main_character.character_name,
+    "main_character_ticker": lambda row: row.main_character.ticker,
+    "main_character_icon_url": lambda row: row.main_character.icon_url,
+    "main_character_html": lambda row: row.main_character.html(),
+    "actioned": lambda row: row.req.is_actioned,
+    "is_effective": lambda row: row.req.is_effective,
+    "is_corporation": lambda row: row.req.is_corporation,
+    "is_character": lambda row: row.req.is_character,
+    "action_by": _action_by,
+}
+
+_ORGANIZATION_FIELDS = frozenset(
+    {
+        "contact_name",
+        "contact_icon_url",
+        "contact_name_html",
+        "corporation_id",
+        "corporation_name",
+        "corporation_ticker",
+        "alliance_id",
+        "alliance_name",
+        "organization_html",
+        "has_scopes",
+    }
+)
+_MAIN_CHARACTER_FIELDS = frozenset(
+    {
+        "main_character_name",
+        "main_character_ticker",
+        "main_character_icon_url",
+        "main_character_html",
+    }
+)
+
+
 def compose_standing_requests_data(
-    requests_qs: models.QuerySet, quick_check: bool = False
+    requests_qs: models.QuerySet,
+    quick_check: bool = False,
+    fields: Optional[Iterable[str]] = None,
 ) -> list:
     """composes list of standings requests or revocations based on queryset
     and returns it
+
+    Params:
+    - quick_check: if True will not check if tokens are valid to save time
+    - fields: names of the fields to compose for each request. Default is all fields.
+        Data which is only needed for fields not requested is not loaded,
+        e.g. scopes are not checked when ``has_scopes`` is not requested.
     """
+    if fields is None:
+        fields = list(_REQUEST_FIELDS.keys())
+    else:
+        fields = list(fields)
+        unknown_fields = set(fields) - _REQUEST_FIELDS.keys()
+        if unknown_fields:
+            raise ValueError(f"Unknown fields: {sorted(unknown_fields)}")
+
+    needs_organization = not _ORGANIZATION_FIELDS.isdisjoint(fields)
+    needs_main_character = not _MAIN_CHARACTER_FIELDS.isdisjoint(fields)
+    needs_labels = "labels" in fields
     requests_query: models.QuerySet[
         AbstractStandingsRequest
     ] = requests_qs.select_related(
-        "user", "user__profile__state", "user__profile__main_character"
+        "user", "user__profile__state", "user__profile__main_character", "action_by"
     )
-    eve_characters = _preload_eve_characters(requests_query)
-    eve_corporations = _preload_eve_corporations(requests_query)
-    contacts = _identify_contacts(eve_characters, eve_corporations)
-    requests_data = []
-    for req in requests_query:
-        main_character = MainCharacterInfo.create_from_user(req.user)
-        state_name = req.user.profile.state.name if req.user else "-"
-        organization = OrganizationInfo.create(
-            quick_check, eve_characters, eve_corporations, req
+    if needs_organization or needs_labels:
+        eve_characters = _preload_eve_characters(requests_query)
+        eve_corporations = _preload_eve_corporations(requests_query)
+    else:
+        eve_characters, eve_corporations = {}, {}
+    contacts = (
+        _identify_contacts(eve_characters, eve_corporations) if needs_labels else {}
+    )
+    requests = list(requests_query)
+    if needs_organization:
+        character_affiliations = CharacterAffiliationInfo.preload(
+            req.contact_id
+            for req in requests
+            if req.is_character and req.contact_id not in eve_characters
         )
-        reason = req.get_reason_display() if req.is_standing_revocation else None
-        requests_data.append(
-            {
-                "contact_id": req.contact_id,
-                "contact_name": organization.contact_name,
-                "contact_icon_url": organization.contact_icon_url,
-                "contact_name_html": {
-                    "display": organization.contact_name_html(),
-                    "sort": organization.contact_name,
-                },
-                "corporation_id": organization.corporation_id,
-                "corporation_name": organization.corporation_name,
-                "corporation_ticker": organization.corporation_ticker,
-                "alliance_id": organization.alliance_id,
-                "alliance_name": organization.alliance_name,
-                "organization_html": organization.organization_html(),
-                "request_date": req.request_date,
-                "action_date": req.action_date,
-                "has_scopes": organization.has_scopes,
-                "state": state_name,
-                "reason": reason,
-                "labels": sorted(_fetch_labels(contacts, req)),
-                "main_character_name": main_character.character_name,
-                "main_character_ticker": main_character.ticker,
-                "main_character_icon_url": main_character.icon_url,
-                "main_character_html": main_character.html(),
-                "actioned": req.is_actioned,
-                "is_effective": req.is_effective,
-                "is_corporation": req.is_corporation,
-                "is_character": req.is_character,
-                "action_by": req.action_by.username if req.action_by else "(System)",
-            }
+    else:
+        character_affiliations = {}
+    scopes_resolver = (
+        RequiredScopesResolver(requests, eve_corporations, quick_check)
+        if "has_scopes" in fields
+        else None
+    )
+    field_getters = [(name, _REQUEST_FIELDS[name]) for name in fields]
+    requests_data = []
+    for req in requests:
+        row = _RequestRow(
+            req=req,
+            organization=(
+                OrganizationInfo.create(
+                    scopes_resolver,
+                    eve_characters,
+                    character_affiliations,
+                    eve_corporations,
+                    req,
+                )
+                if needs_organization
+                else OrganizationInfo()
+            ),
+            main_character=(
+                MainCharacterInfo.create_from_user(req.user)
+                if needs_main_character
+                else MainCharacterInfo()
+            ),
+            labels=sorted(_fetch_labels(contacts, req)) if needs_labels else [],
         )
+        requests_data.append({name: getter(row) for name, getter in field_getters})
     return requests_data
 
 
@@ -281,9 +456,7 @@ def _identify_contacts(eve_characters, eve_corporations) -> Dict[int, Contact]:
         all_contact_ids = set(eve_characters.keys()) | set(eve_corporations.keys())
         contacts = {
             obj.eve_entity_id: obj
-            for obj in contact_set.contacts.prefetch_related("labels").filter(
-                eve_entity_id__in=all_contact_ids
-            )
+            for obj in contact_set.contacts.filter(eve_entity_id__in=all_contact_ids)
         }
     return contacts
 
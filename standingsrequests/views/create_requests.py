@@ -1,8 +1,10 @@
-from typing import Set
+from typing import FrozenSet, Iterable, Set
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.html import format_html
@@ -18,25 +20,34 @@ from app_utils.logging import LoggerAddTag
 from standingsrequests import __title__
 from standingsrequests.app_settings import SR_CORPORATIONS_ENABLED
 from standingsrequests.constants import CreateCharacterRequestResult
-from standingsrequests.core import app_config
+from standingsrequests.core import app_config, pending_counts
 from standingsrequests.decorators import token_required_by_state
 from standingsrequests.helpers.evecorporation import EveCorporation
-from standingsrequests.models import ContactSet, StandingRequest, StandingRevocation
-from standingsrequests.tasks import update_all, update_associations_api
+from standingsrequests.models import (
+    ContactSet,
+    CorporationDetails,
+    StandingRequest,
+    StandingRevocation,
+)
+from standingsrequests.tasks import (
+    update_all,
+    update_associations_api,
+    update_corporation_detail,
+)
 
 from ._common import DEFAULT_ICON_SIZE, add_common_context
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
+CACHE_KEY_CORPORATION_DETAILS_QUEUED = "STANDINGS_REQUESTS_CORPORATION_DETAILS_QUEUED"
+CORPORATION_DETAILS_QUEUED_TIMEOUT = 60 * 10  # seconds
+
 
 @login_required
 @permission_required(StandingRequest.REQUEST_PERMISSION_NAME)
 def index_view(request):
     """index page is used as dispatcher"""
-    app_count = (
-        StandingRequest.objects.pending_requests().count()
-        + StandingRevocation.objects.pending_requests().count()
-    )
+    app_count = pending_counts.pending_counts().total
     if app_count > 0 and request.user.has_perm("standingsrequests.affect_standings"):
         return redirect("standingsrequests:manage")
 
@@ -103,6 +114,9 @@ def request_characters(request):
             ).annotate_is_pending()
         )
     }
+    characters_with_scopes = _calc_character_ids_with_scopes(
+        request.user, eve_characters.keys()
+    )
     characters_data = [
         _create_character_row(
             user=request.user,
@@ -110,6 +124,7 @@ def request_characters(request):
             characters_with_standing=characters_with_standing,
             characters_standings_requests=characters_standings_requests,
             characters_standing_revocation=characters_standing_revocation,
+            characters_with_scopes=characters_with_scopes,
         )
         for character in eve_characters.values()
     ]
@@ -128,6 +143,7 @@ def _create_character_row(
     characters_with_standing,
     characters_standings_requests,
     characters_standing_revocation,
+    characters_with_scopes: FrozenSet[int],
 ):
     character_id = character.character_id
     standing = characters_with_standing.get(character_id)
@@ -155,14 +171,30 @@ def _create_character_row(
         "pendingRevocation": has_pending_revocation,
         "requestActioned": has_actioned_request,
         "inOrganisation": app_config.is_character_a_member(character),
-        "hasRequiredScopes": StandingRequest.has_required_scopes_for_request(
-            character, user=user, quick_check=True
-        ),
+        "hasRequiredScopes": character_id in characters_with_scopes,
         "hasStanding": has_standing,
     }
     return result
 
 
+def _calc_character_ids_with_scopes(
+    user: User, character_ids: Iterable[int]
+) -> FrozenSet[int]:
+    """Return IDs of the given characters of a user,
+    which have the required scopes for a standings request.
+    """
+    try:
+        state_name = user.profile.state.name
+    except ObjectDoesNotExist:
+        return frozenset()
+
+    return frozenset(
+        StandingRequest.character_ids_with_required_scopes(
+            character_ids, state_name=state_name, quick_check=True
+        )
+    )
+
+
 def _make_eve_characters_map(request):
     eve_characters_qs = EveCharacter.objects.filter(
         character_ownership__user=request.user
@@ -204,21 +236,32 @@ def request_corporations(request):
         obj.eve_entity_id: obj
         for obj in (contact_set.contacts.filter(eve_entity_id__in=corporation_ids))
     }
+    tokens_counts = EveCorporation.member_tokens_counts_for_user(
+        request.user, corporation_ids, quick_check=True
+    )
+    corporations_details = CorporationDetails.objects.select_related(
+        "corporation", "alliance"
+    ).filter(corporation_id__in=corporation_ids)
     corporations_data = []
-    for corporation in EveCorporation.get_many_by_id(corporation_ids):
-        if not corporation or corporation.is_npc:
+    known_corporation_ids = set()
+    for details in corporations_details:
+        known_corporation_ids.add(details.corporation_id)
+        corporation = EveCorporation.from_corporation_details(details)
+        if corporation.is_npc:
             continue
 
         row = _create_corporation_row(
             user=request.user,
             corporation=corporation,
+            tokens_counts=tokens_counts,
             corporations_standing_requests=corporations_standing_requests,
             corporations_revocation_requests=corporations_revocation_requests,
             corporation_contacts=corporation_contacts,
         )
         corporations_data.append(row)
 
-    corporations_data.sort(key=lambda x: x["corp"].corporation_name)
+    _queue_corporation_details_update(corporation_ids - known_corporation_ids)
+    corporations_data.sort(key=lambda x: x["corp"].corporation_name or "")
     context = {"corps": corporations_data}
     return render(
         request,
@@ -230,6 +273,7 @@ def request_corporations(request):
 def _create_corporation_row(
     user: User,
     corporation: EveCorporation,
+    tokens_counts,
     corporations_standing_requests,
     corporations_revocation_requests,
     corporation_contacts,
@@ -257,7 +301,7 @@ def _create_corporation_row(
         and corporations_standing_requests[corporation_id].user == user
     )
     result = {
-        "token_count": corporation.member_tokens_count_for_user(user, quick_check=True),
+        "token_count": tokens_counts.get(corporation_id, 0),
         "corp": corporation,
         "standing": standing,
         "pendingRequest": has_pending_request,
@@ -269,6 +313,25 @@ def _create_corporation_row(
     return result
 
 
+def _queue_corporation_details_update(corporation_ids: Iterable[int]) -> None:
+    """Queue fetching details of unknown corporations in the background.
+
+    Corporations which are already queued are not queued again for a while.
+    """
+    for corporation_id in corporation_ids:
+        if EveCorporation.corporation_is_npc(corporation_id):
+            continue
+        if cache.add(
+            f"{CACHE_KEY_CORPORATION_DETAILS_QUEUED}_{corporation_id}",
+            True,
+            timeout=CORPORATION_DETAILS_QUEUED_TIMEOUT,
+        ):
+            update_corporation_detail.delay(corporation_id)
+            logger.info(
+                "%s: Queued fetching details of unknown corporation", corporation_id
+            )
+
+
 def _calc_corporation_ids(user: User) -> Set[int]:
     eve_characters_qs = EveCharacter.objects.filter(
         character_ownership__user=user
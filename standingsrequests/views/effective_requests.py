@@ -1,9 +1,14 @@
+import hashlib
+from typing import Optional
+
 from django.contrib.auth.decorators import login_required, permission_required
+from django.core.cache import cache
 from django.db import models
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.utils.html import format_html
-from django.views.decorators.cache import cache_page
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
 
 from allianceauth.services.hooks import get_extension_logger
 from app_utils.logging import LoggerAddTag
@@ -18,6 +23,28 @@ from ._common import add_common_context, compose_standing_requests_data
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
+CACHE_KEY_DATA = "STANDINGS_REQUESTS_EFFECTIVE_REQUESTS_DATA"
+
+# fields of the composed requests needed for the columns of the page
+EFFECTIVE_REQUESTS_FIELDS = (
+    "contact_id",
+    "contact_name",
+    "contact_name_html",
+    "corporation_name",
+    "corporation_ticker",
+    "alliance_name",
+    "organization_html",
+    "request_date",
+    "action_date",
+    "has_scopes",
+    "state",
+    "labels",
+    "main_character_name",
+    "main_character_html",
+    "is_effective",
+    "action_by",
+)
+
 
 @login_required
 @permission_required("standingsrequests.affect_standings")
@@ -33,19 +60,37 @@ def effective_requests(request):
     )
 
 
-@cache_page(SR_PAGE_CACHE_SECONDS)
+def _effective_requests_etag(request) -> Optional[str]:
+    cached = cache.get(CACHE_KEY_DATA)
+    return cached["etag"] if cached else None
+
+
 @login_required
 @permission_required("standingsrequests.affect_standings")
+@condition(etag_func=_effective_requests_etag)
 def effective_requests_data(request):
+    cached = cache.get(CACHE_KEY_DATA)
+    if not cached:
+        content = JsonResponse({"data": _effective_requests_data()}).content
+        cached = {"content": content, "etag": hashlib.md5(content).hexdigest()}
+        cache.set(CACHE_KEY_DATA, cached, timeout=SR_PAGE_CACHE_SECONDS)
+
+    response = HttpResponse(cached["content"], content_type="application/json")
+    response["ETag"] = quote_etag(cached["etag"])
+    return response
+
+
+def _effective_requests_data() -> list:
     requests_data = compose_standing_requests_data(
-        _standing_requests_to_view(), quick_check=True
+        _standing_requests_to_view(), quick_check=True, fields=EFFECTIVE_REQUESTS_FIELDS
     )
     for req in requests_data:
+        request_date = req.pop("request_date")
         req["request_date_str"] = {
-            "display": req["request_date"].strftime(DATETIME_FORMAT_PY),
-            "sort": req["request_date"].isoformat(),
+            "display": request_date.strftime(DATETIME_FORMAT_PY),
+            "sort": request_date.isoformat(),
         }
-        req["labels_str"] = ", ".join(req["labels"])
+        req["labels_str"] = ", ".join(req.pop("labels"))
         scopes_html = (
             '<i class="fas fa-check fa-fw text-success" title="Has required scopes"></i>'
             if req["has_scopes"]
@@ -56,26 +101,13 @@ def effective_requests_data(request):
         )
         effective_html = (
             '<i class="fas fa-check fa-fw text-success" title="Standing Effective"></i>'
-            if req["is_effective"]
+            if req.pop("is_effective")
             else '<i class="fas fa-times fa-fw text-danger" title="Standing not effective"></i>'
         )
         req["effective_html"] = format_html(
             "{} {}", format_html(effective_html), req["action_by"]
         )
-        # remove columns that are not needed to reduce data volume
-        del req["request_date"]
-        del req["reason"]
-        del req["main_character_ticker"]
-        del req["main_character_icon_url"]
-        del req["contact_icon_url"]
-        del req["corporation_id"]
-        del req["alliance_id"]
-        del req["labels"]
-        del req["is_effective"]
-        del req["is_character"]
-        del req["is_corporation"]
-        del req["actioned"]
-    return JsonResponse({"data": requests_data})
+    return requests_data
 
 
 def _standing_requests_to_view() -> models.QuerySet:
@@ -1,7 +1,20 @@
+import json
+from typing import List, Type
+
 from django.contrib.auth.decorators import login_required, permission_required
-from django.http import HttpResponse, HttpResponseNotFound
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotFound,
+    JsonResponse,
+)
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_POST
 from eveuniverse.models import EveEntity
 
 from allianceauth.notifications import notify
@@ -11,8 +24,10 @@ from app_utils.logging import LoggerAddTag
 from standingsrequests import __title__
 from standingsrequests.app_settings import SR_NOTIFICATIONS_ENABLED
 from standingsrequests.constants import DATETIME_FORMAT_HTML
-from standingsrequests.core import app_config
+from standingsrequests.core import app_config, pending_counts
+from standingsrequests.helpers import keyset_pagination
 from standingsrequests.models import (
+    AbstractStandingsRequest,
     RequestLogEntry,
     StandingRequest,
     StandingRevocation,
@@ -22,14 +37,18 @@ from ._common import add_common_context, compose_standing_requests_data
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
+MANAGE_LIST_PAGE_SIZE = 50
+MAX_BULK_CONTACT_IDS = 1000
+
 
 @login_required
 @permission_required("standingsrequests.affect_standings")
 def manage_standings(request):
+    counts = pending_counts.pending_counts()
     context = {
         "organization": app_config.standings_source_entity(),
-        "requests_count": StandingRequest.objects.pending_requests().count(),
-        "revocations_count": StandingRevocation.objects.pending_requests().count(),
+        "requests_count": counts.requests,
+        "revocations_count": counts.revocations,
     }
     return render(
         request,
@@ -41,25 +60,60 @@ def manage_standings(request):
 @login_required
 @permission_required("standingsrequests.affect_standings")
 def manage_requests_list(request):
-    requests_qs = StandingRequest.objects.pending_requests()
-    requests_data = compose_standing_requests_data(requests_qs)
-    context = {"DATETIME_FORMAT_HTML": DATETIME_FORMAT_HTML, "requests": requests_data}
-    return render(
-        request, "standingsrequests/partials/manage_requests_list.html", context
-    )
+    """Render a page of pending requests.
+
+    The first page is rendered with the table.
+    Later pages are requested with a cursor and only rendered as rows.
+    """
+    return _render_manage_list(request, StandingRequest, "requests")
 
 
 @login_required
 @permission_required("standingsrequests.affect_standings")
 def manage_revocations_list(request):
-    revocations_qs = StandingRevocation.objects.pending_requests()
-    revocations_data = compose_standing_requests_data(revocations_qs)
+    """Render a page of pending revocations.
+
+    The first page is rendered with the table.
+    Later pages are requested with a cursor and only rendered as rows.
+    """
+    return _render_manage_list(request, StandingRevocation, "revocations")
+
+
+def _render_manage_list(
+    request, model: Type[AbstractStandingsRequest], name: str
+) -> HttpResponse:
+    cursor = request.GET.get("after")
+    try:
+        page = keyset_pagination.paginate(
+            model.objects.pending_requests(),
+            date_field="request_date",
+            cursor=cursor,
+            page_size=MANAGE_LIST_PAGE_SIZE,
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
+
+    page_qs = model.objects.filter(pk__in=page.object_ids).order_by(
+        "request_date", "pk"
+    )
+    if page.next_cursor:
+        next_page_url = (
+            reverse(f"standingsrequests:manage_{name}_list")
+            + "?"
+            + urlencode({"after": page.next_cursor})
+        )
+    else:
+        next_page_url = None
+
     context = {
         "DATETIME_FORMAT_HTML": DATETIME_FORMAT_HTML,
-        "revocations": revocations_data,
+        name: compose_standing_requests_data(page_qs) if page.object_ids else [],
+        "is_first_page": not cursor,
+        "next_page_url": next_page_url,
     }
+    template = "list" if not cursor else "rows"
     return render(
-        request, "standingsrequests/partials/manage_revocations_list.html", context
+        request, f"standingsrequests/partials/manage_{name}_{template}.html", context
     )
 
 
@@ -148,3 +202,150 @@ def manage_revocations_write(request, contact_id):
         return HttpResponse("")
 
     return HttpResponseNotFound()
+
+
+class BulkAction:
+    """Actions of a bulk write."""
+
+    CONFIRM = "confirm"
+    REJECT = "reject"
+
+
+class BulkResult:
+    """Results for each contact of a bulk write."""
+
+    CONFIRMED = "confirmed"
+    REJECTED = "rejected"
+    NOT_FOUND = "not_found"
+
+
+@login_required
+@permission_required("standingsrequests.affect_standings")
+@require_POST
+def manage_requests_bulk_write(request):
+    """Confirm or reject the standing requests for many contacts at once."""
+    return _bulk_write(request, StandingRequest)
+
+
+@login_required
+@permission_required("standingsrequests.affect_standings")
+@require_POST
+def manage_revocations_bulk_write(request):
+    """Confirm or reject the standing revocations for many contacts at once."""
+    return _bulk_write(request, StandingRevocation)
+
+
+def _bulk_write(request, model: Type[AbstractStandingsRequest]):
+    """Apply a bulk action to standing requests or revocations.
+
+    Expects a JSON body with the ``action`` and a list of ``contact_ids``.
+    Returns the result for each contact.
+    """
+    try:
+        payload = json.loads(request.body)
+        action = payload["action"]
+        values = payload["contact_ids"]
+        if not isinstance(values, list):
+            raise TypeError("contact_ids is not a list")
+        contact_ids = [int(contact_id) for contact_id in values]
+    except (ValueError, TypeError, KeyError):
+        return HttpResponseBadRequest("Invalid payload")
+
+    if action not in {BulkAction.CONFIRM, BulkAction.REJECT}:
+        return HttpResponseBadRequest(f"Unknown action: {action}")
+
+    if len(contact_ids) > MAX_BULK_CONTACT_IDS:
+        return HttpResponseBadRequest(
+            f"Can not process more than {MAX_BULK_CONTACT_IDS} contacts at once"
+        )
+
+    logger.debug(
+        "Bulk %s of %d %s called by %s",
+        action,
+        len(contact_ids),
+        model._meta.verbose_name_plural,
+        request.user,
+    )
+    standing_requests_qs = model.objects.filter(contact_id__in=contact_ids)
+    if action == BulkAction.CONFIRM:
+        if model is StandingRevocation:
+            standing_requests_qs = standing_requests_qs.filter(action_date__isnull=True)
+        processed_ids = _bulk_confirm(standing_requests_qs, request.user)
+        result = BulkResult.CONFIRMED
+    else:
+        processed_ids = _bulk_reject(standing_requests_qs, request.user)
+        result = BulkResult.REJECTED
+
+    results = {
+        contact_id: result if contact_id in processed_ids else BulkResult.NOT_FOUND
+        for contact_id in contact_ids
+    }
+    return JsonResponse({"results": results})
+
+
+def _lock_standing_requests(standing_requests_qs) -> List[AbstractStandingsRequest]:
+    """Lock standing requests for update and return them with their users.
+
+    Must be called in a transaction.
+    Only the requests are locked, because some databases can not lock
+    the nullable side of outer joins.
+    """
+    pks = list(standing_requests_qs.select_for_update().values_list("pk", flat=True))
+    return list(
+        standing_requests_qs.model.objects.filter(pk__in=pks).select_related(
+            "user__profile__main_character"
+        )
+    )
+
+
+def _bulk_confirm(standing_requests_qs, user: User) -> set:
+    with transaction.atomic():
+        standing_requests = _lock_standing_requests(standing_requests_qs)
+        standing_requests_qs.filter(
+            pk__in=[obj.pk for obj in standing_requests]
+        ).mark_actioned(user)
+        RequestLogEntry.objects.bulk_create_from_standing_requests(
+            standing_requests, RequestLogEntry.Action.CONFIRMED, user
+        )
+    return {obj.contact_id for obj in standing_requests}
+
+
+def _bulk_reject(standing_requests_qs, user: User) -> set:
+    with transaction.atomic():
+        standing_requests = _lock_standing_requests(standing_requests_qs)
+        RequestLogEntry.objects.bulk_create_from_standing_requests(
+            standing_requests, RequestLogEntry.Action.REJECTED, user
+        )
+        # deleting each object adds revocations for actioned and effective requests
+        for standing_request in standing_requests:
+            standing_request.delete()
+
+    if SR_NOTIFICATIONS_ENABLED:
+        _notify_users_about_rejections(standing_requests, user)
+
+    return {obj.contact_id for obj in standing_requests}
+
+
+def _notify_users_about_rejections(
+    standing_requests: List[AbstractStandingsRequest], user: User
+):
+    resolver = EveEntity.objects.bulk_resolve_names(
+        [obj.contact_id for obj in standing_requests]
+    )
+    for standing_request in standing_requests:
+        if not standing_request.user:
+            continue
+        entity_name = resolver.to_name(standing_request.contact_id)
+        if standing_request.is_standing_revocation:
+            title = _("Standing revocation for %s rejected") % entity_name
+            message = _(
+                "Your standing revocation for %(character)s "
+                "has been rejected by %(user)s."
+            ) % {"character": entity_name, "user": user}
+        else:
+            title = _("Standing request for %s rejected") % entity_name
+            message = _(
+                "Your standing request for %(character)s has been rejected by %(user)s."
+            ) % {"character": entity_name, "user": user}
+
+        notify(user=standing_request.user, title=title, message=message)
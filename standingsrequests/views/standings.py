@@ -1,23 +1,26 @@
+import csv
+import json
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Iterator, Set
+
 from django.contrib.auth.decorators import login_required, permission_required
-from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition, require_http_methods
 from eveuniverse.models import EveEntity
 
-from allianceauth.authentication.models import CharacterOwnership
-from allianceauth.eveonline.models import EveCharacter
 from allianceauth.services.hooks import get_extension_logger
 from app_utils.logging import LoggerAddTag
 
 from standingsrequests import __title__
-from standingsrequests.app_settings import SR_PAGE_CACHE_SECONDS
-from standingsrequests.core import app_config
-from standingsrequests.core.contact_types import ContactTypeId
-from standingsrequests.helpers.writers import UnicodeWriter
-from standingsrequests.models import ContactSet, StandingRequest
+from standingsrequests.core import app_config, standings_index, standings_tables
+from standingsrequests.helpers import standings_cache
+from standingsrequests.helpers.compression import compress_response
+from standingsrequests.helpers.writers import EchoBuffer
+from standingsrequests.models import ContactSet, ContactSnapshot, StandingRequest
 
-from ._common import DEFAULT_ICON_SIZE, add_common_context, label_with_icon
+from ._common import add_common_context
 
 logger = LoggerAddTag(get_extension_logger(__name__), __title__)
 
@@ -43,312 +46,192 @@ def standings(request):
     )
 
 
-@cache_page(SR_PAGE_CACHE_SECONDS)
+def _standings_etag(request) -> str:
+    return standings_cache.etag(request.user.has_perm("standingsrequests.view"))
+
+
 @login_required
 @permission_required("standingsrequests.affect_standings")
+@compress_response
+@condition(etag_func=_standings_etag)
 def character_standings_data(request):
-    try:
-        contacts = ContactSet.objects.latest()
-    except ContactSet.DoesNotExist:
-        contacts = ContactSet()
-    character_contacts_qs = (
-        contacts.contacts.filter_characters()
-        .select_related(
-            "eve_entity",
-            "eve_entity__character_affiliation",
-            "eve_entity__character_affiliation__corporation",
-            "eve_entity__character_affiliation__alliance",
-            "eve_entity__character_affiliation__faction",
-            "eve_entity__character_affiliation__eve_character",
-            "eve_entity__character_affiliation__eve_character__character_ownership__user",
-            "eve_entity__character_affiliation__eve_character__character_ownership__user__profile__main_character",
-            "eve_entity__character_affiliation__eve_character__character_ownership__user__profile__state",
+    show_mains = request.user.has_perm("standingsrequests.view")
+    return JsonResponse(
+        standings_tables.table_data(
+            standings_tables.CHARACTER_TABLE, request.GET, show_mains
         )
-        .prefetch_related("labels")
-        .order_by("eve_entity__name")
     )
-    characters_data = []
-    for contact in character_contacts_qs:
-        character_name_html = label_with_icon(
-            contact.eve_entity.icon_url(), contact.eve_entity.name
-        )
-        if request.user.has_perm("standingsrequests.view"):
-            (
-                state,
-                main_character_name,
-                main_character_html,
-            ) = _identify_main_for_character(contact)
-        else:
-            state = main_character_name = main_character_html = ""
-        corporation_name, alliance_name, faction_name = _identify_character_assoc(
-            contact
-        )
-        labels = contact.labels_sorted
-        characters_data.append(
-            {
-                "character_id": contact.eve_entity_id,
-                "character_name_html": {
-                    "display": character_name_html,
-                    "sort": contact.eve_entity.name,
-                },
-                "corporation_name": corporation_name,
-                "alliance_name": alliance_name,
-                "faction_name": faction_name,
-                "standing": contact.standing if contact.standing else "",
-                "labels_str": ", ".join(labels),
-                "main_character_name": main_character_name,
-                "main_character_html": {
-                    "display": main_character_html,
-                    "sort": main_character_name,
-                },
-                "state": state,
-            }
-        )
-    return JsonResponse({"data": characters_data})
 
 
-def _identify_main_for_character(contact):
-    try:
-        character = contact.eve_entity.character_affiliation.eve_character
-        user = character.character_ownership.user
-    except (AttributeError, ObjectDoesNotExist):
-        state = main_character_name = main_character_html = "-"
-    else:
-        main = user.profile.main_character
-        state = user.profile.state.name if user.profile.state else "-"
-        main_character_name = main.character_name
-        main_character_ticker = main.corporation_ticker
-        main_character_icon_url = main.portrait_url(DEFAULT_ICON_SIZE)
-        main_character_html = label_with_icon(
-            main_character_icon_url,
-            f"[{main_character_ticker}] {main_character_name}",
+@login_required
+@permission_required("standingsrequests.affect_standings")
+@condition(etag_func=_standings_etag)
+def character_standings_filter_options(request):
+    show_mains = request.user.has_perm("standingsrequests.view")
+    return JsonResponse(
+        standings_tables.filter_options_data(
+            standings_tables.CHARACTER_TABLE, request.GET, show_mains
         )
-
-    return state, main_character_name, main_character_html
+    )
 
 
-def _identify_character_assoc(contact):
-    try:
-        assoc = contact.eve_entity.character_affiliation
-    except (AttributeError, ObjectDoesNotExist):
-        corporation_name = "?"
-        alliance_name = "?"
-        faction_name = "?"
-    else:
-        corporation_name = assoc.corporation.name
-        alliance_name = assoc.alliance.name if assoc.alliance else ""
-        faction_name = assoc.faction.name if assoc.faction else ""
-    return corporation_name, alliance_name, faction_name
+CSV_HEADER = [
+    "character_id",
+    "character_name",
+    "corporation_id",
+    "corporation_name",
+    "corporation_ticker",
+    "alliance_id",
+    "alliance_name",
+    "has_scopes",
+    "state",
+    "main_character_name",
+    "main_character_ticker",
+    "standing",
+    "labels",
+]
 
 
 @login_required
 @permission_required("standingsrequests.download")
 def download_pilot_standings(request):
     logger.info("download_pilot_standings called by %s", request.user)
-    response = HttpResponse(content_type="text/csv")
+    response = StreamingHttpResponse(_pilot_standings_csv(), content_type="text/csv")
     response["Content-Disposition"] = 'attachment; filename="standings.csv"'
-    writer = UnicodeWriter(response)
-    try:
-        contacts = ContactSet.objects.latest()
-    except ContactSet.DoesNotExist:
-        contacts = ContactSet()
-    writer.writerow(
-        [
-            "character_id",
-            "character_name",
-            "corporation_id",
-            "corporation_name",
-            "corporation_ticker",
-            "alliance_id",
-            "alliance_name",
-            "has_scopes",
-            "state",
-            "main_character_name",
-            "main_character_ticker",
-            "standing",
-            "labels",
-        ]
-    )
+    return response
 
-    # lets request make sure all info is there in bulk
-    character_contacts = contacts.contacts.all().order_by("eve_entity__name")
-    EveEntity.objects.bulk_resolve_names([p.contact_id for p in character_contacts])
 
-    for pilot_standing in character_contacts:
-        try:
-            char = EveCharacter.objects.get(character_id=pilot_standing.contact_id)
-        except EveCharacter.DoesNotExist:
-            char = None
-        main = ""
-        state = ""
-        try:
-            ownership = CharacterOwnership.objects.get(character=char)
-        except CharacterOwnership.DoesNotExist:
-            main_character_name = ""
-            main = None
-        else:
-            state = ownership.user.profile.state.name
-            main = ownership.user.profile.main_character
-            if main is None:
-                main_character_name = ""
-            else:
-                main_character_name = main.character_name
-        pilot = [
-            pilot_standing.eve_entity_id,
-            pilot_standing.eve_entity.name,
-            char.corporation_id if char else "",
-            char.corporation_name if char else "",
-            char.corporation_ticker if char else "",
-            char.alliance_id if char else "",
-            char.alliance_name if char else "",
-            StandingRequest.has_required_scopes_for_request(char),
-            state,
-            main_character_name,
-            main.corporation_ticker if main else "",
-            pilot_standing.standing,
-            ", ".join([label.name for label in pilot_standing.labels.all()]),
-        ]
-        writer.writerow([str(v) if v is not None else "" for v in pilot])
-    return response
+def _pilot_standings_csv() -> Iterator[str]:
+    """Generate the lines of the CSV export.
+
+    Snapshots are fetched in chunks, so memory stays flat for large exports.
+    """
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(CSV_HEADER)
+    character_ids_with_scopes = _character_ids_with_required_scopes()
+    snapshots = ContactSnapshot.objects.order_by("name").iterator(chunk_size=2000)
+    for snapshot in snapshots:
+        yield writer.writerow(
+            [
+                snapshot.contact_id,
+                snapshot.name,
+                snapshot.corporation_id,
+                snapshot.corporation_name,
+                snapshot.corporation_ticker,
+                snapshot.alliance_id,
+                snapshot.alliance_name,
+                snapshot.contact_id in character_ids_with_scopes,
+                snapshot.state_name,
+                snapshot.main_character_name,
+                snapshot.main_character_ticker,
+                snapshot.standing,
+                snapshot.labels_str,
+            ]
+        )
+
+
+def _character_ids_with_required_scopes() -> Set[int]:
+    """Return IDs of the characters, which have the required scopes
+    for the state of their owner.
+    """
+    character_ids_by_state = defaultdict(set)
+    snapshots = (
+        ContactSnapshot.objects.filter(category=EveEntity.CATEGORY_CHARACTER)
+        .exclude(state_name__isnull=True)
+        .exclude(state_name="")
+        .values_list("contact_id", "state_name")
+    )
+    for contact_id, state_name in snapshots:
+        character_ids_by_state[state_name].add(contact_id)
+
+    result = set()
+    for state_name, character_ids in character_ids_by_state.items():
+        result |= StandingRequest.character_ids_with_required_scopes(
+            character_ids, state_name=state_name
+        )
+    return result
 
 
-@cache_page(SR_PAGE_CACHE_SECONDS)
 @login_required
 @permission_required("standingsrequests.affect_standings")
+@compress_response
+@condition(etag_func=_standings_etag)
 def corporation_standings_data(request):
-    try:
-        contacts = ContactSet.objects.latest()
-    except ContactSet.DoesNotExist:
-        contacts = ContactSet()
-    corporations_qs = (
-        contacts.contacts.filter_corporations()
-        .select_related(
-            "eve_entity",
-            "eve_entity__corporation_details",
-            "eve_entity__corporation_details__alliance",
-            "eve_entity__corporation_details__faction",
+    show_mains = request.user.has_perm("standingsrequests.view")
+    return JsonResponse(
+        standings_tables.table_data(
+            standings_tables.CORPORATION_TABLE, request.GET, show_mains
         )
-        .prefetch_related("labels")
-        .order_by("eve_entity__name")
     )
-    corporations_data = []
-    standings_requests = {
-        obj.contact_id: obj
-        for obj in (
-            StandingRequest.objects.filter(
-                contact_type_id=ContactTypeId.CORPORATION
-            ).filter(
-                contact_id__in=list(
-                    corporations_qs.values_list("eve_entity_id", flat=True)
-                )
-            )
-        )
-    }
-    for contact in corporations_qs:
-        alliance_name, faction_name = _identify_corporation_organizations(contact)
-        if request.user.has_perm("standingsrequests.view"):
-            (
-                main_character_name,
-                main_character_html,
-                state_name,
-            ) = _identify_corporation_main(standings_requests, contact)
-        else:
-            main_character_name = main_character_html = state_name = ""
-        labels_str = ", ".join(contact.labels_sorted)
-        corporation_html = label_with_icon(
-            contact.eve_entity.icon_url(DEFAULT_ICON_SIZE), contact.eve_entity.name
-        )
-        corporations_data.append(
-            {
-                "corporation_id": contact.eve_entity_id,
-                "corporation_html": {
-                    "display": corporation_html,
-                    "sort": contact.eve_entity.name,
-                },
-                "alliance_name": alliance_name,
-                "faction_name": faction_name,
-                "standing": contact.standing,
-                "labels_str": labels_str,
-                "state": state_name,
-                "main_character_name": main_character_name,
-                "main_character_html": {
-                    "display": main_character_html,
-                    "sort": main_character_name,
-                },
-            }
+
+
+@login_required
+@permission_required("standingsrequests.affect_standings")
+@condition(etag_func=_standings_etag)
+def corporation_standings_filter_options(request):
+    show_mains = request.user.has_perm("standingsrequests.view")
+    return JsonResponse(
+        standings_tables.filter_options_data(
+            standings_tables.CORPORATION_TABLE, request.GET, show_mains
         )
-    return JsonResponse({"data": corporations_data})
+    )
 
 
-def _identify_corporation_organizations(contact):
-    try:
-        corporation_details = contact.eve_entity.corporation_details
-    except (ObjectDoesNotExist, AttributeError):
-        alliance_name = "?"
-        faction_name = "?"
-    else:
-        alliance = corporation_details.alliance
-        if alliance:
-            alliance_name = alliance.name
-        else:
-            alliance_name = ""
-        faction = corporation_details.faction
-        if faction:
-            faction_name = faction.name
-        else:
-            faction_name = ""
-    return alliance_name, faction_name
-
-
-def _identify_corporation_main(standings_requests, contact):
-    try:
-        standing_request = standings_requests[contact.eve_entity_id]
-        user = standing_request.user
-        main = user.profile.main_character
-    except (KeyError, AttributeError, ObjectDoesNotExist):
-        main_character_name = state_name = main_character_html = "-"
-    else:
-        main_character_name = main.character_name if main else "-"
-        main_character_ticker = main.corporation_ticker if main else ""
-        main_character_icon_url = main.portrait_url(DEFAULT_ICON_SIZE) if main else "-"
-        if main_character_name:
-            main_character_html = label_with_icon(
-                main_character_icon_url,
-                f"[{main_character_ticker}] {main_character_name}",
-            )
-        else:
-            main_character_html = ""
-        state_name = user.profile.state.name
-    return main_character_name, main_character_html, state_name
-
-
-@cache_page(SR_PAGE_CACHE_SECONDS)
 @login_required
 @permission_required("standingsrequests.affect_standings")
+@compress_response
+@condition(etag_func=_standings_etag)
 def alliance_standings_data(request):
-    try:
-        contacts = ContactSet.objects.latest()
-    except ContactSet.DoesNotExist:
-        contacts = ContactSet()
-    alliances_data = []
-    for contact in (
-        contacts.contacts.filter_alliances()
-        .select_related("eve_entity")
-        .prefetch_related("labels")
-        .order_by("eve_entity__name")
-    ):
-        alliance_html = label_with_icon(
-            contact.eve_entity.icon_url(DEFAULT_ICON_SIZE), contact.eve_entity.name
-        )
-        alliances_data.append(
-            {
-                "alliance_id": contact.eve_entity_id,
-                "alliance_html": {
-                    "display": alliance_html,
-                    "sort": contact.eve_entity.name,
-                },
-                "standing": contact.standing,
-                "labels_str": ", ".join(contact.labels_sorted),
-            }
+    return JsonResponse(
+        standings_tables.table_data(standings_tables.ALLIANCE_TABLE, request.GET, False)
+    )
+
+
+@login_required
+@permission_required("standingsrequests.affect_standings")
+@condition(etag_func=_standings_etag)
+def alliance_standings_filter_options(request):
+    return JsonResponse(
+        standings_tables.filter_options_data(
+            standings_tables.ALLIANCE_TABLE, request.GET, False
         )
-    return JsonResponse({"data": alliances_data})
+    )
+
+
+MAX_LOOKUP_IDS = 1000
+MAX_LOOKUP_IDS_GET = 100  # long URLs can exceed the limits of proxies
+
+
+@login_required
+@permission_required("standingsrequests.affect_standings")
+@require_http_methods(["GET", "POST"])
+def standings_lookup(request):
+    """Return standings for a batch of Eve entity IDs.
+
+    The IDs are expected as comma separated list in the query parameter ``ids``
+    or for larger batches as JSON list ``ids`` in the body of a POST request.
+    """
+    if request.method == "POST":
+        max_ids = MAX_LOOKUP_IDS
+        try:
+            values = json.loads(request.body)["ids"]
+            if not isinstance(values, list):
+                raise TypeError("ids is not a list")
+            entity_ids = [int(value) for value in values]
+        except (ValueError, TypeError, KeyError):
+            return HttpResponseBadRequest("ids must be a JSON list of IDs")
+    else:
+        max_ids = MAX_LOOKUP_IDS_GET
+        try:
+            entity_ids = [
+                int(value) for value in request.GET.get("ids", "").split(",") if value
+            ]
+        except ValueError:
+            return HttpResponseBadRequest("ids must be a comma separated list of IDs")
+
+    if len(entity_ids) > max_ids:
+        return HttpResponseBadRequest(f"Can not lookup more than {max_ids} IDs")
+
+    results = standings_index.lookup(entity_ids)
+    data = {entity_id: asdict(result) for entity_id, result in results.items()}
+    return JsonResponse(data)